@@ -0,0 +1,4 @@
+"""Benchmarks for the document generators
+
+Run from the ``gathersync`` directory, e.g. ``python -m benchmarks.startup``.
+"""
@@ -0,0 +1,36 @@
+"""Deterministic synthetic backups, so benchmarks need no real data or network"""
+
+import random
+
+EXPORTED_AT = "2025-12-21T03:23:50.628Z"
+
+
+def synthetic_backup(people, events=None, per_person=3, seed=1):
+    """Return a backup dict with ``people`` distinct participants spread over ``events``
+
+    Every person joins ``per_person`` events (fewer if there are not enough).
+    Odd-numbered events are fixed events with RSVPs; the rest are flexible
+    events with a month of availability per participant.
+    """
+    rng = random.Random(seed)
+    events = events or max(1, people // 10)
+    backup_events = []
+    for number in range(events):
+        month = number % 12 + 1
+        event = {"id": f"ev{number}", "name": f"Event {number}", "month": month, "year": 2026,
+                 "eventType": "fixed" if number % 2 else "flexible", "participants": [],
+                 "createdAt": "2025-12-01T00:00:00.000Z", "updatedAt": "2025-12-02T00:00:00.000Z"}
+        if number % 2:
+            event.update(fixedDate=f"2026-{month:02d}-15", fixedTime="07:15")
+        backup_events.append(event)
+    for person in range(people):
+        for event in rng.sample(backup_events, min(per_person, events)):
+            participant = {"id": f"p{person}-{event['id']}", "name": f"Person {person}",
+                           "email": f"person{person}@example.com", "phone": f"04{person:08d}",
+                           "source": "contacts", "unavailableAllMonth": rng.random() < 0.05,
+                           "availability": {f"2026-{event['month']:02d}-{day:02d}": rng.random() < 0.6
+                                            for day in range(1, 29) if rng.random() < 0.5}}
+            if event["eventType"] == "fixed":
+                participant["rsvpStatus"] = rng.choice(["attending", "not-attending", "no-response"])
+            event["participants"].append(participant)
+    return {"version": "1.0", "exportedAt": EXPORTED_AT, "events": backup_events, "snapshots": [], "templates": []}
@@ -0,0 +1,118 @@
+"""The python-docx object model against the fast DOCX writer
+
+    python -m benchmarks.docx_writers --sizes 100 1000
+    python -m benchmarks.docx_writers --sizes 100 --optimize-size
+
+Renders the same packets (from a synthetic backup) with ``word.render`` and
+``word_fast.render`` and reports the time per packet for each and the speed-up.
+Every pair of outputs is then compared part by part; the exit status is 1 if
+any part differs, so the run doubles as an equivalence check.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from .suite import packet_jobs
+
+SIZES = (1, 100, 1000)
+
+WRITERS = {"object_model": "docgen.renderers.word", "fast": "docgen.renderers.word_fast"}
+
+
+def parts(path):
+    """``{member name: bytes}`` of a DOCX package"""
+    with zipfile.ZipFile(path) as package:
+        return {info.filename: package.read(info) for info in package.infolist()}
+
+
+def differences(path, other):
+    """Names of the members that are missing from either package or whose bytes differ"""
+    mine, theirs = parts(path), parts(other)
+    return sorted(name for name in mine.keys() | theirs.keys() if mine.get(name) != theirs.get(name))
+
+
+def load_images(document, jobs, assets):
+    """Draw and cache every job's images up front so neither writer is charged for them"""
+    from docgen.content import bind
+
+    for job in jobs:
+        values = document.values(job["values"])
+        for block in bind(document, values).blocks:
+            if block.kind in ("image", "qr"):
+                assets.image(block, values)
+
+
+def render_all(renderer, document, jobs, assets, out_dir):
+    """Render every job into ``out_dir`` and return the seconds taken"""
+    from docgen.content import bind
+
+    out_dir.mkdir(exist_ok=True)
+    gc.collect()
+    started = time.perf_counter()
+    for index, job in enumerate(jobs):
+        values = document.values(job["values"])
+        renderer.render(bind(document, values), out_dir / f"{index}.docx", assets, values)
+    return time.perf_counter() - started
+
+
+def run(sizes=SIZES, size_profile=None, progress=None):
+    """Return ``{size: {writer: seconds, ..., "mismatched": [...]}}``"""
+    from importlib import import_module
+
+    from docgen import AssetCache, load_document
+    from docgen.qr import QRCache
+
+    document = load_document()
+    renderers = {name: import_module(module) for name, module in WRITERS.items()}
+    assets = AssetCache(qr_cache=QRCache(max_entries=max(sizes) + 1), size=size_profile)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Compile both templates and read the images before timing anything
+        for name, renderer in renderers.items():
+            render_all(renderer, document, packet_jobs(1, document.variables["join_url"]), assets,
+                       Path(tmp) / f"warm-{name}")
+        for size in sizes:
+            jobs = packet_jobs(size, document.variables["join_url"])
+            load_images(document, jobs, assets)
+            entry = results[size] = {name: render_all(renderer, document, jobs, assets,
+                                                      Path(tmp) / f"{size}-{name}")
+                                     for name, renderer in renderers.items()}
+            entry["mismatched"] = [index for index in range(size)
+                                   if differences(Path(tmp) / f"{size}-object_model" / f"{index}.docx",
+                                                  Path(tmp) / f"{size}-fast" / f"{index}.docx")]
+            if progress:
+                progress(size, entry)
+    return results
+
+
+def main(argv=None):
+    from docgen.optimize import SizeProfile, add_size_arguments
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.docx_writers",
+                                     description="Compare the python-docx and fast DOCX writers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="packet counts to render")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    add_size_arguments(parser)
+    args = parser.parse_args(argv)
+
+    def progress(size, entry):
+        model, fast = entry["object_model"], entry["fast"]
+        print(f"{'❌' if entry['mismatched'] else '✅'} {size:>6} packets: object model {model * 1000 / size:.2f} "
+              f"ms/packet, fast {fast * 1000 / size:.2f} ms/packet ({model / fast:.1f}× faster); "
+              f"{size - len(entry['mismatched'])}/{size} identical")
+
+    profile = SizeProfile(dpi=args.dpi) if args.optimize_size else None
+    results = run(args.sizes, profile, None if args.json else progress)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 1 if any(entry["mismatched"] for entry in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
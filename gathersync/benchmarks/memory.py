@@ -0,0 +1,112 @@
+"""Memory of backups held as plain dicts against the columnar ``docgen.store``
+
+    python -m benchmarks.memory --people 1000 10000 100000
+
+For each size a synthetic backup (``benchmarks.data``) is written to disk and
+read twice with ``BackupStream``: once keeping every event as the dicts the
+JSON decoder returns, once into a ``Store``. ``tracemalloc`` reports the
+memory each representation still holds afterwards and the peak while reading.
+Every event is then compared: the store's participants must rebuild to the
+original dicts and its status matrices must equal ``availability.status_matrix``;
+the exit status is 1 if any event differs.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from .data import synthetic_backup
+
+SIZES = (1000, 10000, 100000)
+
+
+def measure(load):
+    """``(result, bytes held, peak bytes, seconds)`` of calling ``load()``"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    seconds = time.perf_counter() - started
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held, peak, seconds
+
+
+def in_month(participant, event):
+    """``participant`` with only the answers the store keeps: those for days of the event's month"""
+    prefix = f"{int(event['year'])}-{int(event['month']):02d}-"
+    return dict(participant, availability={iso: bool(answer) for iso, answer
+                                           in (participant.get("availability") or {}).items()
+                                           if iso.startswith(prefix)})
+
+
+def mismatched(events, store):
+    """Ids of the events whose participants or status matrix differ between ``events`` and ``store``"""
+    import numpy as np
+
+    from docgen.availability import status_matrix
+    from docgen.backup import active_participants
+
+    different = []
+    for event, view in zip(events, store.events()):
+        participants = list(active_participants(event))
+        if ([in_month(participant, event) for participant in participants]
+                != [participant.projection() for participant in view.participants]
+                or not np.array_equal(status_matrix(participants, int(event["year"]), int(event["month"])),
+                                      view.status_matrix())):
+            different.append(event["id"])
+    return different
+
+
+def run(sizes=SIZES, progress=None):
+    """Return ``{people: {"dicts": {...}, "store": {...}, "mismatched": [...]}}``"""
+    from docgen.backup import BackupStream
+    from docgen.store import Store
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for people in sizes:
+            path = Path(tmp) / f"backup-{people}.json"
+            path.write_text(json.dumps(synthetic_backup(people)), encoding="utf-8")
+            events, *dicts = measure(lambda: [event for _, event in BackupStream(path, sections=("events",))])
+            store, *columns = measure(lambda: Store.load([path]))
+            entry = results[people] = {
+                "participants": store.rows,
+                "dicts": dict(zip(("held", "peak", "seconds"), dicts)),
+                "store": dict(zip(("held", "peak", "seconds"), columns)),
+                "mismatched": mismatched(events, store),
+            }
+            del events, store
+            if progress:
+                progress(people, entry)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory",
+                                     description="Compare the memory of plain-dict and columnar backups.")
+    parser.add_argument("--people", type=int, nargs="+", default=list(SIZES), help="distinct participants")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    def progress(people, entry):
+        dicts, store = entry["dicts"], entry["store"]
+        print(f"{'❌' if entry['mismatched'] else '✅'} {people:>7} people, {entry['participants']:>7} participants: "
+              f"dicts {dicts['held'] / 2**20:.1f} MiB (peak {dicts['peak'] / 2**20:.1f}, {dicts['seconds']:.2f}s), "
+              f"store {store['held'] / 2**20:.1f} MiB (peak {store['peak'] / 2**20:.1f}, {store['seconds']:.2f}s); "
+              f"{dicts['held'] / store['held']:.1f}× smaller")
+
+    results = run(args.people, None if args.json else progress)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 1 if any(entry["mismatched"] for entry in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
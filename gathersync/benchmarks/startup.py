@@ -0,0 +1,103 @@
+"""Startup and per-document setup cost of the PDF and DOCX renderers
+
+    python -m benchmarks.startup -n 50
+
+Reports three figures per format:
+
+* cold import: a fresh interpreter importing the renderer (median of runs);
+* style setup: compiling the theme per document versus the cached result;
+* render: writing ``-n`` documents with the style/template caches cleared
+  before every document versus kept warm.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_IMPORT = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def cold_import(module, runs=5):
+    """Median seconds for a new interpreter to import ``module``"""
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _IMPORT.format(module=module)],
+                             capture_output=True, text=True, check=True).stdout
+        samples.append(float(out))
+    return statistics.median(samples)
+
+
+def per_call(func, count):
+    """Mean seconds per call of ``func()``"""
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - started) / count
+
+
+def render_many(renderer, clear, count, out_dir):
+    """Mean seconds per document, calling ``clear()`` before each one"""
+    from docgen import AssetCache, load_document
+    from docgen.content import bind
+
+    document = load_document()
+    values = document.values()
+    bound = bind(document, values)
+    assets = AssetCache()
+    renderer.render(bound, Path(out_dir) / "warmup", assets, values)
+    started = time.perf_counter()
+    for index in range(count):
+        clear()
+        renderer.render(bound, Path(out_dir) / f"doc-{index}", assets, values)
+    return (time.perf_counter() - started) / count
+
+
+def run(count=50, runs=5):
+    from docgen.renderers import pdf, word
+
+    results = {}
+    caches = {
+        "pdf": (pdf, "docgen.renderers.pdf", pdf.build_styles, pdf.compiled_styles, pdf.compiled_styles.cache_clear),
+        "docx": (word, "docgen.renderers.word", word.build_template, word.new_document, word._template.cache_clear),
+    }
+    with tempfile.TemporaryDirectory() as out_dir:
+        for fmt, (renderer, module, uncached, cached, clear) in caches.items():
+            results[fmt] = {
+                "cold_import": cold_import(module, runs),
+                "setup_uncached": per_call(uncached, count),
+                "setup_cached": per_call(cached, count),
+                "render_uncached": render_many(renderer, clear, count, out_dir),
+                "render_cached": render_many(renderer, lambda: None, count, out_dir),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup",
+                                     description="Measure renderer startup and per-document setup cost.")
+    parser.add_argument("-n", "--count", type=int, default=50, help="documents per measurement")
+    parser.add_argument("--runs", type=int, default=5, help="interpreter launches for the cold import figure")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.count, args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for fmt, r in results.items():
+        saved = r["render_uncached"] - r["render_cached"]
+        print(f"{fmt}: cold import {r['cold_import'] * 1000:.0f} ms")
+        print(f"  style setup   {r['setup_uncached'] * 1000:7.2f} ms/doc uncached, "
+              f"{r['setup_cached'] * 1000:7.2f} ms/doc cached")
+        print(f"  render        {r['render_uncached'] * 1000:7.2f} ms/doc uncached, "
+              f"{r['render_cached'] * 1000:7.2f} ms/doc cached "
+              f"({saved * 1000:.2f} ms, {saved / r['render_uncached']:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
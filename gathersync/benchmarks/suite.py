@@ -0,0 +1,235 @@
+"""Benchmark suite for the PDF and DOCX generators, with a regression gate
+
+    python -m benchmarks.suite -o bench.json                      # 1, 100, 1k and 10k packets
+    python -m benchmarks.suite --sizes 1 100 --baseline base.json  # compare against a stored run
+    python -m benchmarks.suite --current bench.json --baseline base.json
+
+Packets come from a synthetic backup (``benchmarks.data``), so runs need no
+network and are reproducible. Each packet goes through the writer's public
+``render``, and the time is split into stages using the spans ``render``
+already records for ``--trace``:
+
+* ``style_setup``: compiling the theme (cached after the first packet; for
+  DOCX, the template or package skeleton), plus creating each PDF's page
+  template;
+* ``flowables``: binding the content and building the reportlab flowables or
+  the DOCX body;
+* ``layout``: reportlab page layout (DOCX has none; Word lays out on open);
+* ``save``: serialising to disk.
+
+``docx`` times the default python-docx writer and ``docx_fast`` the opt-in
+package writer (``--fast-docx``). ``cold_start`` (a fresh interpreter importing
+the renderer) and ``cli`` (a full ``python -m docgen`` process with the same
+writer) are measured once per writer. With
+``--baseline`` every timing is compared and the exit status is 1 if any is
+slower than the baseline by more than ``--threshold``.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from importlib import import_module
+from pathlib import Path
+
+from .data import synthetic_backup
+from .startup import cold_import
+
+SIZES = (1, 100, 1000, 10000)
+
+STAGES = ("style_setup", "flowables", "layout", "save")
+
+# benchmark name -> (output format, renderer module, extra ``python -m docgen`` options)
+WRITERS = {
+    "pdf": ("pdf", "docgen.renderers.pdf", ()),
+    "docx": ("docx", "docgen.renderers.word", ()),
+    "docx_fast": ("docx", "docgen.renderers.word_fast", ("--fast-docx",)),
+}
+
+FORMATS = tuple(WRITERS)
+
+
+def packet_jobs(count, join_url):
+    """Return ``count`` render jobs built from a synthetic backup"""
+    from docgen.batch import jobs_for
+
+    return list(jobs_for([synthetic_backup(count)], join_url))
+
+
+def bench(name, document, jobs, assets, out_dir):
+    """Render one file per job with ``render`` of writer ``name``, timing each stage
+
+    Returns the seconds per stage (None for a stage the writer does not have)
+    and the page count, when the writer reports one.
+    """
+    from docgen.content import bind
+    from docgen.trace import Tracer, disable, enable, span
+
+    fmt, module, _ = WRITERS[name]
+    renderer = import_module(module)
+    tracer = enable(Tracer())
+    try:
+        for index, job in enumerate(jobs):
+            values = document.values(job["values"])
+            with span("flowables", format=fmt):
+                bound = bind(document, values)
+            renderer.render(bound, out_dir / f"{index}.{fmt}", assets, values)
+    finally:
+        disable()
+    totals = {stage: tracer.stages[stage, fmt][1] if (stage, fmt) in tracer.stages else None for stage in STAGES}
+    return totals, tracer.counters.get(("pages", fmt))
+
+
+def cli_seconds(name, out_dir):
+    """Wall time of a complete ``python -m docgen`` run with writer ``name``"""
+    fmt, _, options = WRITERS[name]
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "docgen", fmt, "-o", str(out_dir), "--force", *options],
+                   capture_output=True, check=True)
+    return time.perf_counter() - started
+
+
+def run(sizes=SIZES, formats=FORMATS, length=1, repeat=1, progress=None):
+    """Run the suite and return the results as a JSON-serialisable dict
+
+    ``length`` repeats the content blocks to benchmark longer documents. Each
+    stage keeps the fastest of ``repeat`` runs.
+    """
+    from docgen import AssetCache, load_document
+
+    document = load_document()
+    document = replace(document, blocks=document.blocks * length)
+    assets = AssetCache()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        for name in formats:
+            fmt, module, _ = WRITERS[name]
+            entry = results[name] = {"cold_start": cold_import(module), "cli": cli_seconds(name, out_dir / "cli"),
+                                     "packets": {}}
+            for size in sizes:
+                jobs = packet_jobs(size, document.variables["join_url"])
+                best = None
+                for _ in range(repeat):
+                    gc.collect()
+                    totals, pages = bench(name, document, jobs, assets, out_dir)
+                    best = totals if best is None else {stage: None if seconds is None else min(seconds, best[stage])
+                                                        for stage, seconds in totals.items()}
+                total = sum(seconds for seconds in best.values() if seconds is not None)
+                entry["packets"][str(size)] = {
+                    "stages": best,
+                    "total": total,
+                    "per_packet": total / size,
+                    "pages": pages,
+                    "bytes": sum(path.stat().st_size for path in out_dir.glob(f"*.{fmt}")),
+                }
+                for path in out_dir.glob(f"*.{fmt}"):
+                    path.unlink()
+                if progress:
+                    progress(name, size, entry["packets"][str(size)])
+    return {"meta": environment(length, repeat), "results": results}
+
+
+def environment(length, repeat):
+    """Versions and settings needed to judge whether two runs are comparable"""
+    import docx
+    import reportlab
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "reportlab": reportlab.Version,
+        "python-docx": getattr(docx, "__version__", "unknown"),
+        "document_length": length,
+        "repeat": repeat,
+    }
+
+
+def timings(results):
+    """Flatten the timings of ``results`` into ``{"pdf.100.layout": seconds}``"""
+    flat = {}
+    for fmt, entry in results["results"].items():
+        flat[f"{fmt}.cold_start"] = entry["cold_start"]
+        flat[f"{fmt}.cli"] = entry["cli"]
+        for size, packets in entry["packets"].items():
+            for stage, seconds in packets["stages"].items():
+                if seconds is not None:
+                    flat[f"{fmt}.{size}.{stage}"] = seconds
+            flat[f"{fmt}.{size}.total"] = packets["total"]
+    return flat
+
+
+def compare(baseline, current, threshold=0.15, min_delta=0.005):
+    """Return ``(name, old, new)`` for every timing that regressed
+
+    A timing regresses when it is more than ``threshold`` (a fraction) slower
+    than the baseline and by at least ``min_delta`` seconds, so noise in very
+    short stages is not reported.
+    """
+    old, new = timings(baseline), timings(current)
+    regressions = []
+    for name in sorted(old.keys() & new.keys()):
+        if new[name] > old[name] * (1 + threshold) and new[name] - old[name] >= min_delta:
+            regressions.append((name, old[name], new[name]))
+    return regressions
+
+
+def report(results):
+    for fmt, entry in results["results"].items():
+        print(f"{fmt}: cold start {entry['cold_start'] * 1000:.0f} ms, cli {entry['cli'] * 1000:.0f} ms")
+        for size, packets in entry["packets"].items():
+            stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in packets["stages"].items()
+                               if seconds is not None)
+            print(f"  {size:>6} packets: {packets['total']:.2f}s ({packets['per_packet'] * 1000:.1f} ms/packet) "
+                  f"— {stages}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite",
+                                     description="Benchmark the PDF and DOCX generators and flag regressions.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="packet counts to render")
+    parser.add_argument("-f", "--format", dest="formats", action="append", choices=FORMATS,
+                        help="writer to benchmark (repeatable; default: all)")
+    parser.add_argument("--length", type=int, default=1, help="repeat the content this many times per packet")
+    parser.add_argument("--repeat", type=int, default=1, help="keep the fastest of N runs per stage")
+    parser.add_argument("-o", "--output", default=None, help="write the results as JSON")
+    parser.add_argument("--current", default=None, help="compare this stored result instead of running")
+    parser.add_argument("--baseline", default=None, help="stored result to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="fractional slowdown that counts as a regression (default: %(default)s)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="ignore slowdowns smaller than this many seconds (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.current:
+        current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    else:
+        def progress(fmt, size, packets):
+            print(f"✅ {fmt} × {size}: {packets['total']:.2f}s")
+
+        current = run(args.sizes, args.formats or FORMATS, args.length, args.repeat, progress)
+        report(current)
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"📄 Results: {args.output}")
+    if not args.baseline:
+        return 0
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    regressions = compare(baseline, current, args.threshold, args.min_delta)
+    for name, old, new in regressions:
+        print(f"❌ {name}: {old * 1000:.1f} ms → {new * 1000:.1f} ms (+{(new - old) * 1000:.1f} ms)")
+    if regressions:
+        return 1
+    print(f"✅ No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
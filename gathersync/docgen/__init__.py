@@ -0,0 +1,14 @@
+"""GatherSync document generators
+
+Run ``python -m docgen`` from the ``gathersync`` directory to build every
+output format in one process.
+"""
+
+from .assets import AssetCache
+from .build import OUTPUTS, build
+from .content import ContentError, Document, load_document, parse_document
+from .manifest import Manifest
+from .theme import DEFAULT_THEME, TextStyle, Theme
+
+__all__ = ["AssetCache", "ContentError", "DEFAULT_THEME", "Document", "Manifest", "OUTPUTS", "TextStyle", "Theme",
+           "build", "load_document", "parse_document"]
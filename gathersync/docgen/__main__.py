@@ -0,0 +1,52 @@
+"""Command line entry point: ``python -m docgen [formats...]``"""
+
+import argparse
+
+from .assets import AssetCache
+from .build import LABELS, build
+from .manifest import Manifest
+from .optimize import SizeProfile, add_size_arguments, baseline_sizes, saving
+from .qr import QRCache
+from .renderers import RENDERERS, add_renderer_arguments, use_fast_docx
+from .trace import add_trace_arguments, tracing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m docgen", description=__doc__)
+    parser.add_argument("formats", nargs="*", metavar="FORMAT",
+                        help=f"output formats to build ({', '.join(RENDERERS)}); default: all")
+    parser.add_argument("-o", "--out-dir", default=".", help="directory for generated files")
+    parser.add_argument("--qr-cache", default=None, help="directory for cached QR images")
+    parser.add_argument("--force", action="store_true", help="rebuild outputs even if their inputs are unchanged")
+    add_size_arguments(parser)
+    add_renderer_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+    use_fast_docx(args.fast_docx)
+    for fmt in args.formats:
+        if fmt not in RENDERERS:
+            parser.error(f"unknown format '{fmt}'")
+
+    size = SizeProfile(args.dpi) if args.optimize_size else None
+    assets = AssetCache(qr_cache=QRCache(args.qr_cache), size=size)
+    manifest = Manifest.for_dir(args.out_dir)
+    if args.force:
+        manifest.entries.clear()
+    with tracing(args.trace, args.trace_format):
+        written = build(args.formats or tuple(RENDERERS), args.out_dir, assets=assets, manifest=manifest)
+    manifest.save()
+    for fmt, path in written.items():
+        if str(path) in manifest.hits:
+            print(f"✔ {LABELS[fmt]} up to date: {path}")
+        else:
+            print(f"✅ {LABELS[fmt]} generated successfully: {path}")
+    if size is not None:
+        for fmt, before in baseline_sizes(list(written)).items():
+            print(f"📉 {LABELS[fmt]}: {saving(before, written[fmt].stat().st_size)}")
+    print(f"Manifest: {manifest.summary()}")
+    if args.trace:
+        print(f"Trace: {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Image loading shared across renderers and documents"""
+
+import hashlib
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+
+from .content import expand
+from .qr import QRCache
+from .trace import span
+
+
+class AssetCache:
+    """Reads each image once per process and shares decoded forms between documents
+
+    Images are identified by content hash. Renderers use ``shared`` to keep
+    their own decoded representation of an image (a reportlab ``ImageReader``,
+    for instance) so identical images are decoded once and embedded as a
+    single resource inside each output file.
+
+    With a ``size`` profile (``docgen.optimize.SizeProfile``) images are
+    resampled and recompressed for the width they are drawn at, and renderers
+    produce their size-optimised output.
+    """
+
+    def __init__(self, base_dir=".", qr_cache=None, max_shared=32, size=None):
+        self.base_dir = Path(base_dir)
+        self.qr_cache = qr_cache or QRCache()
+        self.max_shared = max_shared
+        self.size = size
+        self._files = {}
+        self._shared = OrderedDict()
+
+    def load(self, src):
+        """Return ``(key, bytes)`` for the file ``src``, reading it on first use"""
+        entry = self._files.get(src)
+        if entry is None:
+            data = (self.base_dir / src).read_bytes()
+            entry = self._files[src] = (hashlib.sha256(data).hexdigest(), data)
+        return entry
+
+    def image(self, block, values):
+        """Return ``(key, bytes)`` for an ``image`` or ``qr`` block"""
+        with span("image", kind=block.kind):
+            if block.kind == "qr":
+                entry = self.qr_cache.get(expand(block.payload, values), block.size,
+                                          error_correction=block.error_correction)
+            else:
+                entry = self.load(block.src)
+            return entry if self.size is None else self._optimize(entry, block.width)
+
+    def _optimize(self, entry, width):
+        from .optimize import optimize_image, optimized_key
+
+        key = optimized_key(entry[0], width, self.size)
+        return self.shared(("optimized", key), lambda: (key, optimize_image(entry[1], width, self.size)))
+
+    def image_stream(self, block, values):
+        """Return a new binary stream over the image for ``block``"""
+        return BytesIO(self.image(block, values)[1])
+
+    def shared(self, key, factory):
+        """Return the object cached under ``key``, creating it with ``factory()`` on a miss"""
+        value = self._shared.get(key)
+        if value is None:
+            value = self._shared[key] = factory()
+            if len(self._shared) > self.max_shared:
+                self._shared.popitem(last=False)
+        else:
+            self._shared.move_to_end(key)
+        return value
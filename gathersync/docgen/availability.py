@@ -0,0 +1,148 @@
+"""Availability and RSVP summaries for the events in a backup
+
+Mirrors ``lib/calendar-utils.ts``: a participant marked ``unavailableAllMonth``
+is unavailable every day, otherwise each day is available, unavailable or has
+no response according to their ``availability`` map. The best dates of a
+flexible event are the days with the most available participants.
+
+Flexible events are grouped by month and every group becomes one
+participants × days matrix of status codes. Per-event day counts are column
+sums over each event's block of rows (``numpy.add.reduceat``), so the work per
+participant is a single pass over their availability map and all counting is
+done as array operations.
+"""
+
+import calendar
+from dataclasses import dataclass
+from itertools import groupby
+
+from .backup import active_participants, latest_events
+
+NO_RESPONSE = 0
+AVAILABLE = 1
+UNAVAILABLE = 2
+
+RSVP_STATUSES = ("attending", "not-attending", "no-response")
+
+
+@dataclass(frozen=True)
+class FlexibleSummary:
+    event_id: str
+    name: str
+    year: int
+    month: int
+    participants: int
+    days: tuple  # ISO dates of the month
+    available: tuple  # per-day counts, aligned with ``days``
+    unavailable: tuple
+    no_response: tuple
+    best: tuple  # dates with the highest availability, as shown in the app
+    ranked: tuple  # dates by most available, then fewest unavailable
+
+    def percentage(self, index):
+        """Share of participants available on ``days[index]``"""
+        return 100 * self.available[index] / self.participants if self.participants else 0.0
+
+
+@dataclass(frozen=True)
+class FixedSummary:
+    event_id: str
+    name: str
+    date: str
+    time: str
+    participants: int
+    attending: int
+    not_attending: int
+    no_response: int
+
+
+def month_days(year, month):
+    """ISO dates of every day in ``month``"""
+    return tuple(f"{year}-{month:02d}-{day:02d}" for day in range(1, calendar.monthrange(year, month)[1] + 1))
+
+
+def status_matrix(participants, year, month):
+    """Return a participants × days ``int8`` matrix of status codes for ``month``"""
+    import numpy as np
+
+    columns_by_date = {iso: column for column, iso in enumerate(month_days(year, month))}
+    rows, columns, marks, all_month = [], [], [], []
+    for row, participant in enumerate(participants):
+        if participant.get("unavailableAllMonth"):
+            all_month.append(row)
+            continue
+        for iso, available in (participant.get("availability") or {}).items():
+            column = columns_by_date.get(iso)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+                marks.append(AVAILABLE if available else UNAVAILABLE)
+    matrix = np.full((len(participants), len(columns_by_date)), NO_RESPONSE, dtype=np.int8)
+    matrix[rows, columns] = marks
+    matrix[all_month] = UNAVAILABLE
+    return matrix
+
+
+def _month_key(event):
+    return int(event["year"]), int(event["month"])
+
+
+def summarise_flexible(events, top=5):
+    """Return a ``FlexibleSummary`` per flexible event, computed a month at a time"""
+    import numpy as np
+
+    summaries = []
+    for (year, month), group in groupby(sorted(events, key=_month_key), key=_month_key):
+        group = [(event, list(active_participants(event))) for event in group]
+        people = [participant for _, participants in group for participant in participants]
+        sizes = np.array([len(participants) for _, participants in group])
+        days = month_days(year, month)
+        counts = {code: np.zeros((len(group), len(days)), dtype=np.int64)
+                  for code in (AVAILABLE, UNAVAILABLE, NO_RESPONSE)}
+        filled = sizes > 0
+        if filled.any():
+            matrix = status_matrix(people, year, month)
+            offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))[filled]
+            for code, table in counts.items():
+                table[filled] = np.add.reduceat(matrix == code, offsets, axis=0, dtype=np.int64)
+        available, unavailable = counts[AVAILABLE], counts[UNAVAILABLE]
+        # lexsort uses its last key first: most available, then fewest unavailable, then earliest
+        order = np.lexsort((np.broadcast_to(np.arange(len(days)), available.shape), unavailable, -available),
+                           axis=1)
+        most = available.max(axis=1)
+        for index, (event, participants) in enumerate(group):
+            ranked = [days[day] for day in order[index][:top] if available[index, day] > 0]
+            best = [days[day] for day in np.flatnonzero(available[index] == most[index])] if most[index] else []
+            summaries.append(FlexibleSummary(
+                event["id"], event.get("name") or "", year, month, len(participants), days,
+                tuple(available[index].tolist()), tuple(unavailable[index].tolist()),
+                tuple(counts[NO_RESPONSE][index].tolist()), tuple(best), tuple(ranked)))
+    return summaries
+
+
+def summarise_fixed(event):
+    """Return the RSVP tally of a fixed event"""
+    tally = dict.fromkeys(RSVP_STATUSES, 0)
+    participants = 0
+    for participant in active_participants(event):
+        participants += 1
+        status = participant.get("rsvpStatus")
+        tally[status if status in tally else "no-response"] += 1
+    return FixedSummary(event["id"], event.get("name") or "", event.get("fixedDate") or "",
+                        event.get("fixedTime") or "", participants, tally["attending"],
+                        tally["not-attending"], tally["no-response"])
+
+
+def summarise(backups, top=5):
+    """Return ``(flexible, fixed)`` summaries for the active events in ``backups``
+
+    An event found in several backups is summarised once, as its
+    ``latest_events`` copy. Flexible events are counted a month at a time.
+    """
+    flexible, fixed = [], []
+    for event in latest_events(backups):
+        if event.get("eventType") == "fixed":
+            fixed.append(summarise_fixed(event))
+        elif event.get("month") and event.get("year"):
+            flexible.append(event)
+    return summarise_flexible(flexible, top), fixed
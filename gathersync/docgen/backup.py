@@ -0,0 +1,357 @@
+"""Reading the app's backup export (``Backups/gathersync-backup-*.json``)
+
+The export mirrors ``lib/backup.ts``: ``version``, ``exportedAt``, ``events``,
+``snapshots`` and ``templates``. Participants are grouped across events into
+recipients so every person gets one packet listing all of their events.
+
+``load_backup`` reads a whole file. ``BackupStream`` and ``open_backup`` read
+it incrementally instead, decoding one event, snapshot or template at a time,
+so memory is bounded by the largest single record rather than the file, and
+consumers can start on the first event before the rest is read.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from urllib.parse import quote
+
+SECTIONS = ("events", "snapshots", "templates")
+
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+
+RSVP_LABELS = {"attending": "attending", "not-attending": "not attending", "no-response": "no response yet"}
+
+
+class BackupError(ValueError):
+    """Raised when a file is not a GatherSync backup"""
+
+
+@dataclass
+class Recipient:
+    key: str
+    name: str
+    email: str = ""
+    phone: str = ""
+    events: list = field(default_factory=list)  # (event, participant) pairs
+
+    @property
+    def stem(self):
+        """File name stem that is unique per recipient"""
+        slug = re.sub(r"[^a-z0-9]+", "-", self.name.lower()).strip("-") or "participant"
+        return f"{slug}-{hashlib.sha1(self.key.encode('utf-8')).hexdigest()[:8]}"
+
+
+def load_backup(path):
+    """Load and sanity-check a backup file"""
+    with open(path, encoding="utf-8") as f:
+        backup = json.load(f)
+    if not isinstance(backup, dict) or not backup.get("version") or not backup.get("exportedAt"):
+        raise BackupError(f"{path}: not a GatherSync backup (missing version/exportedAt)")
+    backup.setdefault("events", [])
+    return backup
+
+
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+_NUMBER_TAIL = re.compile(r"[-+.0-9eE]*")
+_ESCAPE_TAIL = re.compile(r"u[0-9a-fA-F]{0,4}")
+
+
+def _cut_off(error):
+    """True if the ``JSONDecodeError`` is valid JSON running into the end of the text, not malformed JSON"""
+    rest = error.doc[error.pos:]
+    if error.msg.startswith("Unterminated string"):
+        return True
+    if error.msg.startswith("Invalid \\uXXXX escape"):
+        return bool(_ESCAPE_TAIL.fullmatch(rest))
+    return (not rest.strip() or bool(_NUMBER_TAIL.fullmatch(rest))
+            or any(literal.startswith(rest) for literal in _LITERALS))
+
+
+class BackupStream:
+    """Iterate over ``(section, record)`` pairs of a backup without loading it whole
+
+    Only the ``sections`` asked for are yielded; the others are decoded one
+    record at a time and dropped. Events are filtered by ``event_ids``,
+    ``year``, ``month`` and ``event_types`` as they are read; snapshots by the
+    same criteria applied to their ``eventId`` and embedded event. A database
+    row (``event_id`` and ``participants`` only) is judged by the event with
+    that id earlier in the same file, and dropped under a year, month or type
+    filter when there is none. Top-level
+    fields other than the sections (``version``, ``exportedAt``) are collected
+    in ``header`` as they are reached.
+    """
+
+    def __init__(self, path, sections=SECTIONS, event_ids=None, year=None, month=None, event_types=None,
+                 chunk_size=1 << 20):
+        self.path = path
+        self.sections = tuple(sections)
+        self.event_ids = set(event_ids) if event_ids else None
+        self.year = year
+        self.month = month
+        self.event_types = set(event_types) if event_types else None
+        self.chunk_size = chunk_size
+        self.header = {}
+        # Event id -> passes the filters, for snapshot rows that only carry the id
+        self._by_event = {} if year is not None or month is not None or self.event_types else None
+        self._decoder = json.JSONDecoder()
+
+    def wants_event(self, event):
+        """Return True if ``event`` passes the filters"""
+        if not isinstance(event, dict):
+            return False
+        if self.event_ids is not None and event.get("id") not in self.event_ids:
+            return False
+        if self.year is not None and str(event.get("year")) != str(self.year):
+            return False
+        if self.month is not None and str(event.get("month")) != str(self.month):
+            return False
+        return self.event_types is None or event.get("eventType") in self.event_types
+
+    def _wants(self, section, record):
+        if section == "events":
+            return self.wants_event(record)
+        if section == "snapshots" and isinstance(record, dict):
+            event_id = record.get("eventId", record.get("event_id"))
+            if self.event_ids is not None and event_id not in self.event_ids:
+                return False
+            event = record.get("event")
+            if isinstance(event, dict):
+                return self.wants_event(dict(event, id=event_id or event.get("id")))
+            return self._by_event is None or self._by_event.get(str(event_id), False)
+        return True
+
+    def __iter__(self):
+        with open(self.path, encoding="utf-8") as f:
+            self._file, self._buffer, self._pos, self._offset, self._eof = f, "", 0, 0, False
+            try:
+                yield from self._records()
+            finally:
+                self._file = self._buffer = None
+
+    def _error(self, message):
+        return BackupError(f"{self.path}: {message}")
+
+    def _read(self, size):
+        data = self._file.read(size)
+        if not data:
+            self._eof = True
+        # Drop what has been consumed so the buffer only holds unread text
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+
+    def _next_char(self):
+        """Skip whitespace and return the next character without consuming it"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos:self._pos + 1]
+            self._read(self.chunk_size)
+
+    def _expect(self, chars):
+        char = self._next_char()
+        if not char or char not in chars:
+            raise self._error(f"expected {' or '.join(repr(c) for c in chars)}, found {char or 'end of file'!r}")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Decode the JSON value at the current position, reading more of the file as needed"""
+        self._next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # Only JSON cut off by the end of the buffer can be completed by reading on
+                if self._eof or not _cut_off(e):
+                    raise self._error(f"invalid JSON at character {self._offset + e.pos}: {e.msg}") from None
+            else:
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            # Grow the read so a large record is decoded in a logarithmic number of attempts
+            self._read(max(self.chunk_size, len(self._buffer) - self._pos))
+
+    def _records(self):
+        self._expect("{")
+        if self._next_char() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise self._error("expected an object key")
+            self._expect(":")
+            if key in SECTIONS and self._next_char() == "[":
+                self._pos += 1
+                yield from self._section(key)
+            else:
+                self.header[key] = self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def _section(self, section):
+        if self._next_char() == "]":
+            self._pos += 1
+            return
+        while True:
+            record = self._value()
+            if section == "events" and self._by_event is not None and isinstance(record, dict):
+                self._by_event[str(record.get("id"))] = self.wants_event(record)
+            if section in self.sections and self._wants(section, record):
+                yield section, record
+            if self._expect(",]") == "]":
+                return
+
+
+def open_backup(path, **filters):
+    """Return a backup whose ``events`` are read lazily from ``path``
+
+    Accepts the filters of ``BackupStream``. The file must start with
+    ``version`` and ``exportedAt``, as the app writes it; snapshots and
+    templates are skipped. ``events`` can be iterated once.
+    """
+    stream = BackupStream(path, sections=("events",), **filters)
+    records = iter(stream)
+    first = next(records, None)
+    if not stream.header.get("version") or not stream.header.get("exportedAt"):
+        raise BackupError(f"{path}: not a GatherSync backup (missing version/exportedAt)")
+
+    def events():
+        if first is not None:
+            yield first[1]
+        for _, event in records:
+            yield event
+
+    return dict(stream.header, events=events())
+
+
+def add_filter_arguments(parser):
+    """Add the event filters shared by the command line tools"""
+    parser.add_argument("--event", dest="event_ids", action="append", help="only this event id (repeatable)")
+    parser.add_argument("--year", type=int, default=None, help="only events in this year")
+    parser.add_argument("--month", type=int, default=None, choices=range(1, 13), metavar="1-12",
+                        help="only events in this month")
+    parser.add_argument("--type", dest="event_types", action="append", choices=["flexible", "fixed"],
+                        help="only events of this type (repeatable)")
+
+
+def open_backups(paths, args):
+    """Yield a lazily read backup per path, filtered by ``add_filter_arguments`` options"""
+    for path in paths:
+        yield open_backup(path, event_ids=args.event_ids, year=args.year, month=args.month,
+                          event_types=args.event_types)
+
+
+def active_events(backup):
+    """Yield events that have not been soft-deleted"""
+    for event in backup.get("events") or []:
+        if not event.get("deletedAt"):
+            yield event
+
+
+def latest_events(backups):
+    """The active events of ``backups``, one per id: the copy with the latest ``updatedAt``
+
+    Overlapping backups repeat events, sometimes with stale details. On a tie
+    the copy read first is kept, as in ``store.Store``. Events are returned in
+    the order their ids were first read.
+    """
+    latest = {}
+    for backup in backups:
+        for event in active_events(backup):
+            event_id = str(event.get("id") or "")
+            current = latest.get(event_id)
+            if current is None or str(event.get("updatedAt") or "") > str(current.get("updatedAt") or ""):
+                latest[event_id] = event
+    return list(latest.values())
+
+
+def active_participants(event):
+    """Yield the participants of ``event`` that have not been soft-deleted"""
+    for participant in event.get("participants") or []:
+        if not participant.get("deletedAt"):
+            yield participant
+
+
+def participant_key(participant):
+    """Identity used to recognise the same person across events"""
+    email = (participant.get("email") or "").strip().lower()
+    if email:
+        return f"email:{email}"
+    phone = re.sub(r"\D", "", participant.get("phone") or "")
+    if phone:
+        return f"phone:{phone}"
+    return "name:" + " ".join((participant.get("name") or "").lower().split())
+
+
+def describe_event(event, participant=None):
+    """One-line description of an event for a packet's event list"""
+    if event.get("eventType") == "fixed" and event.get("fixedDate"):
+        day = date.fromisoformat(event["fixedDate"])
+        text = f"Fixed event on {day.day} {MONTHS[day.month - 1]} {day.year}"
+        if event.get("fixedTime"):
+            text += f" at {event['fixedTime']}"
+        status = (participant or {}).get("rsvpStatus")
+        if status in RSVP_LABELS:
+            text += f" (you are {RSVP_LABELS[status]})"
+        return text
+    return f"Flexible event for {MONTHS[int(event['month']) - 1]} {event['year']}"
+
+
+def deep_link(base_url, event, participant):
+    """Public event link for one participant, as built in ``app/event-detail.tsx``"""
+    return (f"{base_url.rstrip('/')}/public-event?eventId={quote(event['id'], safe='')}"
+            f"&name={quote(participant.get('name') or '', safe='')}")
+
+
+def recipients(backups, directory=None):
+    """Group the participants of every active event into recipients
+
+    With a ``dedup.Directory``, the participants it knows are grouped by the
+    person they were merged into and named as in the directory. An event in
+    several backups is taken once, as its ``latest_events`` copy, and is
+    listed once per recipient even if the directory merged two of its
+    participants.
+    """
+    grouped, listed = {}, set()
+    for event in latest_events(backups):
+        for participant in active_participants(event):
+            key = directory.key(event, participant) if directory is not None else participant_key(participant)
+            if (key, event["id"]) in listed:
+                continue
+            listed.add((key, event["id"]))
+            recipient = grouped.get(key)
+            if recipient is None:
+                recipient = grouped[key] = Recipient(key, participant.get("name") or "")
+                entry = directory.person(key) if directory is not None else None
+                if entry is not None:
+                    recipient.name = entry["name"]
+                    recipient.email = next(iter(entry["emails"]), "")
+                    recipient.phone = next(iter(entry["phones"]), "")
+            recipient.email = recipient.email or participant.get("email") or ""
+            recipient.phone = recipient.phone or participant.get("phone") or ""
+            recipient.events.append((event, participant))
+    return list(grouped.values())
+
+
+def packet_values(recipient, join_url):
+    """Document variables that personalise a packet for ``recipient``"""
+    values = {
+        "recipient": recipient.name,
+        "events": [{"name": event["name"], "description": describe_event(event, participant)}
+                   for event, participant in recipient.events],
+    }
+    if recipient.events:
+        event, participant = recipient.events[0]
+        values["qr_payload"] = deep_link(join_url, event, participant)
+    for kind in ("flexible", "fixed"):
+        names = [event["name"] for event, _ in recipient.events if event.get("eventType") == kind]
+        if names:
+            values[f"{kind}_event"] = names[0]
+    return values
@@ -0,0 +1,255 @@
+"""Bulk personalised packet generation on a process pool
+
+    python -m docgen.batch ../Backups/gathersync-backup-2025-12-21.json -o packets -j 8
+
+Every participant in the backups gets one packet listing their real events
+with a QR code that deep-links to their first event. Each worker process parses
+the content source and imports the renderers once, then renders jobs as they
+arrive. At most ``max_pending`` jobs are in flight at a time, so memory stays
+bounded however many recipients there are.
+
+Packets whose inputs have not changed since the previous run (per the build
+manifest in the output directory) are skipped without being sent to a worker.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import trace
+from .assets import AssetCache
+from .backup import add_filter_arguments, open_backups, packet_values, recipients
+from .build import build, output_path
+from .content import bind, load_document
+from .dedup import add_directory_arguments, load_directory
+from .manifest import Manifest, fingerprint
+from .optimize import SizeProfile, add_size_arguments, baseline_sizes, saving
+from .renderers import FAST_DOCX, RENDERERS, add_renderer_arguments, use_fast_docx
+
+REPORT_NAME = "batch-report.json"
+
+_worker = {}
+
+
+@dataclass
+class BatchResult:
+    rendered: list = field(default_factory=list)
+    failures: list = field(default_factory=list)
+    skipped: list = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def throughput(self):
+        """Packets rendered per second of wall time"""
+        return len(self.rendered) / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes(self):
+        return sum(rendered["bytes"] for rendered in self.rendered)
+
+    def report(self):
+        return {
+            "rendered": len(self.rendered),
+            "skipped": len(self.skipped),
+            "failed": len(self.failures),
+            "bytes": self.bytes,
+            "seconds": round(self.seconds, 3),
+            "packets_per_second": round(self.throughput, 2),
+            "failures": self.failures,
+        }
+
+
+def job_for(recipient, join_url):
+    """Render job for one recipient"""
+    return {"key": recipient.key, "name": recipient.name, "stem": recipient.stem,
+            "values": packet_values(recipient, join_url)}
+
+
+def jobs_for(backups, join_url, directory=None):
+    """Yield one render job per recipient (per directory person with ``directory``)"""
+    for recipient in recipients(backups, directory):
+        yield job_for(recipient, join_url)
+
+
+def stale_jobs(jobs, formats, out_dir, manifest, skipped, size=None):
+    """Yield the jobs with at least one out-of-date output
+
+    Each yielded job carries the ``formats`` it still needs and the
+    ``fingerprints`` to record once it succeeds. Up-to-date jobs are appended
+    to ``skipped``.
+    """
+    document = load_document()
+    assets = AssetCache(size=size)
+    for job in jobs:
+        values = document.values(job["values"])
+        bound = bind(document, values)
+        fingerprints = {}
+        for fmt in formats:
+            path = output_path(out_dir, fmt, job["stem"])
+            digest = fingerprint(fmt, bound, assets, values)
+            if not manifest.is_fresh(path, digest):
+                fingerprints[fmt] = (str(path), digest)
+        if fingerprints:
+            yield dict(job, formats=list(fingerprints), fingerprints=fingerprints)
+        else:
+            skipped.append(job["key"])
+
+
+def _init_worker(formats, out_dir, qr_cache_dir, traced=False, size=None, fast_docx=False):
+    from .qr import QRCache
+    from .renderers import use_fast_docx, warm
+
+    use_fast_docx(fast_docx)
+    if traced:
+        # Events travel back with each result and are written by the parent
+        trace.enable(trace.Tracer(keep=True))
+    warm(formats)
+    _worker.update(document=load_document(), assets=AssetCache(qr_cache=QRCache(qr_cache_dir), size=size),
+                   formats=formats, out_dir=out_dir)
+
+
+def render_packet(job):
+    """Render one job inside a worker process"""
+    started = time.perf_counter()
+    written = build(job.get("formats", _worker["formats"]), _worker["out_dir"], _worker["document"],
+                    _worker["assets"], job["values"], stem=job["stem"])
+    result = {
+        "key": job["key"],
+        "name": job["name"],
+        "paths": [str(path) for path in written.values()],
+        "bytes": sum(os.path.getsize(path) for path in written.values()),
+        "seconds": time.perf_counter() - started,
+    }
+    tracer = trace.active()
+    if tracer is not None:
+        result["trace"] = tracer.drain()
+    return result
+
+
+def run_batch(jobs, formats=("pdf",), out_dir="packets", workers=None, max_pending=None,
+              max_tasks_per_child=None, progress=None, qr_cache_dir=None, manifest=None, size=None):
+    """Render ``jobs`` on a process pool and return a ``BatchResult``
+
+    ``qr_cache_dir`` lets every worker share one on-disk QR image cache. With a
+    ``manifest``, up-to-date jobs are skipped and successful ones recorded; the
+    caller saves it. ``size`` is a ``SizeProfile`` for size-optimised packets.
+    ``progress`` is called as ``progress(done, job, result, error)`` after each
+    job finishes; exactly one of ``result`` and ``error`` is set. When tracing
+    is enabled, the workers' spans and counts are merged into the tracer.
+    Workers use the same DOCX renderer as the caller (see ``use_fast_docx``).
+    """
+    tracer = trace.active()
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    result = BatchResult()
+    started = time.perf_counter()
+    if manifest is not None:
+        jobs = stale_jobs(jobs, formats, out_dir, manifest, result.skipped, size)
+    jobs = iter(jobs)
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(tuple(formats), str(out_dir), qr_cache_dir, tracer is not None, size,
+                                       RENDERERS["docx"] == FAST_DOCX),
+                             max_tasks_per_child=max_tasks_per_child) as pool:
+        while True:
+            while len(pending) < max_pending:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                pending[pool.submit(render_packet, job)] = job
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    rendered = future.result()
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    result.failures.append({"key": job["key"], "name": job["name"], "error": error})
+                    if progress:
+                        progress(len(result.rendered) + len(result.failures), job, None, error)
+                else:
+                    if tracer is not None:
+                        tracer.merge(rendered.pop("trace", ()))
+                    result.rendered.append(rendered)
+                    if manifest is not None:
+                        for path, digest in job["fingerprints"].values():
+                            manifest.record(path, digest)
+                    if progress:
+                        progress(len(result.rendered) + len(result.failures), job, rendered, None)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m docgen.batch",
+                                     description="Render one personalised packet per participant.")
+    parser.add_argument("backups", nargs="+", help="backup JSON files exported from the app")
+    parser.add_argument("-o", "--out-dir", default="packets", help="directory for generated packets")
+    parser.add_argument("-f", "--format", dest="formats", action="append", choices=["pdf", "docx", "md", "html"],
+                        help="output format (repeatable; default: pdf)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="jobs in flight at once (default: twice the worker count)")
+    parser.add_argument("--max-tasks-per-child", type=int, default=None,
+                        help="recycle each worker after this many packets")
+    parser.add_argument("--qr-cache", default=".cache/docgen/qr",
+                        help="directory shared by workers for cached QR images (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="rebuild packets even if their inputs are unchanged")
+    parser.add_argument("--join-url", default=None, help="base URL for deep links (default: from the content)")
+    add_filter_arguments(parser)
+    add_directory_arguments(parser)
+    add_size_arguments(parser)
+    add_renderer_arguments(parser)
+    trace.add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+    use_fast_docx(args.fast_docx)
+
+    join_url = args.join_url or load_document().variables["join_url"]
+    people = recipients(open_backups(args.backups, args), load_directory(args.directory))
+    total = len(people)
+    # Jobs are built as the pool takes them, so only those in flight exist at once
+    jobs = (job_for(recipient, join_url) for recipient in people)
+    first = []
+
+    def progress(done, job, rendered, error):
+        if error:
+            print(f"[{done}/{total}] ❌ {job['name']}: {error}")
+        else:
+            if not first:
+                first.append(job)  # stands in for every packet in the size report
+            print(f"[{done}/{total}] ✅ {job['name']} ({rendered['seconds']:.2f}s)")
+
+    manifest = Manifest.for_dir(args.out_dir)
+    if args.force:
+        manifest.entries.clear()
+    formats = args.formats or ["pdf"]
+    size = SizeProfile(args.dpi) if args.optimize_size else None
+    with trace.tracing(args.trace, args.trace_format):
+        result = run_batch(jobs, formats, args.out_dir, args.workers, args.max_pending,
+                           args.max_tasks_per_child, progress, args.qr_cache, manifest, size)
+    manifest.save()
+    report_path = Path(args.out_dir) / REPORT_NAME
+    report_path.write_text(json.dumps(result.report(), indent=2), encoding="utf-8")
+    print(f"✅ {len(result.rendered)} packets in {result.seconds:.1f}s "
+          f"({result.throughput:.1f} packets/sec); {len(result.skipped)} unchanged; "
+          f"{len(result.failures)} failed — report: {report_path}")
+    if result.rendered:
+        print(f"Size: {result.bytes:,} bytes written")
+    if size is not None and result.rendered:
+        # Rebuilding every packet unoptimised would double the run, so one packet stands in
+        sample, job = result.rendered[0], first[0]
+        before = sum(baseline_sizes(formats, variables=job["values"], stem=job["stem"]).values())
+        print(f"📉 Sample packet ({sample['name']}): {saving(before, sample['bytes'])}")
+    print(f"Manifest: {manifest.summary()}")
+    return 1 if result.failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+"""Build one or more output formats from a single parsed document"""
+
+import os
+from pathlib import Path
+
+from .assets import AssetCache
+from .content import bind, load_document
+from .manifest import fingerprint
+from .renderers import RENDERERS, get_renderer
+from .theme import DEFAULT_THEME
+from .trace import active, count, document as traced, span
+
+OUTPUTS = {
+    "pdf": "GatherSync-Instructions-WithQR.pdf",
+    "docx": "GatherSync-Instructions.docx",
+    "md": "GatherSync-Instructions.md",
+    "html": "GatherSync-Instructions.html",
+}
+
+LABELS = {"pdf": "PDF", "docx": "Word document", "md": "Markdown", "html": "HTML"}
+
+
+def output_path(out_dir, fmt, stem=None):
+    """Return the output file for ``fmt``, named after ``stem`` when given"""
+    if stem is None:
+        return Path(out_dir) / OUTPUTS[fmt]
+    return Path(out_dir) / f"{stem}.{fmt}"
+
+
+def build(formats=tuple(RENDERERS), out_dir=".", document=None, assets=None, variables=None, stem=None,
+          manifest=None, theme=DEFAULT_THEME):
+    """Render ``formats`` into ``out_dir`` and return ``{format: path}``
+
+    The content source is parsed once and images are read once, however many
+    formats are requested; styles compiled from ``theme`` are cached per
+    process. With a ``manifest``, outputs whose inputs are unchanged since the
+    last build are left alone; the caller saves it.
+    """
+    document = document or load_document()
+    assets = assets or AssetCache()
+    values = document.values(variables)
+    bound = bind(document, values)
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    written = {}
+    for fmt in formats:
+        path = output_path(out_dir, fmt, stem)
+        written[fmt] = path
+        with traced(path):
+            if manifest is not None:
+                with span("fingerprint", format=fmt):
+                    digest = fingerprint(fmt, bound, assets, values, theme)
+                if manifest.is_fresh(path, digest):
+                    count("up_to_date", format=fmt)
+                    continue
+            renderer = get_renderer(fmt)
+            with span("document", format=fmt):
+                renderer.render(bound, path, assets, values, theme)
+            count("documents", format=fmt)
+            if active() is not None:
+                count("bytes", os.path.getsize(path), format=fmt)
+        if manifest is not None:
+            manifest.record(path, digest)
+    return written
@@ -0,0 +1,125 @@
+"""Change report: who changed what between event snapshots
+
+    python -m docgen.changes ../Backups/gathersync-backup-2025-12-21.json -f pdf --since 2025-12-20
+
+Lists, per event and snapshot interval, the participants who joined or left
+and the availability, "unavailable all month" and RSVP answers that changed.
+Deltas come from ``docgen.deltas`` and are cached under ``--cache``, so a
+nightly digest only diffs snapshots saved since the previous run.
+"""
+
+import argparse
+import hashlib
+import json
+from dataclasses import asdict
+from datetime import date
+
+from .backup import RSVP_LABELS, add_filter_arguments
+from .build import LABELS, build
+from .content import Block, Document, Run
+from .deltas import LIVE, DeltaCache, event_deltas
+from .manifest import Manifest
+from .renderers import RENDERERS, add_renderer_arguments, use_fast_docx
+from .report import day_label
+from .trace import add_trace_arguments, span, tracing
+
+REPORT_STEM = "change-report"
+
+
+def _moment(value):
+    if value == LIVE:
+        return "now"
+    try:
+        return day_label(value[:10])
+    except ValueError:
+        return value
+
+
+def _dates(dates):
+    return ", ".join(day_label(iso) if len(iso) == 10 else iso for iso in dates)
+
+
+def describe(delta):
+    """One-line summary of a ``ParticipantDelta``"""
+    if delta.change == "added":
+        return "joined"
+    if delta.change == "removed":
+        return "left"
+    parts = []
+    if delta.available:
+        parts.append(f"now available {_dates(delta.available)}")
+    if delta.unavailable:
+        parts.append(f"now unavailable {_dates(delta.unavailable)}")
+    if delta.cleared:
+        parts.append(f"withdrew {_dates(delta.cleared)}")
+    if delta.all_month:
+        parts.append("unavailable all month" if delta.all_month[1] else "no longer unavailable all month")
+    if delta.rsvp:
+        parts.append(f"RSVP {RSVP_LABELS.get(delta.rsvp[0], delta.rsvp[0])} → "
+                     f"{RSVP_LABELS.get(delta.rsvp[1], delta.rsvp[1])}")
+    return "; ".join(parts)
+
+
+def change_document(deltas, generated=""):
+    """Build the change report as a content tree, leaving out intervals without changes"""
+    changed = [delta for delta in deltas if delta.participants]
+    blocks = [Block("title", runs=(Run("GatherSync Change Report"),), align="center"),
+              Block("subtitle", runs=(Run(f"Generated {generated}" if generated else "Snapshot changes"),),
+                    align="center"),
+              Block("paragraph", runs=(Run(f"{len(changed)} of {len(deltas)} snapshot intervals have changes."),))]
+    for delta in changed:
+        blocks.append(Block("heading", runs=(Run(delta.name or delta.event_id),), level=3))
+        summary = (f"{_moment(delta.before)} → {_moment(delta.after)}: {delta.count('added')} joined, "
+                   f"{delta.count('removed')} left, {delta.count('changed')} changed")
+        blocks.append(Block("paragraph", runs=(Run(summary),), small=True))
+        rows = [("Participant", "Change")] + [(change.name or change.participant_id, describe(change))
+                                              for change in delta.participants]
+        blocks.append(Block("table", rows=tuple(rows)))
+    data = [asdict(delta) for delta in deltas]
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+    return Document("GatherSync Change Report", {}, tuple(blocks), digest), data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m docgen.changes",
+                                     description="Report participant changes between event snapshots.")
+    parser.add_argument("backups", nargs="+", help="backup JSON files exported from the app")
+    parser.add_argument("-o", "--out-dir", default=".", help="directory for the report")
+    parser.add_argument("-f", "--format", dest="formats", action="append", choices=list(RENDERERS),
+                        help="output format (repeatable; default: pdf)")
+    parser.add_argument("--since", default="", help="only intervals ending at or after this ISO date/time")
+    parser.add_argument("--no-live", action="store_true", help="do not compare the latest snapshot with the event")
+    parser.add_argument("--cache", default=".cache/docgen/deltas",
+                        help="directory for cached deltas (default: %(default)s)")
+    parser.add_argument("--json", default=None, help="also write the deltas to this JSON file")
+    parser.add_argument("--force", action="store_true", help="rebuild the report even if its data is unchanged")
+    add_filter_arguments(parser)
+    add_renderer_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+    use_fast_docx(args.fast_docx)
+
+    cache = DeltaCache(args.cache)
+    manifest = Manifest.for_dir(args.out_dir)
+    if args.force:
+        manifest.entries.clear()
+    with tracing(args.trace, args.trace_format):
+        with span("deltas"):
+            deltas = event_deltas(args.backups, cache, not args.no_live, args.since, event_ids=args.event_ids,
+                                  year=args.year, month=args.month, event_types=args.event_types)
+        document, data = change_document(deltas, date.today().isoformat())
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+        written = build(args.formats or ["pdf"], args.out_dir, document, stem=REPORT_STEM, manifest=manifest)
+    manifest.save()
+    print(f"Deltas: {len(deltas)} intervals, {cache.hits} cached, {cache.misses} computed")
+    for fmt, path in written.items():
+        if str(path) in manifest.hits:
+            print(f"✔ {LABELS[fmt]} report up to date: {path}")
+        else:
+            print(f"✅ {LABELS[fmt]} report generated: {path}")
+
+
+if __name__ == "__main__":
+    main()
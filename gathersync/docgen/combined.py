@@ -0,0 +1,127 @@
+"""One print-ready PDF with a packet for every participant, streamed
+
+    python -m docgen.combined ../Backups/gathersync-backup-2025-12-21.json -o combined.pdf --volume-size 500
+
+Packets are produced lazily: each recipient's flowables are generated, laid
+out and dropped as soon as they are drawn, so the flowable list is never
+materialised. reportlab keeps finished page streams in memory until a file is
+saved, so ``--volume-size`` closes the PDF every N packets and starts the next
+one (``combined-0001.pdf``, ``combined-0002.pdf``, ...). Each volume is a
+complete, printable file the moment it is written, and peak memory depends on
+the volume size rather than on the number of recipients.
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+from .assets import AssetCache
+from .backup import add_filter_arguments, open_backups
+from .batch import jobs_for
+from .content import bind, load_document
+from .dedup import add_directory_arguments, load_directory
+from .qr import QRCache
+from .trace import active, add_trace_arguments, count, document as traced, tracing
+
+
+@dataclass
+class Volume:
+    path: Path
+    packets: int
+    pages: int
+    seconds: float
+
+
+def packet_flowables(document, jobs, styles, assets):
+    """Yield the flowables of one packet per job, separated by page breaks"""
+    from reportlab.platypus import PageBreak
+
+    from .renderers.pdf import flowables
+
+    for index, job in enumerate(jobs):
+        values = document.values(job["values"])
+        if index:
+            yield PageBreak()
+        yield from flowables(bind(document, values), styles, assets, values)
+
+
+def volume_path(path, number):
+    path = Path(path)
+    return path.with_name(f"{path.stem}-{number:04d}{path.suffix}")
+
+
+def write_combined(path, jobs, document=None, assets=None, volume_size=None, compress=True, progress=None):
+    """Stream one packet per job into ``path`` (or numbered volumes) and return the volumes
+
+    ``progress`` is called with each ``Volume`` as soon as it is on disk.
+    """
+    from .renderers.pdf import compiled_styles, new_doc_template, stream_build
+
+    document = document or load_document()
+    assets = assets or AssetCache()
+    styles = compiled_styles()
+    jobs = iter(jobs)
+    volumes = []
+    while True:
+        started = time.perf_counter()
+        chunk = list(islice(jobs, volume_size)) if volume_size else jobs
+        if volume_size and not chunk:
+            break
+        target = volume_path(path, len(volumes) + 1) if volume_size else Path(path)
+        counted = []
+        doc = new_doc_template(target, document.title, pageCompression=int(compress))
+        with traced(target):
+            stream_build(doc, packet_flowables(document, _counting(chunk, counted), styles, assets))
+            count("packets", len(counted), format="pdf")
+            if active() is not None:
+                count("bytes", target.stat().st_size, format="pdf")
+        volume = Volume(target, len(counted), doc.page, time.perf_counter() - started)
+        volumes.append(volume)
+        if progress:
+            progress(volume)
+        if not volume_size:
+            break
+    return volumes
+
+
+def _counting(jobs, seen):
+    for job in jobs:
+        seen.append(job["key"])
+        yield job
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m docgen.combined",
+                                     description="Stream every participant's packet into one PDF.")
+    parser.add_argument("backups", nargs="+", help="backup JSON files exported from the app")
+    parser.add_argument("-o", "--output", default="GatherSync-Packets.pdf", help="combined PDF path")
+    parser.add_argument("--volume-size", type=int, default=None,
+                        help="start a new numbered PDF every N packets to bound memory")
+    parser.add_argument("--no-compress", action="store_true", help="leave page content streams uncompressed")
+    parser.add_argument("--qr-cache", default=None, help="directory for cached QR images")
+    parser.add_argument("--join-url", default=None, help="base URL for deep links (default: from the content)")
+    add_filter_arguments(parser)
+    add_directory_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+
+    document = load_document()
+    join_url = args.join_url or document.variables["join_url"]
+    jobs = jobs_for(open_backups(args.backups, args), join_url, load_directory(args.directory))
+    assets = AssetCache(qr_cache=QRCache(args.qr_cache))
+
+    def progress(volume):
+        print(f"📄 {volume.path}: {volume.packets} packets, {volume.pages} pages ({volume.seconds:.1f}s)")
+
+    started = time.perf_counter()
+    with tracing(args.trace, args.trace_format):
+        volumes = write_combined(args.output, jobs, document, assets, args.volume_size, not args.no_compress,
+                                 progress)
+    packets = sum(volume.packets for volume in volumes)
+    print(f"✅ {packets} packets in {len(volumes)} file(s), {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
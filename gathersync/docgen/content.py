@@ -0,0 +1,255 @@
+"""Structured content source: loading, validation and the parsed document tree
+
+The instructions live in ``instructions.json`` as a flat list of blocks. Inline
+text uses a tiny markup subset (``**bold**``, ``*italic*``) and ``{name}``
+placeholders that are filled from the document variables at render time. The
+source is parsed once into immutable nodes that every renderer shares.
+
+A few nodes depend on per-recipient data: ``event_list`` blocks expand to a
+list built from a list variable, and any block with ``when`` is dropped unless
+that variable is set. ``bind`` resolves these against a set of values and
+returns a concrete document, reusing every static node as-is.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from .qr import ERROR_CORRECTION
+
+SOURCE = Path(__file__).with_name("instructions.json")
+
+BLOCK_TYPES = ("title", "subtitle", "heading", "paragraph", "list", "event_list", "image", "qr", "code",
+               "table", "page_break", "rule")
+
+_INLINE = re.compile(r"\*\*(.+?)\*\*|\*(.+?)\*")
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+class ContentError(ValueError):
+    """Raised when the content source is malformed"""
+
+
+@dataclass(frozen=True)
+class Run:
+    text: str
+    bold: bool = False
+    italic: bool = False
+
+
+@dataclass(frozen=True)
+class ListItem:
+    runs: tuple
+    children: "Block | None" = None
+
+
+@dataclass(frozen=True)
+class Block:
+    kind: str
+    runs: tuple = ()
+    level: int = 0
+    ordered: bool = False
+    start: int = 1
+    items: tuple = ()
+    align: str = "left"
+    small: bool = False
+    text: str = ""
+    src: str = ""
+    width: float = 0.0
+    payload: str = ""
+    size: int = 10
+    error_correction: str = "M"
+    source: str = ""
+    when: str = ""
+    rows: tuple = ()  # table cells, header row first
+
+
+@dataclass(frozen=True)
+class Document:
+    title: str
+    variables: dict
+    blocks: tuple
+    digest: str = ""
+
+    def values(self, overrides=None):
+        """Return the document variables with ``overrides`` applied"""
+        values = dict(self.variables)
+        if overrides:
+            values.update(overrides)
+        return values
+
+
+def parse_inline(text):
+    """Split inline markup into a tuple of runs"""
+    runs = []
+    pos = 0
+    for match in _INLINE.finditer(text):
+        if match.start() > pos:
+            runs.append(Run(text[pos:match.start()]))
+        if match.group(1) is not None:
+            runs.append(Run(match.group(1), bold=True))
+        else:
+            runs.append(Run(match.group(2), italic=True))
+        pos = match.end()
+    if pos < len(text):
+        runs.append(Run(text[pos:]))
+    return tuple(runs)
+
+
+def expand(text, values):
+    """Fill ``{name}`` placeholders in ``text`` from ``values``
+
+    Unknown names are left untouched so data pulled from backups can never
+    break rendering.
+    """
+    if "{" not in text:
+        return text
+    return _PLACEHOLDER.sub(lambda m: str(values.get(m.group(1), m.group(0))), text)
+
+
+def plain_text(runs, values):
+    """Concatenate runs into plain text with placeholders filled"""
+    return "".join(expand(run.text, values) for run in runs)
+
+
+def _require(raw, key, where):
+    if key not in raw:
+        raise ContentError(f"{where}: missing '{key}'")
+    return raw[key]
+
+
+def _check_placeholders(text, variables, where):
+    for name in _PLACEHOLDER.findall(text):
+        if name not in variables:
+            raise ContentError(f"{where}: unknown placeholder '{{{name}}}'")
+
+
+def _parse_event_list(source, variables, where):
+    if not isinstance(variables.get(source), list):
+        raise ContentError(f"{where}: event list source '{source}' must be a list variable")
+    return Block("event_list", source=source)
+
+
+def _parse_list(raw, variables, where):
+    items = _require(raw, "items", where)
+    if not isinstance(items, list) or not items:
+        raise ContentError(f"{where}: 'items' must be a non-empty list")
+    parsed = []
+    for index, item in enumerate(items):
+        item_where = f"{where}.items[{index}]"
+        if isinstance(item, str):
+            item = {"text": item}
+        text = _require(item, "text", item_where)
+        _check_placeholders(text, variables, item_where)
+        children = None
+        if isinstance(item.get("items"), str):
+            children = _parse_event_list(item["items"], variables, item_where)
+        elif "items" in item:
+            children = _parse_list({"items": item["items"], "ordered": item.get("ordered", False)},
+                                   variables, item_where)
+        parsed.append(ListItem(parse_inline(text), children))
+    return Block("list", ordered=bool(raw.get("ordered", False)), start=int(raw.get("start", 1)),
+                 items=tuple(parsed))
+
+
+def _parse_table(raw, variables, where):
+    rows = _require(raw, "rows", where)
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, list) for row in rows):
+        raise ContentError(f"{where}: 'rows' must be a non-empty list of lists")
+    width = len(rows[0])
+    for index, row in enumerate(rows):
+        if len(row) != width:
+            raise ContentError(f"{where}.rows[{index}]: expected {width} cells, got {len(row)}")
+        for cell in row:
+            _check_placeholders(str(cell), variables, f"{where}.rows[{index}]")
+    return Block("table", rows=tuple(tuple(str(cell) for cell in row) for row in rows))
+
+
+def _parse_block(raw, variables, where):
+    kind = _require(raw, "type", where)
+    if kind not in BLOCK_TYPES:
+        raise ContentError(f"{where}: unknown block type '{kind}'")
+    when = raw.get("when", "")
+    if when and when not in variables:
+        raise ContentError(f"{where}: unknown condition variable '{when}'")
+    return replace(_parse_block_body(raw, kind, variables, where), when=when)
+
+
+def _parse_block_body(raw, kind, variables, where):
+    if kind in ("page_break", "rule"):
+        return Block(kind)
+    if kind == "list":
+        return _parse_list(raw, variables, where)
+    if kind == "event_list":
+        return _parse_event_list(raw.get("source", "events"), variables, where)
+    if kind == "table":
+        return _parse_table(raw, variables, where)
+    if kind == "image":
+        return Block(kind, src=_require(raw, "src", where), text=raw.get("alt", ""),
+                     width=float(raw.get("width", 3)))
+    if kind == "qr":
+        payload = _require(raw, "payload", where)
+        _check_placeholders(payload, variables, where)
+        error_correction = raw.get("error_correction", "M")
+        if error_correction not in ERROR_CORRECTION:
+            raise ContentError(f"{where}: error_correction must be one of {', '.join(ERROR_CORRECTION)}")
+        return Block(kind, payload=payload, text=raw.get("alt", ""), width=float(raw.get("width", 3)),
+                     size=int(raw.get("size", 10)), error_correction=error_correction)
+
+    text = _require(raw, "text", where)
+    _check_placeholders(text, variables, where)
+    if kind == "code":
+        return Block(kind, text=text)
+    level = 0
+    if kind == "heading":
+        level = int(_require(raw, "level", where))
+        if level not in (2, 3, 4):
+            raise ContentError(f"{where}: heading level must be 2, 3 or 4")
+    align = raw.get("align", "center" if kind in ("title", "subtitle") else "left")
+    if align not in ("left", "center"):
+        raise ContentError(f"{where}: align must be 'left' or 'center'")
+    return Block(kind, runs=parse_inline(text), level=level, align=align,
+                 small=bool(raw.get("small", False)))
+
+
+def parse_document(raw):
+    """Validate a decoded content source and build the document tree"""
+    variables = dict(raw.get("variables", {}))
+    blocks = _require(raw, "blocks", "document")
+    if not isinstance(blocks, list):
+        raise ContentError("document: 'blocks' must be a list")
+    parsed = tuple(_parse_block(block, variables, f"blocks[{index}]")
+                   for index, block in enumerate(blocks))
+    digest = hashlib.sha256(json.dumps(raw, sort_keys=True).encode("utf-8")).hexdigest()
+    return Document(raw.get("title", ""), variables, parsed, digest)
+
+
+def _event_items(events):
+    return tuple(ListItem((Run(event["name"], bold=True), Run(f" - {event['description']}")))
+                 for event in events)
+
+
+def _bind_block(block, values):
+    if block.kind == "event_list":
+        return Block("list", items=_event_items(values[block.source]))
+    if block.kind == "list" and any(item.children is not None for item in block.items):
+        items = tuple(item if item.children is None
+                      else replace(item, children=_bind_block(item.children, values))
+                      for item in block.items)
+        return replace(block, items=items)
+    return block
+
+
+def bind(document, values):
+    """Resolve conditional and data-driven blocks against ``values``"""
+    blocks = tuple(_bind_block(block, values) for block in document.blocks
+                   if not block.when or values.get(block.when))
+    return replace(document, blocks=blocks)
+
+
+def load_document(path=SOURCE):
+    """Load and validate a content source file"""
+    with open(path, encoding="utf-8") as f:
+        return parse_document(json.load(f))
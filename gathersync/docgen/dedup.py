@@ -0,0 +1,373 @@
+"""One directory entry per real person across events and backups
+
+    python -m docgen.dedup ../Backups/gathersync-backup-*.json -o directory.json
+    python -m docgen.batch ../Backups/gathersync-backup-*.json --directory directory.json
+
+The same person is added to many events, often from different sources, and
+not always with the same details: one event has their email, another only
+their phone as ``+61 419 …`` instead of ``0419 …``, a third only "smith,
+jane". Every participant record is indexed by
+
+- its email, lower-cased
+- its phone, as an Australian national number (``+61``/``0061``/``61`` and
+  a missing leading ``0`` are normalised; other numbers keep their digits)
+- a fuzzy name key: case, accents, punctuation and word order ignored
+
+and records sharing an email or phone are merged with a union-find, so the
+work is linear in the number of records rather than quadratic. An email or
+phone only merges records whose names can be the same person ("J Smith" and
+"Jane Smith", not "Jane Smith" and "Tom Smith" on a family number). Names only
+merge records whose details do not conflict: the same name with an email in
+one event and a phone in another is one person, with two different emails it
+is two. Records with only a name join the one person of that name who has
+contact details, and initials ("J Smith") the one person whose name they
+abbreviate; when there are several, the name is ambiguous and they join none.
+
+The merged directory lists each person with their names, emails, phones and
+the (event, participant) records they were found in. ``--directory`` makes
+``docgen.batch``, ``docgen.combined`` and ``docgen.ics --per user`` send one
+packet or feed per person in it.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .backup import BackupStream, active_participants, add_filter_arguments, participant_key
+from .trace import add_trace_arguments, count, span, tracing
+
+DIRECTORY_VERSION = 1
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    return email if "@" in email else ""
+
+
+def normalize_phone(phone):
+    """``phone`` as an Australian national number (``0419123456``), or its digits if it is not one"""
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("0061"):
+        digits = "0" + digits[4:]
+    elif digits.startswith("61") and len(digits) == 11:
+        digits = "0" + digits[2:]
+    elif len(digits) == 9 and digits[0] in "23478":
+        digits = "0" + digits
+    # Fewer digits than a local number identify nobody
+    return digits if len(digits) >= 8 else ""
+
+
+def name_key(name):
+    """Fuzzy key of a name: "Smith, Jané" and "jane  SMITH" both give ``jane smith``"""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    return " ".join(sorted(re.findall(r"[^\W_]+", text)))
+
+
+def _words_match(words, others):
+    return all(any(word == other or (len(word) == 1 and other.startswith(word)) for other in others)
+               for word in words)
+
+
+def names_match(key, other):
+    """True if two name keys can be the same person: every word of one matches a word of the other
+
+    A word matches itself or, as an initial, a word starting with it, so
+    "j smith" matches "jane smith". An empty key matches anything.
+    """
+    words, others = key.split(), other.split()
+    return _words_match(words, others) or _words_match(others, words)
+
+
+@dataclass(frozen=True)
+class ParticipantRecord:
+    event_id: str
+    participant_id: str
+    name: str
+    email: str  # normalised
+    phone: str  # normalised
+    source: str = ""
+
+
+class UnionFind:
+    """Disjoint sets over ``0 … size - 1`` with path halving and union by size"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Merge the sets of ``a`` and ``b`` and return the root of the result"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+def read_records(paths, **filters):
+    """Yield a ``ParticipantRecord`` per active participant of the active events in the backups"""
+    for path in paths:
+        for _, event in BackupStream(path, sections=("events",), **filters):
+            if event.get("deletedAt"):
+                continue
+            for participant in active_participants(event):
+                yield ParticipantRecord(str(event.get("id") or ""), str(participant.get("id") or ""),
+                                        participant.get("name") or "", normalize_email(participant.get("email")),
+                                        normalize_phone(participant.get("phone")), participant.get("source") or "")
+
+
+@dataclass
+class Clusters:
+    records: list
+    groups: list  # lists of indexes into ``records``, one per person
+    ambiguous: int = 0  # name keys shared by people with different contact details
+    shared: int = 0  # emails and phones used by differently named people
+
+
+def cluster(records):
+    """Group ``records`` into people; see the module docstring for the rules"""
+    records = list(records)
+    names = [name_key(record.name) for record in records]
+    sets = UnionFind(len(records))
+    # Each email and phone maps to one record per differently named person
+    # using it, so a family sharing a number is not merged into one person
+    seen, shared = {}, set()
+    for index, record in enumerate(records):
+        for key in (record.email and f"email:{record.email}", record.phone and f"phone:{record.phone}"):
+            if not key:
+                continue
+            holders = seen.setdefault(key, [])
+            match = next((holder for holder in holders if names_match(names[holder], names[index])), None)
+            if match is None:
+                holders.append(index)
+                if len(holders) > 1:
+                    shared.add(key)
+            else:
+                sets.union(match, index)
+    # The emails and phones of each set, kept up to date for its root
+    details = {}
+    for index, record in enumerate(records):
+        emails, phones = details.setdefault(sets.find(index), (set(), set()))
+        emails.update((record.email,) if record.email else ())
+        phones.update((record.phone,) if record.phone else ())
+
+    def merge(a, b):
+        root = sets.union(a, b)
+        other = b if root == a else a
+        details[root][0].update(details[other][0])
+        details[root][1].update(details[other][1])
+        return root
+
+    by_name, by_initials = {}, {}
+    for index, key in enumerate(names):
+        if not key:
+            continue
+        if all(len(word) > 1 for word in key.split()):
+            by_name.setdefault(key, []).append(index)
+        elif not any(details[sets.find(index)]):
+            # "J Smith" without an email or phone: matched below against the full names
+            by_initials.setdefault(key, []).append(index)
+    ambiguous = 0
+    for indexes in by_name.values():
+        roots = sorted({sets.find(index) for index in indexes})
+        if len(roots) < 2:
+            continue
+        people, loose, unsure = [], [], False
+        for root in roots:
+            if not any(details[root]):
+                loose.append(root)
+                continue
+            fits = [index for index, person in enumerate(people) if _compatible(details[person], details[root])]
+            if not fits:
+                people.append(root)
+            elif len(fits) == 1:
+                people[fits[0]] = merge(people[fits[0]], root)
+            else:
+                unsure = True
+        if len(people) > 1 or unsure:
+            # Different people with one name: records without contact details join none of them
+            ambiguous += 1
+        elif people:
+            loose.append(people[0])
+        for root in loose[1:]:
+            loose[0] = merge(loose[0], root)
+    if by_initials:
+        # Each full name under the keys it abbreviates to, one word at a time
+        abbreviations = {}
+        for key, indexes in by_name.items():
+            words = key.split()
+            for position in range(len(words)):
+                short = " ".join(sorted(words[:position] + [words[position][0]] + words[position + 1:]))
+                if short in by_initials:
+                    abbreviations.setdefault(short, set()).update(sets.find(index) for index in indexes)
+        for key, indexes in by_initials.items():
+            people = {sets.find(index) for index in abbreviations.get(key, ())}
+            if len(people) > 1:
+                ambiguous += 1
+                continue
+            target = people.pop() if people else indexes[0]
+            for index in indexes:
+                target = merge(target, index)
+    groups = {}
+    for index in range(len(records)):
+        groups.setdefault(sets.find(index), []).append(index)
+    return Clusters(records, list(groups.values()), ambiguous, len(shared))
+
+
+def _compatible(details, other):
+    """False if two sets of (emails, phones) both have emails, or both phones, and share none"""
+    return all(not mine or not theirs or not mine.isdisjoint(theirs) for mine, theirs in zip(details, other))
+
+
+def person(records):
+    """Directory entry of the person behind ``records``"""
+    names = Counter(record.name for record in records if record.name)
+    # The most used spelling of the name, the longest on a tie
+    name = max(names, key=lambda name: (names[name], len(name), name)) if names else ""
+    emails = sorted({record.email for record in records if record.email})
+    phones = sorted({record.phone for record in records if record.phone})
+    # Stable across runs while the person keeps their first email or phone
+    identity = (emails or phones or [name_key(name) + "\0" + min(f"{record.event_id}/{record.participant_id}"
+                                                                  for record in records)])[0]
+    return {
+        "id": f"person-{hashlib.sha1(identity.encode('utf-8')).hexdigest()[:12]}",
+        "name": name,
+        "names": sorted(names),
+        "emails": emails,
+        "phones": phones,
+        "sources": sorted({record.source for record in records if record.source}),
+        "participants": [{"eventId": record.event_id, "participantId": record.participant_id}
+                         for record in records],
+    }
+
+
+def build_directory(clusters, sources=()):
+    people = sorted((person([clusters.records[index] for index in group]) for group in clusters.groups),
+                    key=lambda entry: (entry["name"].lower(), entry["id"]))
+    return {
+        "version": DIRECTORY_VERSION,
+        "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sources": [str(source) for source in sources],
+        "records": len(clusters.records),
+        "ambiguousNames": clusters.ambiguous,
+        "sharedContacts": clusters.shared,
+        "people": people,
+    }
+
+
+def write_directory(path, directory):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so a reader never sees a partial file
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(directory, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class Directory:
+    """Looks up the directory person of a participant of an event"""
+
+    def __init__(self, data):
+        self.people = data["people"]
+        self._by_id = {entry["id"]: entry for entry in self.people}
+        self._by_record, self._by_contact = {}, {}
+        for entry in self.people:
+            for record in entry["participants"]:
+                self._by_record[record["eventId"], record["participantId"]] = entry
+            for email in entry["emails"]:
+                self._by_contact.setdefault(f"email:{email}", entry)
+            for phone in entry["phones"]:
+                self._by_contact.setdefault(f"phone:{phone}", entry)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def find(self, event, participant):
+        """The person entry for ``participant`` of ``event``, or None if the directory does not know them
+
+        Participants added since the directory was built are matched on their
+        email or phone.
+        """
+        entry = self._by_record.get((str(event.get("id") or ""), str(participant.get("id") or "")))
+        if entry is None:
+            email, phone = normalize_email(participant.get("email")), normalize_phone(participant.get("phone"))
+            entry = (email and self._by_contact.get(f"email:{email}")) or \
+                (phone and self._by_contact.get(f"phone:{phone}")) or None
+        return entry
+
+    def key(self, event, participant):
+        """Recipient key: the person's id, or ``participant_key`` for people not in the directory"""
+        entry = self.find(event, participant)
+        return entry["id"] if entry is not None else participant_key(participant)
+
+    def person(self, key):
+        """The person entry a ``key`` result stands for, or None for a ``participant_key``"""
+        return self._by_id.get(key)
+
+
+def add_directory_arguments(parser):
+    """Add the ``--directory`` option shared by the tools that send one item per person"""
+    parser.add_argument("--directory", default=None,
+                        help="merged participant directory from docgen.dedup: one packet per person in it")
+
+
+def load_directory(path):
+    """The ``Directory`` at ``path``, or None when no directory was given"""
+    return Directory.load(path) if path else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m docgen.dedup",
+                                     description="Merge duplicate participants into one directory entry per person.")
+    parser.add_argument("backups", nargs="+", help="backup JSON files exported from the app")
+    parser.add_argument("-o", "--output", default="directory.json",
+                        help="merged participant directory (default: %(default)s)")
+    add_filter_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with tracing(args.trace, args.trace_format):
+        with span("read"):
+            records = list(read_records(args.backups, event_ids=args.event_ids, year=args.year, month=args.month,
+                                        event_types=args.event_types))
+        with span("cluster"):
+            clusters = cluster(records)
+        with span("write"):
+            directory = build_directory(clusters, args.backups)
+            write_directory(args.output, directory)
+        count("records", len(records))
+        count("people", len(clusters.groups))
+    merged = sum(1 for group in clusters.groups if len(group) > 1)
+    print(f"✅ {len(records)} participant records → {len(clusters.groups)} people "
+          f"({merged} with more than one record) in {time.perf_counter() - started:.2f}s: {args.output}")
+    if clusters.shared or clusters.ambiguous:
+        print(f"Kept apart: {clusters.shared} emails/phones used by differently named people, "
+              f"{clusters.ambiguous} names used by people with different contact details")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Per-participant changes between event snapshots
+
+A snapshot is either the app's ``EventSnapshot`` (``eventId``, ``savedAt`` and
+the full ``event``) or a row of the ``event_snapshots`` table (``event_id``,
+``snapshot_date`` and ``participants``). Each event's snapshots are ordered by
+time and every consecutive pair is diffed, plus the latest snapshot against
+the live event.
+
+Both sides of a diff are indexed by participant id, so a diff is linear in the
+number of participants and their answers. Deltas are cached by the ids of the
+two snapshots (and the live event's ``updatedAt``), in memory and optionally
+on disk, so a nightly run only diffs snapshots it has not seen before.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .backup import BackupStream, participant_key
+
+DELTA_VERSION = "1"
+
+LIVE = "live"
+
+
+@dataclass(frozen=True)
+class ParticipantDelta:
+    participant_id: str
+    name: str
+    change: str  # "added", "removed" or "changed"
+    available: tuple = ()  # dates newly marked available
+    unavailable: tuple = ()  # dates newly marked unavailable
+    cleared: tuple = ()  # dates whose answer was withdrawn
+    rsvp: tuple = ()  # (before, after) when the RSVP changed
+    all_month: tuple = ()  # (before, after) when "unavailable all month" changed
+
+
+@dataclass(frozen=True)
+class EventDelta:
+    event_id: str
+    name: str
+    before: str  # savedAt of the earlier snapshot
+    after: str  # savedAt of the later snapshot, or "live"
+    participants: tuple = field(default_factory=tuple)
+
+    def count(self, change):
+        return sum(1 for delta in self.participants if delta.change == change)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["event_id"], data["name"], data["before"], data["after"],
+                   tuple(ParticipantDelta(**{key: tuple(value) if isinstance(value, list) else value
+                                             for key, value in delta.items()})
+                         for delta in data["participants"]))
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    snapshot_id: str
+    event_id: str
+    name: str
+    saved_at: str
+
+
+def snapshot_info(snapshot):
+    """Identity and timestamp of a snapshot in either the app or the database shape"""
+    event = snapshot.get("event") or {}
+    event_id = snapshot.get("eventId") or snapshot.get("event_id") or event.get("id") or ""
+    saved_at = snapshot.get("savedAt") or snapshot.get("snapshot_date") or snapshot.get("created_at") or ""
+    # ``name`` on an EventSnapshot is the user's label for the snapshot, not the event name
+    return SnapshotInfo(str(snapshot.get("id") or f"{event_id}@{saved_at}"), str(event_id),
+                        event.get("name") or snapshot.get("event_name") or "", saved_at)
+
+
+def snapshot_participants(snapshot):
+    event = snapshot.get("event")
+    return (event.get("participants") if isinstance(event, dict) else snapshot.get("participants")) or []
+
+
+def index_participants(participants):
+    """Map participant id to participant, leaving out soft-deleted ones"""
+    return {str(participant.get("id") or participant_key(participant)): participant
+            for participant in participants if not participant.get("deletedAt")}
+
+
+def diff_participant(participant_id, before, after):
+    """Return the ``ParticipantDelta`` between two states of one participant, or None"""
+    old, new = before.get("availability") or {}, after.get("availability") or {}
+    available, unavailable, cleared = [], [], []
+    for date in sorted(old.keys() | new.keys()):
+        was, now = old.get(date), new.get(date)
+        if was == now:
+            continue
+        if now is None:
+            cleared.append(date)
+        elif now:
+            available.append(date)
+        else:
+            unavailable.append(date)
+    rsvp = (before.get("rsvpStatus") or "no-response", after.get("rsvpStatus") or "no-response")
+    all_month = (bool(before.get("unavailableAllMonth")), bool(after.get("unavailableAllMonth")))
+    delta = ParticipantDelta(participant_id, after.get("name") or before.get("name") or "", "changed",
+                             tuple(available), tuple(unavailable), tuple(cleared),
+                             rsvp if rsvp[0] != rsvp[1] else (), all_month if all_month[0] != all_month[1] else ())
+    return delta if available or unavailable or cleared or delta.rsvp or delta.all_month else None
+
+
+def diff_participants(before, after):
+    """Diff two ``index_participants`` maps and return the deltas ordered by name"""
+    deltas = []
+    for participant_id, participant in after.items():
+        previous = before.get(participant_id)
+        if previous is None:
+            deltas.append(ParticipantDelta(participant_id, participant.get("name") or "", "added"))
+        else:
+            delta = diff_participant(participant_id, previous, participant)
+            if delta is not None:
+                deltas.append(delta)
+    for participant_id in before.keys() - after.keys():
+        deltas.append(ParticipantDelta(participant_id, before[participant_id].get("name") or "", "removed"))
+    return tuple(sorted(deltas, key=lambda delta: (delta.name.lower(), delta.participant_id)))
+
+
+def delta_key(before_id, after_id):
+    """Cache key for the delta between two snapshot (or live event) versions"""
+    return hashlib.sha256(f"{DELTA_VERSION}\0{before_id}\0{after_id}".encode("utf-8")).hexdigest()
+
+
+class DeltaCache:
+    """Memory map plus optional on-disk store of computed deltas"""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else None
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        """Return the cached ``EventDelta`` for ``key``, or None"""
+        delta = self._memory.get(key)
+        if delta is None and self.directory is not None:
+            path = self.directory / f"{key}.json"
+            if path.exists():
+                delta = self._memory[key] = EventDelta.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        if delta is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return delta
+
+    def put(self, key, delta):
+        self._memory[key] = delta
+        if self.directory is not None:
+            # Write then rename so a concurrent reader never sees a partial file
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(asdict(delta), f)
+            os.replace(tmp, self.directory / f"{key}.json")
+
+
+def _live_version(event):
+    if event.get("updatedAt"):
+        return f"{event['id']}@{event['updatedAt']}"
+    data = json.dumps(event.get("participants") or [], sort_keys=True).encode("utf-8")
+    return f"{event['id']}#{hashlib.sha256(data).hexdigest()}"
+
+
+def event_deltas(paths, cache=None, live=True, since="", **filters):
+    """Return the ``EventDelta`` of every consecutive snapshot pair in the backups at ``paths``
+
+    With ``live`` each event's latest snapshot is also compared with the event
+    itself. ``since`` keeps only deltas whose later side was saved at or after
+    that ISO timestamp. ``filters`` are the ``BackupStream`` event filters.
+    Snapshots are streamed: the first pass reads only their ids and dates, and
+    the participants of a snapshot are kept only if one of its deltas is not
+    cached.
+    """
+    cache = cache or DeltaCache()
+    timelines, events = {}, {}
+    sections = ("snapshots", "events") if live else ("snapshots",)
+    for path in paths:
+        for section, record in BackupStream(path, sections=sections, **filters):
+            if section == "events":
+                if not record.get("deletedAt"):
+                    events[str(record.get("id"))] = record
+            else:
+                info = snapshot_info(record)
+                # Overlapping backups repeat the same snapshot; keep one per id
+                timelines.setdefault(info.event_id, {})[info.snapshot_id] = info
+
+    pairs = []  # (key, event_id, name, before, after) with SnapshotInfo or a live event as ``after``
+    for event_id, snapshots in timelines.items():
+        infos = sorted(snapshots.values(), key=lambda info: (info.saved_at, info.snapshot_id))
+        for before, after in zip(infos, infos[1:]):
+            pairs.append((delta_key(before.snapshot_id, after.snapshot_id), event_id, after.name, before, after))
+        event = events.get(event_id)
+        if event is not None:
+            pairs.append((delta_key(infos[-1].snapshot_id, _live_version(event)), event_id,
+                          event.get("name") or infos[-1].name, infos[-1], event))
+
+    results, missing = {}, []
+    for pair in pairs:
+        after = pair[4]
+        if since and isinstance(after, SnapshotInfo) and after.saved_at < since:
+            continue
+        delta = cache.get(pair[0])
+        if delta is None:
+            missing.append(pair)
+        else:
+            results[pair[0]] = delta
+    if missing:
+        wanted = {info.snapshot_id for pair in missing for info in pair[3:] if isinstance(info, SnapshotInfo)}
+        states = {}
+        for path in paths:
+            for _, record in BackupStream(path, sections=("snapshots",), **filters):
+                info = snapshot_info(record)
+                if info.snapshot_id in wanted:
+                    states[info.snapshot_id] = index_participants(snapshot_participants(record))
+        for key, event_id, name, before, after in missing:
+            if isinstance(after, SnapshotInfo):
+                after_label, after_state = after.saved_at, states[after.snapshot_id]
+            else:
+                after_label, after_state = LIVE, index_participants(after.get("participants") or [])
+            delta = EventDelta(event_id, name, before.saved_at, after_label,
+                               diff_participants(states[before.snapshot_id], after_state))
+            cache.put(key, delta)
+            results[key] = delta
+    return [results[pair[0]] for pair in pairs if pair[0] in results]
@@ -0,0 +1,277 @@
+"""iCalendar feeds for the events in a backup
+
+    python -m docgen.ics ../Backups/gathersync-backup-2025-12-21.json -o feeds --per user
+
+Writes one ``.ics`` feed per event (``--per event``) or per participant with
+all of their events (``--per user``). Events follow ``lib/calendar-export.ts``:
+a flexible event is an all-day event on its first best day, a fixed event sits
+on its fixed date (and time, when set). UIDs are derived from the event id so
+calendar clients update a subscribed event instead of duplicating it.
+
+Each VEVENT is rendered once per ``id`` + ``updatedAt`` and cached in memory
+and under ``--cache``, so a run only renders events that changed since the
+previous one. Feeds are streamed to disk a VEVENT at a time.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from .availability import summarise_flexible
+from .backup import BackupStream, Recipient, active_participants, add_filter_arguments, participant_key
+from .dedup import add_directory_arguments, load_directory
+from .trace import add_trace_arguments, count, span, tracing
+
+ICS_VERSION = "1"
+
+PRODID = "-//GatherSync//Event Calendar//EN"
+
+HEADER = "\r\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN",
+                      "METHOD:PUBLISH"]) + "\r\n"
+FOOTER = "END:VCALENDAR\r\n"
+
+_SAFE_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def escape_text(text):
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)"""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold(line):
+    """Fold a content line to at most 75 octets per physical line"""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        # Never split a UTF-8 sequence: back up over continuation bytes
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _stamp(iso):
+    """UTC ``DTSTAMP`` value for an ISO timestamp such as ``updatedAt``, or "" if it does not parse
+
+    Timestamps with an offset are converted to UTC; naive ones are taken as UTC.
+    """
+    try:
+        moment = datetime.fromisoformat(iso)
+    except (TypeError, ValueError):
+        return ""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return f"{moment:%Y%m%dT%H%M%S}Z"
+
+
+def best_day(event):
+    """Return ``(date, available, total)`` for the first best day of a flexible event, or None
+
+    Uses the best dates of ``availability.summarise_flexible`` so a feed and
+    the report always agree.
+    """
+    summary, = summarise_flexible([event], top=0)
+    if not summary.best:
+        return None
+    day = summary.best[0]
+    return date.fromisoformat(day), summary.available[summary.days.index(day)], summary.participants
+
+
+def vevent(event, exported_at=""):
+    """Render the VEVENT block of ``event``, or "" when it has no date yet
+
+    DTSTAMP is the event's ``updatedAt`` or ``createdAt``, else the backup's
+    ``exported_at``, else the current time: RFC 5545 requires one on every VEVENT.
+    """
+    participants = [participant.get("name") or "" for participant in active_participants(event)]
+    if event.get("eventType") == "fixed":
+        if not event.get("fixedDate"):
+            return ""
+        day = date.fromisoformat(event["fixedDate"])
+        statuses = [participant.get("rsvpStatus") for participant in active_participants(event)]
+        attending = statuses.count("attending")
+        summary = (f"{attending} attending, {statuses.count('not-attending')} not attending, "
+                   f"{len(statuses) - attending - statuses.count('not-attending')} no response")
+    else:
+        if not (event.get("year") and event.get("month")):
+            return ""
+        best = best_day(event)
+        if best is None:
+            return ""
+        day, available, total = best
+        summary = f"{available} out of {total} participants available"
+    description = summary + "\n\nParticipants:\n" + "\n".join(participants)
+    lines = ["BEGIN:VEVENT", f"UID:{event['id']}@gathersync.app"]
+    stamp = (_stamp(event.get("updatedAt") or event.get("createdAt") or exported_at)
+             or f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}Z")
+    lines.append(f"DTSTAMP:{stamp}")
+    if event.get("eventType") == "fixed" and event.get("fixedTime"):
+        hours, minutes = event["fixedTime"].split(":")[:2]
+        lines.append(f"DTSTART:{day:%Y%m%d}T{int(hours):02d}{int(minutes):02d}00")
+    else:
+        # DTEND of an all-day event is exclusive
+        lines += [f"DTSTART;VALUE=DATE:{day:%Y%m%d}", f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}"]
+    lines += [f"SUMMARY:{escape_text(event.get('name') or '')}", f"DESCRIPTION:{escape_text(description)}",
+              "STATUS:CONFIRMED", "SEQUENCE:0", "END:VEVENT"]
+    return "".join(fold(line) for line in lines)
+
+
+def event_version(event):
+    """Cache key for the rendered VEVENT of ``event``"""
+    if event.get("updatedAt"):
+        version = f"{event['id']}@{event['updatedAt']}"
+    else:
+        version = json.dumps(event, sort_keys=True)
+    return hashlib.sha256(f"{ICS_VERSION}\0{version}".encode("utf-8")).hexdigest()
+
+
+class VEventCache:
+    """Memory map plus optional on-disk store of rendered VEVENT blocks"""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else None
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def render(self, event, exported_at=""):
+        """Return the VEVENT of ``event``, rendering it only if its version is not cached"""
+        key = event_version(event)
+        text = self._memory.get(key)
+        if text is None and self.directory is not None:
+            path = self.directory / f"{key}.ics"
+            if path.exists():
+                # newline="" keeps the CRLF line endings iCalendar requires
+                with open(path, encoding="utf-8", newline="") as f:
+                    text = self._memory[key] = f.read()
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        text = self._memory[key] = vevent(event, exported_at)
+        if self.directory is not None:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+            os.replace(tmp, self.directory / f"{key}.ics")
+        return text
+
+
+def write_feed(path, blocks):
+    """Stream a VCALENDAR holding ``blocks`` to ``path`` and return its size in bytes"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    size = 0
+    with os.fdopen(fd, "wb") as f:
+        for text in (HEADER, *blocks, FOOTER):
+            size += f.write(text.encode("utf-8"))
+    os.replace(tmp, path)
+    return size
+
+
+def event_stem(event):
+    """File name stem of an event's feed, from its id alone so renaming keeps the same file"""
+    event_id = str(event["id"])
+    if not _SAFE_ID.fullmatch(event_id):
+        event_id = hashlib.sha1(event_id.encode("utf-8")).hexdigest()[:12]
+    return f"event-{event_id}"
+
+
+def write_feeds(paths, out_dir, per="event", cache=None, directory=None, **filters):
+    """Write the feeds for the events in the backups at ``paths`` and return ``{path: bytes}``
+
+    Per-event feeds are written as the events are read. Per-user feeds need
+    every event first, so only the rendered VEVENTs and each person's event
+    ids are kept until the end, not the events themselves. With a
+    ``dedup.Directory`` there is one per-user feed per directory person.
+
+    An event found in several backups is exported once, as the copy with the
+    latest ``updatedAt`` (the first read on a tie): a per-event feed is
+    rewritten when a newer copy is read, and per-user feeds list the
+    participants of the newest copy.
+    """
+    cache = cache or VEventCache()
+    out_dir = Path(out_dir)
+    written = {}
+    versions, blocks, attendees, people = {}, {}, {}, {}
+    for path in paths:
+        stream = BackupStream(path, sections=("events",), **filters)
+        for _, event in stream:
+            if event.get("deletedAt"):
+                continue
+            event_id, updated = str(event["id"]), str(event.get("updatedAt") or "")
+            if event_id in versions and updated <= versions[event_id]:
+                continue
+            versions[event_id] = updated
+            text = cache.render(event, stream.header.get("exportedAt") or "")
+            if per == "event":
+                target = str(out_dir / f"{event_stem(event)}.ics")
+                if text:
+                    written[target] = write_feed(target, [text])
+                elif written.pop(target, None) is not None:
+                    os.remove(target)  # the newer copy has no date yet
+                continue
+            blocks[event_id] = text
+            keys = attendees[event_id] = []
+            for participant in active_participants(event):
+                key = directory.key(event, participant) if directory is not None else participant_key(participant)
+                if key not in people:
+                    entry = directory.person(key) if directory is not None else None
+                    name = (participant.get("name") or "") if entry is None else entry["name"]
+                    people[key] = Recipient(key, name)
+                keys.append(key)
+    members = {}
+    for event_id, keys in attendees.items():
+        for key in dict.fromkeys(keys):
+            members.setdefault(key, []).append(event_id)
+    for key, event_ids in members.items():
+        target = out_dir / f"{people[key].stem}.ics"
+        written[str(target)] = write_feed(target, [blocks[event_id] for event_id in event_ids if blocks[event_id]])
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m docgen.ics",
+                                     description="Write iCalendar feeds for the events in backups.")
+    parser.add_argument("backups", nargs="+", help="backup JSON files exported from the app")
+    parser.add_argument("-o", "--out-dir", default="feeds", help="directory for the feeds (default: %(default)s)")
+    parser.add_argument("--per", choices=("event", "user"), default="event",
+                        help="one feed per event or per participant (default: %(default)s)")
+    parser.add_argument("--cache", default=".cache/docgen/ics",
+                        help="directory for rendered VEVENTs (default: %(default)s)")
+    add_filter_arguments(parser)
+    add_directory_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+
+    cache = VEventCache(args.cache)
+    started = time.perf_counter()
+    with tracing(args.trace, args.trace_format):
+        with span("feeds", format="ics"):
+            written = write_feeds(args.backups, args.out_dir, args.per, cache, load_directory(args.directory),
+                                  event_ids=args.event_ids, year=args.year, month=args.month,
+                                  event_types=args.event_types)
+        count("documents", len(written), format="ics")
+        count("bytes", sum(written.values()), format="ics")
+        count("vevents", cache.misses, format="ics")
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(written)} feeds written to {args.out_dir}: {sum(written.values()):,} bytes in {elapsed:.2f}s "
+          f"({cache.misses} events rendered, {cache.hits} cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Build manifest for incremental rebuilds
+
+Every output is fingerprinted from everything that can change its bytes: the
+content source, the values it is rendered with (QR payload, recipient, events),
+the theme, the embedded images, the renderer selected for its format and the
+generator code itself. The manifest stores the fingerprint each output was last
+built from, so a rerun only re-renders outputs whose inputs changed.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from .content import expand
+from .qr import qr_key
+from .renderers import RENDERERS
+from .theme import DEFAULT_THEME
+
+GENERATOR_VERSION = "1"
+
+MANIFEST_NAME = ".docgen-manifest.json"
+
+
+def _digest(value):
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def generator_digest():
+    """Hash of the generator version and every module in the package"""
+    sha = hashlib.sha256(GENERATOR_VERSION.encode("ascii"))
+    package = Path(__file__).parent
+    for path in sorted(package.rglob("*.py")):
+        sha.update(str(path.relative_to(package)).encode("utf-8"))
+        sha.update(path.read_bytes())
+    return sha.hexdigest()
+
+
+def _image_keys(blocks, assets, values):
+    for block in blocks:
+        if block.kind == "qr":
+            yield qr_key(expand(block.payload, values), block.size, error_correction=block.error_correction)
+        elif block.kind == "image":
+            yield assets.load(block.src)[0]
+
+
+def fingerprint(fmt, document, assets, values, theme=DEFAULT_THEME):
+    """Fingerprint of every input that determines one output's bytes"""
+    return _digest({
+        "format": fmt,
+        "renderer": RENDERERS.get(fmt),
+        "content": document.digest,
+        "values": values,
+        "theme": theme.digest,
+        "images": list(_image_keys(document.blocks, assets, values)),
+        "size": assets.size.digest if assets.size is not None else None,
+        "generator": generator_digest(),
+    })
+
+
+class Manifest:
+    """Fingerprints of the outputs in one directory, persisted as JSON"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.hits = []
+        self.misses = []
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    @classmethod
+    def for_dir(cls, out_dir):
+        return cls(Path(out_dir) / MANIFEST_NAME)
+
+    def _key(self, output):
+        return Path(output).name if Path(output).parent == self.path.parent else str(output)
+
+    def is_fresh(self, output, digest):
+        """Return True (and count a hit) if ``output`` was built from ``digest``"""
+        if Path(output).exists() and self.entries.get(self._key(output)) == digest:
+            self.hits.append(str(output))
+            return True
+        self.misses.append(str(output))
+        return False
+
+    def record(self, output, digest):
+        self.entries[self._key(output)] = digest
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def summary(self):
+        return f"{len(self.hits)} up to date, {len(self.misses)} rebuilt"
@@ -0,0 +1,100 @@
+"""Size-optimised output for packets that are sent as email attachments
+
+A ``SizeProfile`` given to ``AssetCache(size=...)`` switches every renderer to
+its smallest output:
+
+- images are downsampled to ``dpi`` at the width they are drawn and
+  recompressed; black-and-white images (QR codes) stay one bit per pixel and
+  are only shrunk by whole factors so their modules stay square
+- PDFs embed one-bit images as one-bit, drop the ASCII85 layer from their
+  compressed streams and draw characters the base font lacks (emoji) from a
+  symbol font, of which only the glyphs used are embedded
+- DOCX files leave out optional package parts and are recompressed
+
+``baseline_sizes`` builds the normal output in a scratch directory so a run
+can report its bytes before and after.
+"""
+
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class SizeProfile:
+    dpi: int = 150
+    jpeg_quality: int = 85
+
+    @property
+    def digest(self):
+        return f"{self.dpi}:{self.jpeg_quality}"
+
+
+def is_bilevel(image):
+    """True if ``image`` is opaque and only black and white"""
+    if image.mode == "1":
+        return True
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        return False
+    colors = image.convert("L").getcolors(2)
+    return colors is not None and {value for _, value in colors} <= {0, 255}
+
+
+def optimize_image(data, width, profile):
+    """Return image ``data`` resampled for ``width`` inches at ``profile.dpi`` and recompressed"""
+    from PIL import Image
+
+    image = Image.open(BytesIO(data))
+    image.load()
+    target = max(1, round(width * profile.dpi))
+    buffer = BytesIO()
+    if is_bilevel(image):
+        image = image.convert("L").convert("1", dither=Image.Dither.NONE)
+        factor = image.width // target
+        if factor >= 2:
+            image = image.resize((image.width // factor, image.height // factor), Image.Resampling.NEAREST)
+        image.save(buffer, "PNG", optimize=True)
+        return buffer.getvalue()
+    resized = image.width > target
+    if resized:
+        image = image.resize((target, max(1, round(image.height * target / image.width))),
+                             Image.Resampling.LANCZOS)
+    if image.mode in ("RGBA", "LA", "P") or "transparency" in image.info:
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.convert("RGB").save(buffer, "JPEG", quality=profile.jpeg_quality, optimize=True)
+    return buffer.getvalue() if resized or buffer.tell() < len(data) else data
+
+
+def optimized_key(key, width, profile):
+    """Content address of an image optimised for ``width`` inches"""
+    return hashlib.sha256(f"{key}\0{width}\0{profile.digest}".encode("utf-8")).hexdigest()
+
+
+def baseline_sizes(formats, document=None, variables=None, stem=None):
+    """Return ``{format: bytes}`` for ``formats`` built without size optimisation
+
+    The outputs are built in a temporary directory and discarded; this is the
+    "before" figure that size-optimised runs report against.
+    """
+    from .build import build
+
+    with tempfile.TemporaryDirectory() as scratch:
+        return {fmt: Path(path).stat().st_size
+                for fmt, path in build(formats, scratch, document, variables=variables, stem=stem).items()}
+
+
+def saving(before, after):
+    """Describe a size change, e.g. ``18,349 → 7,717 bytes (-58%)``"""
+    change = f" ({100 * (after - before) / before:+.0f}%)" if before else ""
+    return f"{before:,} → {after:,} bytes{change}"
+
+
+def add_size_arguments(parser):
+    """Add the ``--optimize-size`` options shared by the command line tools"""
+    parser.add_argument("--optimize-size", action="store_true",
+                        help="make outputs as small as possible (for email attachments) and report the saving")
+    parser.add_argument("--dpi", type=int, default=SizeProfile.dpi,
+                        help="image resolution in size-optimised outputs (default: %(default)s)")
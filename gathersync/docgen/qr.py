@@ -0,0 +1,83 @@
+"""In-process QR code rendering with a content-addressed cache
+
+Each QR image is identified by a SHA-256 of its payload, module size, border
+and error-correction level. The cache keeps recently used images in memory and
+can also persist them to a directory shared by every worker process, so a
+payload is only ever encoded and rasterised once.
+"""
+
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+
+ERROR_CORRECTION = ("L", "M", "Q", "H")
+
+
+def qr_key(payload, box_size=10, border=4, error_correction="M"):
+    """Content address for a QR image"""
+    spec = f"{payload}\0{box_size}\0{border}\0{error_correction}"
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+
+def qr_png(payload, box_size=10, border=4, error_correction="M"):
+    """Encode ``payload`` as a QR code and return PNG bytes"""
+    import qrcode
+    from qrcode import constants
+
+    if error_correction not in ERROR_CORRECTION:
+        raise ValueError(f"error correction must be one of {', '.join(ERROR_CORRECTION)}")
+    qr = qrcode.QRCode(box_size=box_size, border=border,
+                       error_correction=getattr(constants, f"ERROR_CORRECT_{error_correction}"))
+    qr.add_data(payload)
+    qr.make(fit=True)
+    buffer = BytesIO()
+    qr.make_image().save(buffer)
+    return buffer.getvalue()
+
+
+class QRCache:
+    """Memory LRU plus optional on-disk store of rendered QR images"""
+
+    def __init__(self, directory=None, max_entries=256):
+        self.directory = Path(directory) if directory else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, payload, box_size=10, border=4, error_correction="M"):
+        """Return ``(key, png_bytes)`` for a QR image, rendering it on a miss"""
+        key = qr_key(payload, box_size, border, error_correction)
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return key, data
+        path = self.directory / f"{key}.png" if self.directory else None
+        if path is not None and path.exists():
+            data = path.read_bytes()
+            self.hits += 1
+        else:
+            data = qr_png(payload, box_size, border, error_correction)
+            self.misses += 1
+            if path is not None:
+                self._write(path, data)
+        self._remember(key, data)
+        return key, data
+
+    def _remember(self, key, data):
+        self._memory[key] = data
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _write(self, path, data):
+        # Write then rename so concurrent workers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
@@ -0,0 +1,56 @@
+"""Pluggable output renderers
+
+Each renderer module exposes ``render(document, path, assets, values, theme)``
+and may expose ``warm(theme)`` to compile its per-theme caches ahead of time.
+Modules are imported on first use so building one format never pays for the
+libraries behind the others. ``use_fast_docx`` swaps in ``word_fast`` for
+DOCX; until its output is checked to match ``word`` in every case it is opt-in
+(``--fast-docx``).
+"""
+
+import sys
+from importlib import import_module
+
+from ..theme import DEFAULT_THEME
+from ..trace import span
+
+RENDERERS = {
+    "pdf": "docgen.renderers.pdf",
+    "docx": "docgen.renderers.word",
+    "md": "docgen.renderers.markdown",
+    "html": "docgen.renderers.html",
+}
+
+FAST_DOCX = "docgen.renderers.word_fast"
+
+
+def use_fast_docx(enabled=True):
+    """Render DOCX with the fast package writer, or with python-docx again when not ``enabled``"""
+    RENDERERS["docx"] = FAST_DOCX if enabled else "docgen.renderers.word"
+
+
+def add_renderer_arguments(parser):
+    """Add the ``--fast-docx`` option shared by the command line tools"""
+    parser.add_argument("--fast-docx", action="store_true",
+                        help="write DOCX with the fast package writer instead of python-docx's object model")
+
+
+def get_renderer(fmt):
+    """Return the renderer module for ``fmt``"""
+    try:
+        name = RENDERERS[fmt]
+    except KeyError:
+        raise ValueError(f"unknown output format '{fmt}' (choose from {', '.join(RENDERERS)})") from None
+    module = sys.modules.get(name)
+    if module is None:
+        with span("import", format=fmt):
+            module = import_module(name)
+    return module
+
+
+def warm(formats, theme=DEFAULT_THEME):
+    """Import the renderers for ``formats`` and prepare their cached styles"""
+    for fmt in formats:
+        renderer = get_renderer(fmt)
+        if hasattr(renderer, "warm"):
+            renderer.warm(theme)
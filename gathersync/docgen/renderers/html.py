@@ -0,0 +1,102 @@
+"""Render a document tree to a standalone HTML page"""
+
+import base64
+from functools import lru_cache
+from html import escape
+
+from ..content import expand
+from ..theme import DEFAULT_THEME, style_for
+from ..trace import count
+
+
+def inline(runs, values):
+    """Convert runs to HTML inline markup"""
+    parts = []
+    for run in runs:
+        text = escape(expand(run.text, values))
+        if run.bold:
+            text = f"<strong>{text}</strong>"
+        if run.italic:
+            text = f"<em>{text}</em>"
+        parts.append(text)
+    return "".join(parts)
+
+
+@lru_cache(maxsize=8)
+def stylesheet(theme=DEFAULT_THEME):
+    """Build the page CSS from ``theme``"""
+    rules = [f"body {{ font-family: {theme.font}, Arial, sans-serif; max-width: 7in; margin: 0.75in auto; }}"]
+    for role, spec in theme.styles.items():
+        declarations = [f"font-size: {spec.size:g}pt", f"color: {theme.colors[spec.color]}"]
+        if spec.bold:
+            declarations.append("font-weight: bold")
+        if spec.mono:
+            declarations.append(f"font-family: monospace; background: {theme.colors['code_background']}; padding: 10px")
+        rules.append(f".{role} {{ {'; '.join(declarations)}; }}")
+    rules.append(f".table {{ border-collapse: collapse; font-size: {theme.styles['small'].size:g}pt; }}")
+    rules.append(f".table th, .table td {{ border: 1px solid {theme.colors['muted']}; padding: 3px 8px; "
+                 f"text-align: left; }}")
+    rules.append(f".table th {{ background: {theme.colors['code_background']}; }}")
+    rules.append(".center { text-align: center; }")
+    rules.append(".page-break { break-after: page; border: 0; }")
+    return "\n".join(rules)
+
+
+def warm(theme=DEFAULT_THEME):
+    """Build the stylesheet for ``theme`` before the first document needs it"""
+    stylesheet(theme)
+
+
+def _list_html(block, values):
+    tag = "ol" if block.ordered else "ul"
+    start = f' start="{block.start}"' if block.ordered and block.start != 1 else ""
+    items = []
+    for item in block.items:
+        children = _list_html(item.children, values) if item.children is not None else ""
+        items.append(f"<li>{inline(item.runs, values)}{children}</li>")
+    return f'<{tag} class="body"{start}>{"".join(items)}</{tag}>'
+
+
+def _table_html(block, values):
+    header, *body = block.rows
+    head = "".join(f"<th>{escape(expand(cell, values))}</th>" for cell in header)
+    rows = "".join("<tr>" + "".join(f"<td>{escape(expand(cell, values))}</td>" for cell in row) + "</tr>"
+                   for row in body)
+    return f'<table class="table"><thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>'
+
+
+def elements(document, assets, values):
+    """Yield HTML elements for ``document``"""
+    for block in document.blocks:
+        if block.kind == "page_break":
+            yield '<hr class="page-break">'
+        elif block.kind == "rule":
+            yield "<hr>"
+        elif block.kind == "list":
+            yield _list_html(block, values)
+        elif block.kind == "table":
+            yield _table_html(block, values)
+        elif block.kind in ("image", "qr"):
+            src = block.src
+            if block.kind == "qr":
+                key, data = assets.image(block, values)
+                src = assets.shared(("html", key),
+                                    lambda: "data:image/png;base64," + base64.b64encode(data).decode("ascii"))
+            count("images", format="html")
+            yield (f'<p class="center"><img src="{escape(src)}" alt="{escape(block.text)}" '
+                   f'style="width: {block.width}in"></p>')
+        elif block.kind == "code":
+            yield f'<pre class="code">{escape(expand(block.text, values))}</pre>'
+        else:
+            tag = {"title": "h1", "subtitle": "p", "heading": f"h{block.level}"}.get(block.kind, "p")
+            classes = style_for(block) + (" center" if block.align == "center" else "")
+            yield f'<{tag} class="{classes}">{inline(block.runs, values)}</{tag}>'
+
+
+def render(document, path, assets, values, theme=DEFAULT_THEME):
+    """Write ``document`` to ``path`` as HTML"""
+    body = "\n".join(elements(document, assets, values))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+                f"<title>{escape(document.title)}</title>\n<style>\n{stylesheet(theme)}\n</style>\n"
+                f"</head>\n<body>\n{body}\n</body>\n</html>\n")
@@ -0,0 +1,89 @@
+"""Render a document tree to Markdown
+
+QR codes are written next to the Markdown file and named after it
+(``<name>-qr.png``), so rebuilding a document overwrites its image instead of
+leaving the previous code behind.
+"""
+
+from pathlib import Path
+
+from ..content import expand
+from ..trace import count
+
+
+def inline(runs, values):
+    """Convert runs back to Markdown inline markup"""
+    parts = []
+    for run in runs:
+        text = expand(run.text, values)
+        if run.bold:
+            text = f"**{text}**"
+        if run.italic:
+            text = f"*{text}*"
+        parts.append(text)
+    return "".join(parts)
+
+
+def _list_lines(block, values, indent=""):
+    for number, item in enumerate(block.items, block.start):
+        marker = f"{number}." if block.ordered else "-"
+        yield f"{indent}{marker} {inline(item.runs, values)}"
+        if item.children is not None:
+            yield from _list_lines(item.children, values, indent + "   ")
+
+
+def _table_lines(block, values):
+    def row_line(row):
+        return "| " + " | ".join(expand(cell, values).replace("|", "\\|") for cell in row) + " |"
+
+    header, *body = block.rows
+    yield row_line(header)
+    yield "|" + " --- |" * len(header)
+    for row in body:
+        yield row_line(row)
+
+
+def _qr_file(block, path, number, assets, values):
+    data = assets.image(block, values)[1]
+    count("images", format="md")
+    image = path.with_name(f"{path.stem}-qr{'' if number == 1 else f'-{number}'}.png")
+    if not image.exists() or image.read_bytes() != data:
+        image.write_bytes(data)
+    return image.name
+
+
+def lines(document, values, assets=None, path=None):
+    """Yield Markdown paragraphs for ``document``, writing QR images next to ``path`` if given"""
+    codes = 0
+    for block in document.blocks:
+        if block.kind == "page_break":
+            continue
+        elif block.kind == "rule":
+            yield "---"
+        elif block.kind == "list":
+            yield "\n".join(_list_lines(block, values))
+        elif block.kind == "table":
+            yield "\n".join(_table_lines(block, values))
+        elif block.kind == "image":
+            yield f"![{block.text}]({block.src})"
+        elif block.kind == "qr" and assets is not None and path is not None:
+            codes += 1
+            yield f"![{block.text}]({_qr_file(block, Path(path), codes, assets, values)})"
+        elif block.kind == "qr":
+            yield f"[{block.text or 'Open GatherSync'}]({expand(block.payload, values)})"
+        elif block.kind == "code":
+            yield f"```\n{expand(block.text, values)}\n```"
+        elif block.kind == "title":
+            yield f"# {inline(block.runs, values)}"
+        elif block.kind == "heading" and block.level < 4:
+            yield f"{'#' * block.level} {inline(block.runs, values)}"
+        elif block.kind in ("heading", "subtitle") and not any(run.bold for run in block.runs):
+            yield f"**{inline(block.runs, values)}**"
+        else:
+            yield inline(block.runs, values)
+
+
+def render(document, path, assets, values, theme=None):
+    """Write ``document`` to ``path`` as Markdown (plain text takes no theme)"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(lines(document, values, assets, path)) + "\n")
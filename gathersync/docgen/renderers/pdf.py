@@ -0,0 +1,395 @@
+"""Render a document tree to PDF with reportlab"""
+
+import os
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab import rl_config
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfdoc import PDFImageXObject
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import (Flowable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table,
+                                TableStyle)
+
+from ..content import expand
+from ..theme import DEFAULT_THEME, style_for
+from ..trace import count, span
+
+_PARENTS = {"title": "Heading1", "subtitle": "Heading2", "heading2": "Heading2",
+            "heading3": "Heading3", "code": "BodyText"}
+
+# Emoji fonts tried, in order, for characters the theme font cannot draw;
+# reportlab embeds only the glyphs a document uses
+SYMBOL_FONTS = (
+    "/usr/share/fonts/truetype/noto/NotoEmoji-Regular.ttf",
+    "/usr/share/fonts/truetype/ancient-scripts/Symbola_hint.ttf",
+    "/System/Library/Fonts/Apple Symbols.ttf",
+    "C:/Windows/Fonts/seguisym.ttf",
+)
+
+# Stand-ins for emoji no installed font has, drawn from the standard
+# ZapfDingbats font, which PDF readers supply so nothing is embedded
+SYMBOL_FALLBACKS = {"✅": "✔", "❌": "✘", "❓": "?", "🎉": "★"}
+
+_VARIATION_SELECTOR = "\ufe0f"
+
+
+class SharedImage(Flowable):
+    """Centred image drawn from an ``ImageReader`` shared between documents
+
+    reportlab names image XObjects by a digest of their pixels, so every use of
+    the same image inside one PDF refers to a single embedded object.
+    """
+
+    def __init__(self, reader, width, height):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+        self.hAlign = "CENTER"
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height, mask="auto")
+
+
+def _one_bit_xobjects(canv):
+    """True if ``canv`` has the reportlab internals ``_draw_one_bit`` uses"""
+    doc = getattr(canv, "_doc", None)
+    return (all(hasattr(doc, name) for name in ("getXObjectName", "idToObject", "Reference", "addForm"))
+            and hasattr(canv, "_setXObjects") and hasattr(canv, "_currentPageHasImages"))
+
+
+def _draw_one_bit(canv, key, image, width, height):
+    """Draw a mode ``"1"`` PIL ``image`` as a one-bit image XObject named by ``key``
+
+    reportlab has no public way to embed a one-bit image, so this is the only
+    place that registers an XObject through its internals (as ``drawImage``
+    does, checked against reportlab 5.0). On a canvas without them the image
+    is drawn with ``drawImage``, in eight bits.
+    """
+    if not _one_bit_xobjects(canv):
+        canv.drawImage(ImageReader(image), 0, 0, width, height)
+        return
+    doc = canv._doc
+    name = doc.getXObjectName(key)
+    if doc.idToObject.get(name) is None:
+        xobject = PDFImageXObject(key)
+        xobject.width, xobject.height = image.size
+        xobject.bitsPerComponent = 1
+        xobject.colorSpace = "DeviceGray"
+        # PIL packs mode "1" rows most significant bit first with 1 = white, as PDF does
+        xobject.streamContent = zlib.compress(image.tobytes(), 9)
+        xobject._filters = ("FlateDecode",)
+        canv._setXObjects(xobject)
+        doc.Reference(xobject, name)
+        doc.addForm(key, xobject)
+    canv._currentPageHasImages = 1
+    canv.saveState()
+    canv.scale(width, height)
+    canv.doForm(key)
+    canv.restoreState()
+
+
+class BilevelImage(Flowable):
+    """Centred black-and-white image embedded as a one-bit image XObject
+
+    ``drawImage`` always embeds eight-bit RGB, which for a QR code is 24 times
+    the data. Like ``drawImage`` the XObject is named by ``key`` so each image
+    is embedded once per PDF.
+    """
+
+    def __init__(self, key, image, width, height):
+        super().__init__()
+        self.key = key
+        self.image = image
+        self.width = width
+        self.height = height
+        self.hAlign = "CENTER"
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        _draw_one_bit(self.canv, self.key, self.image, self.width, self.height)
+
+
+def _bilevel(data):
+    from PIL import Image
+
+    from ..optimize import is_bilevel
+
+    image = Image.open(BytesIO(data))
+    return image.convert("L").convert("1", dither=Image.Dither.NONE) if is_bilevel(image) else False
+
+
+def image_flowable(block, assets, values):
+    """Return a flowable for an ``image`` or ``qr`` block"""
+    key, data = assets.image(block, values)
+    count("images", format="pdf")
+    if assets.size is not None:
+        image = assets.shared(("pdf-bilevel", key), lambda: _bilevel(data))
+        if image:
+            return BilevelImage(key, image, block.width * inch, block.width * inch * image.height / image.width)
+    reader = assets.shared(("pdf", key), lambda: ImageReader(BytesIO(data)))
+    width, height = reader.getSize()
+    return SharedImage(reader, block.width * inch, block.width * inch * height / width)
+
+
+@lru_cache(maxsize=1)
+def symbol_fonts():
+    """Register the installed ``SYMBOL_FONTS`` and return the font names to try, in order"""
+    names = []
+    for path in SYMBOL_FONTS:
+        if os.path.exists(path):
+            names.append(f"GatherSync-Symbols-{len(names)}")
+            pdfmetrics.registerFont(TTFont(names[-1], path))
+    return names + ["ZapfDingbats"]
+
+
+@lru_cache(maxsize=4096)
+def _draws(font, char):
+    face = pdfmetrics.getFont(font)
+    if isinstance(face, TTFont):
+        return ord(char) in face.face.charToGlyph
+    try:
+        # reportlab registers a codec for each standard font encoding
+        char.encode(face.encName.lower())
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def with_symbols(text, font):
+    """Wrap the characters ``font`` cannot draw in ``<font>`` tags naming a symbol font"""
+    if text.isascii():
+        return text
+    parts = []
+    for char in text:
+        if _draws(font, char):
+            parts.append(char)
+            continue
+        if char == _VARIATION_SELECTOR:
+            continue
+        for candidate in (char, SYMBOL_FALLBACKS.get(char)):
+            if candidate and _draws(font, candidate):
+                parts.append(candidate)
+                break
+            name = next((name for name in symbol_fonts() if candidate and _draws(name, candidate)), None)
+            if name:
+                parts.append(f'<font name="{name}">{candidate}</font>')
+                break
+        else:
+            parts.append(char)
+    return "".join(parts)
+
+
+@contextmanager
+def plain_streams(enabled=True):
+    """Leave out the ASCII85 layer reportlab wraps around compressed streams
+
+    ASCII85 keeps a PDF 7-bit clean at the cost of a quarter more bytes per
+    stream, which nothing that reads these files needs.
+    """
+    if not enabled:
+        yield
+        return
+    previous, rl_config.useA85 = rl_config.useA85, 0
+    try:
+        yield
+    finally:
+        rl_config.useA85 = previous
+
+
+def build_styles(theme=DEFAULT_THEME):
+    """Compile ``theme`` into reportlab paragraph styles"""
+    sample = getSampleStyleSheet()
+    styles = {}
+    for role, spec in theme.styles.items():
+        font = theme.mono_font if spec.mono else theme.font
+        styles[role] = ParagraphStyle(
+            f"GatherSync-{role}",
+            parent=sample[_PARENTS.get(role, "BodyText")],
+            fontName=f"{font}-Bold" if spec.bold else font,
+            fontSize=spec.size,
+            leading=spec.leading or spec.size * 1.2,
+            textColor=HexColor(theme.colors[spec.color]),
+            spaceBefore=spec.space_before,
+            spaceAfter=spec.space_after,
+        )
+        styles[f"{role}-center"] = ParagraphStyle(f"GatherSync-{role}-center",
+                                                  parent=styles[role], alignment=TA_CENTER)
+    code = styles["code"]
+    code.leftIndent = code.rightIndent = 20
+    code.backColor = HexColor(theme.colors["code_background"])
+    code.borderPadding = 10
+    small = theme.styles["small"]
+    styles["table"] = TableStyle([
+        ("FONT", (0, 0), (-1, -1), theme.font, small.size),
+        ("FONT", (0, 0), (-1, 0), f"{theme.font}-Bold", small.size),
+        ("TEXTCOLOR", (0, 0), (-1, -1), HexColor(theme.colors[small.color])),
+        ("BACKGROUND", (0, 0), (-1, 0), HexColor(theme.colors["code_background"])),
+        ("GRID", (0, 0), (-1, -1), 0.5, HexColor(theme.colors["muted"])),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ])
+    return styles
+
+
+@lru_cache(maxsize=8)
+def compiled_styles(theme=DEFAULT_THEME):
+    """Return the paragraph styles for ``theme``, compiled once per process
+
+    Styles are only read during layout, so every document rendered with the
+    same theme shares one set.
+    """
+    with span("compile_styles", format="pdf"):
+        return build_styles(theme)
+
+
+def warm(theme=DEFAULT_THEME):
+    """Compile the styles for ``theme`` before the first document needs them"""
+    compiled_styles(theme)
+
+
+def markup(runs, values, font=None):
+    """Convert runs to reportlab paragraph markup
+
+    With ``font``, characters it cannot draw are taken from a symbol font.
+    """
+    parts = []
+    for run in runs:
+        text = escape(expand(run.text, values))
+        if font is not None:
+            text = with_symbols(text, font)
+        if run.bold:
+            text = f"<b>{text}</b>"
+        if run.italic:
+            text = f"<i>{text}</i>"
+        parts.append(text)
+    return "".join(parts)
+
+
+def _list_flowables(block, styles, values, indent="", symbols=False):
+    font = styles["body"].fontName if symbols else None
+    for number, item in enumerate(block.items, block.start):
+        marker = f"{number}." if block.ordered else "•"
+        yield Paragraph(f"{indent}{marker} {markup(item.runs, values, font)}", styles["body"])
+        if item.children is not None:
+            yield from _list_flowables(item.children, styles, values, indent + "&nbsp;" * 4, symbols)
+
+
+def flowables(document, styles, assets, values):
+    """Yield the reportlab flowables for ``document``
+
+    With a size profile on ``assets``, characters the theme fonts cannot draw
+    (emoji) come from a symbol font.
+    """
+    symbols = assets.size is not None
+    for block in document.blocks:
+        if block.kind == "page_break":
+            yield PageBreak()
+        elif block.kind == "rule":
+            continue
+        elif block.kind == "list":
+            yield from _list_flowables(block, styles, values, symbols=symbols)
+            yield Spacer(1, 0.2 * inch)
+        elif block.kind == "table":
+            rows = [[expand(cell, values) for cell in row] for row in block.rows]
+            yield Table(rows, style=styles["table"], repeatRows=1, hAlign="LEFT")
+            yield Spacer(1, 0.2 * inch)
+        elif block.kind in ("image", "qr"):
+            yield Spacer(1, 0.2 * inch)
+            yield image_flowable(block, assets, values)
+            yield Spacer(1, 0.3 * inch)
+        elif block.kind == "code":
+            text = escape(expand(block.text, values))
+            if symbols:
+                text = with_symbols(text, styles["code"].fontName)
+            yield Paragraph(text, styles["code"])
+            yield Spacer(1, 0.1 * inch)
+        else:
+            if block.kind == "title":
+                yield Spacer(1, 0.5 * inch)
+            role = style_for(block)
+            if block.align == "center":
+                role += "-center"
+            yield Paragraph(markup(block.runs, values, styles[role].fontName if symbols else None), styles[role])
+
+
+def new_doc_template(path, title, **options):
+    """Return the page template shared by every PDF output"""
+    return SimpleDocTemplate(str(path), pagesize=letter,
+                             rightMargin=0.75 * inch, leftMargin=0.75 * inch,
+                             topMargin=0.75 * inch, bottomMargin=0.75 * inch,
+                             title=title, **options)
+
+
+class FlowableStream(list):
+    """Flowable list that ``doc.build`` fills from an iterator as it consumes it
+
+    ``BaseDocTemplate.build`` only works on the front of its list: it reads,
+    deletes and re-inserts the first few flowables. So the list holds just
+    ``lookahead`` of them (enough for keep-with-next chains) and tops itself up
+    whenever reportlab asks for its length or an item. Its length is that of
+    the queued part, which stays non-zero until the iterator is exhausted.
+    """
+
+    def __init__(self, flowables, lookahead=16):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            flowable = next(self._source, None)
+            if flowable is None:
+                self._source = None
+            else:
+                self.append(flowable)
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def stream_build(doc, flowables, lookahead=16):
+    """Build ``doc`` from an iterator of flowables without materialising them
+
+    Each flowable is dropped once it has been drawn onto its page.
+    """
+    with span("layout", format="pdf"):
+        doc.build(FlowableStream(flowables, lookahead))
+    count("pages", doc.page, format="pdf")
+
+
+def render(document, path, assets, values, theme=DEFAULT_THEME):
+    """Write ``document`` to ``path`` as a PDF"""
+    with span("style_setup", format="pdf"):
+        styles = compiled_styles(theme)
+        doc = new_doc_template(path, document.title)
+    with span("flowables", format="pdf"):
+        items = list(flowables(document, styles, assets, values))
+    count("flowables", len(items), format="pdf")
+    doc._doSave = 0
+    # Image XObjects are encoded during layout and page streams on save
+    with plain_streams(assets.size is not None):
+        with span("layout", format="pdf"):
+            doc.build(items)
+        count("pages", doc.page, format="pdf")
+        with span("save", format="pdf"):
+            doc.canv.save()
@@ -0,0 +1,160 @@
+"""Render a document tree to DOCX with python-docx"""
+
+import copy
+import zipfile
+from functools import lru_cache
+from io import BytesIO
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Inches, Pt, RGBColor
+
+from ..content import expand
+from ..theme import DEFAULT_THEME, style_for
+from ..trace import count, span
+
+_ALIGN = {"left": WD_ALIGN_PARAGRAPH.LEFT, "center": WD_ALIGN_PARAGRAPH.CENTER}
+_MONO_FONT = "Courier New"
+
+
+# Roles that get a custom paragraph style; the rest use Word's built-in styles
+_ROLE_STYLES = {"subtitle": "GatherSync Subtitle", "small": "GatherSync Small", "code": "GatherSync Code"}
+
+# Parts of python-docx's default template that Word does not need: the Word
+# 2010 copy of styles.xml, the preview thumbnail and sample custom XML
+_OPTIONAL_PARTS = ("stylesWithEffects", "thumbnail", "customXml")
+
+
+def build_template(theme=DEFAULT_THEME):
+    """Create a blank document with the theme's fonts and paragraph styles applied"""
+    doc = Document()
+    font = doc.styles["Normal"].font
+    font.name = theme.font
+    font.size = Pt(theme.styles["body"].size)
+    for role, name in _ROLE_STYLES.items():
+        spec = theme.styles[role]
+        style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = doc.styles["Normal"]
+        style.font.size = Pt(spec.size)
+        style.font.color.rgb = RGBColor(*theme.rgb(spec.color))
+        if spec.mono:
+            style.font.name = _MONO_FONT
+    return doc
+
+
+@lru_cache(maxsize=8)
+def _template(theme):
+    with span("compile_styles", format="docx"):
+        return build_template(theme)
+
+
+def new_document(theme=DEFAULT_THEME):
+    """Return a fresh copy of the theme's template document
+
+    Loading python-docx's default package and styling it is the bulk of the
+    per-document setup, so it happens once per theme and each document starts
+    from a deep copy of the result.
+    """
+    return copy.deepcopy(_template(theme))
+
+
+def warm(theme=DEFAULT_THEME):
+    """Build the template for ``theme`` before the first document needs it"""
+    _template(theme)
+
+
+def add_runs(paragraph, runs, values):
+    """Append ``runs`` to ``paragraph`` with their inline formatting"""
+    for run in runs:
+        docx_run = paragraph.add_run(expand(run.text, values))
+        if run.bold:
+            docx_run.bold = True
+        if run.italic:
+            docx_run.italic = True
+
+
+def _add_list(doc, block, values, level=1):
+    suffix = "" if level == 1 else f" {level}"
+    style = ("List Number" if block.ordered else "List Bullet") + suffix
+    for item in block.items:
+        add_runs(doc.add_paragraph(style=style), item.runs, values)
+        if item.children is not None:
+            _add_list(doc, item.children, values, level + 1)
+
+
+def _add_table(doc, block, values):
+    table = doc.add_table(rows=len(block.rows), cols=len(block.rows[0]))
+    table.style = doc.styles["Table Grid"]
+    for index, (row, cells) in enumerate(zip(table.rows, block.rows)):
+        for cell, text in zip(row.cells, cells):
+            run = cell.paragraphs[0].add_run(expand(text, values))
+            if index == 0:
+                run.bold = True
+    doc.add_paragraph()
+
+
+def write_blocks(doc, document, assets, values):
+    """Append the blocks of ``document`` to ``doc``"""
+    for block in document.blocks:
+        if block.kind == "page_break":
+            doc.add_page_break()
+        elif block.kind == "rule":
+            continue
+        elif block.kind == "list":
+            _add_list(doc, block, values)
+            doc.add_paragraph()
+        elif block.kind == "table":
+            _add_table(doc, block, values)
+        elif block.kind in ("image", "qr"):
+            # python-docx stores pictures with identical bytes as one image part
+            paragraph = doc.add_paragraph()
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            paragraph.add_run().add_picture(assets.image_stream(block, values), width=Inches(block.width))
+            count("images", format="docx")
+            doc.add_paragraph()
+        elif block.kind == "code":
+            doc.add_paragraph(expand(block.text, values), style=_ROLE_STYLES["code"])
+        elif block.kind == "title":
+            paragraph = doc.add_heading(level=1)
+            add_runs(paragraph, block.runs, values)
+            paragraph.alignment = _ALIGN[block.align]
+        elif block.kind == "heading":
+            add_runs(doc.add_heading(level=block.level), block.runs, values)
+        else:
+            paragraph = doc.add_paragraph(style=_ROLE_STYLES.get(style_for(block)))
+            add_runs(paragraph, block.runs, values)
+            paragraph.alignment = _ALIGN[block.align]
+
+
+def strip_optional_parts(doc):
+    """Remove the relationships to ``_OPTIONAL_PARTS`` so they are not saved"""
+    for rels in (doc.part.rels, doc.part.package.rels):
+        for rId, rel in list(rels.items()):
+            if rel.reltype.rsplit("/", 1)[-1] in _OPTIONAL_PARTS:
+                del rels[rId]
+
+
+def save_compressed(doc, path):
+    """Save ``doc`` with every package member deflated at the highest level"""
+    buffer = BytesIO()
+    doc.save(buffer)
+    with zipfile.ZipFile(buffer) as source, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            target.writestr(info, source.read(info), compress_type=zipfile.ZIP_DEFLATED, compresslevel=9)
+
+
+def render(document, path, assets, values, theme=DEFAULT_THEME):
+    """Write ``document`` to ``path`` as a DOCX file"""
+    with span("style_setup", format="docx"):
+        doc = new_document(theme)
+        doc.core_properties.title = document.title
+        if assets.size is not None:
+            strip_optional_parts(doc)
+    with span("flowables", format="docx"):
+        write_blocks(doc, document, assets, values)
+    with span("save", format="docx"):
+        if assets.size is not None:
+            save_compressed(doc, path)
+        else:
+            doc.save(str(path))
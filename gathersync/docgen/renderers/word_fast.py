@@ -0,0 +1,352 @@
+"""Render a document tree to DOCX without going through python-docx's object model
+
+The package has the same parts, with the same bytes, as the one ``word.render``
+saves, but each document of a personalised batch only pays for what differs
+between recipients:
+
+- the theme's package skeleton (styles, numbering, settings, theme, ...) is
+  taken from the word renderer's template once and each static part is
+  deflated once; every document copies the compressed bytes
+- ``document.xml`` is written as string fragments that match python-docx's
+  serialisation of the same paragraphs, runs, tables and pictures
+- only the body, its relationships, the content types, the core properties
+  and the images are compressed per document, and the ZIP is streamed to disk
+
+``word`` remains the reference implementation; ``benchmarks/docx_writers.py``
+checks that both produce the same parts and compares their speed.
+"""
+
+import re
+import struct
+import time
+import zlib
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from docx.image.image import Image
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI, PackURI
+from docx.opc.pkgwriter import _ContentTypesItem
+from docx.shared import Emu, Inches
+
+from ..content import expand
+from ..theme import DEFAULT_THEME, style_for
+from ..trace import count, span
+from . import word
+
+_CORE_PARTNAME = "/docProps/core.xml"
+
+_BREAKS = re.compile(r"([\t\r\n])")
+
+_PAGE_BREAK = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+_TABLE_PROPERTIES = (
+    '<w:tblPr><w:tblStyle w:val="{style}"/><w:tblW w:type="auto" w:w="0"/>'
+    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" '
+    'w:noVBand="1" w:val="04A0"/></w:tblPr>'
+)
+
+_INLINE = (
+    '<wp:inline xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="{id}" name="Picture {id}"/>'
+    '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+    '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture"><pic:pic>'
+    '<pic:nvPicPr><pic:cNvPr id="0" name="{filename}"/><pic:cNvPicPr/></pic:nvPicPr>'
+    '<pic:blipFill><a:blip r:embed="{rId}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+    '<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"/></pic:spPr></pic:pic></a:graphicData></a:graphic></wp:inline>'
+)
+
+
+class Member:
+    """A ZIP entry that is deflated once and can be written to any number of archives"""
+
+    __slots__ = ("name", "data", "crc", "size")
+
+    def __init__(self, name, blob, level=zlib.Z_DEFAULT_COMPRESSION):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        self.name = name.encode("utf-8")
+        self.data = compressor.compress(blob) + compressor.flush()
+        self.crc = zlib.crc32(blob)
+        self.size = len(blob)
+
+
+def write_zip(path, members):
+    """Stream ``members`` to ``path`` as a ZIP archive with the headers ``ZipFile.writestr`` gives"""
+    now = time.localtime()
+    dos_time = now.tm_hour << 11 | now.tm_min << 5 | now.tm_sec // 2
+    dos_date = (now.tm_year - 1980) << 9 | now.tm_mon << 5 | now.tm_mday
+    directory, offset = [], 0
+    with open(path, "wb") as f:
+        for member in members:
+            fields = (20, 0, zlib.DEFLATED, dos_time, dos_date, member.crc, len(member.data), member.size,
+                      len(member.name))
+            f.write(struct.pack("<4s5H3L2H", b"PK\x03\x04", *fields, 0) + member.name)
+            f.write(member.data)
+            # Made by version 2.0 on Unix, mode 0600
+            directory.append(struct.pack("<4s6H3L5H2L", b"PK\x01\x02", 3 << 8 | 20, *fields, 0, 0, 0, 0,
+                                         0o600 << 16, offset) + member.name)
+            offset += 30 + len(member.name) + len(member.data)
+        f.writelines(directory)
+        size = sum(len(entry) for entry in directory)
+        f.write(struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, len(directory), len(directory), size, offset, 0))
+
+
+class _ImagePart:
+    """The two attributes of an image part that ``[Content_Types].xml`` is built from"""
+
+    def __init__(self, partname, content_type):
+        self.partname = PackURI(partname)
+        self.content_type = content_type
+
+
+class Picture:
+    """An image part of the document being written"""
+
+    __slots__ = ("sha1", "rId", "filename", "content_type", "member")
+
+    def __init__(self, sha1, rId, filename, content_type, member):
+        self.sha1 = sha1
+        self.rId = rId
+        self.filename = filename
+        self.content_type = content_type
+        self.member = member
+
+
+def _related(part, seen=None):
+    """The parts reachable from ``part`` through its relationships"""
+    seen = set() if seen is None else seen
+    for rel in part.rels.values():
+        if not rel.is_external and rel.target_part not in seen:
+            seen.add(rel.target_part)
+            _related(rel.target_part, seen)
+    return seen
+
+
+class Skeleton:
+    """The parts of a theme's package that are the same in every document
+
+    ``members`` lists the ZIP entries in the order python-docx writes them:
+    static parts as compressed ``Member``s, the per-document parts as their
+    part names, to be replaced when a document is written. Image parts go in
+    at ``image_index``.
+    """
+
+    def __init__(self, theme=DEFAULT_THEME, lean=False):
+        doc = word.new_document(theme)
+        if lean:
+            word.strip_optional_parts(doc)
+        self.doc = doc
+        self.level = 9 if lean else zlib.Z_DEFAULT_COMPRESSION
+        self.block_width = doc._block_width
+        head, body = doc.part.blob.split(b"<w:body>", 1)
+        if not body.startswith(b"<w:sectPr"):
+            raise ValueError("the DOCX template body is not empty")
+        self.prefix, self.suffix = head + b"<w:body>", body
+        self.rels = doc.part.rels.xml
+        self.rIds = set(doc.part.rels)
+        package = doc.part.package
+        self.parts = list(package.iter_parts())
+        self.core_part = next(part for part in self.parts if part.partname == _CORE_PARTNAME)
+        dynamic = {self.core_part, doc.part}
+        self.members = [CONTENT_TYPES_URI, Member(PACKAGE_URI.rels_uri.membername, package.rels.xml, self.level)]
+        # python-docx walks the parts depth first, so image parts (the last
+        # relationships of the document part) follow the document's other parts
+        below = _related(doc.part)
+        for part in self.parts:
+            if part in dynamic:
+                self.members.append(part.partname)
+            else:
+                self.members.append(Member(part.partname.membername, part.blob, self.level))
+            if len(part.rels):
+                self.members.append(part.partname.rels_uri if part is doc.part else
+                                    Member(part.partname.rels_uri.membername, part.rels.xml, self.level))
+            if part is doc.part or part in below:
+                self.image_index = len(self.members)
+        self._styles = {}
+        self._core = {}
+        self._content_types = {}
+
+    def style_id(self, name):
+        style_id = self._styles.get(name)
+        if style_id is None:
+            style_id = self._styles[name] = self.doc.styles[name].style_id
+        return style_id
+
+    def next_rId(self, pictures):
+        """The relationship id python-docx gives the next image of a document"""
+        used = self.rIds | {picture.rId for picture in pictures}
+        number = 1
+        while f"rId{number}" in used:
+            number += 1
+        return f"rId{number}"
+
+    def core(self, title):
+        """The core properties member of a document titled ``title``"""
+        member = self._core.get(title)
+        if member is None:
+            self.doc.core_properties.title = title
+            member = self._core[title] = Member(self.core_part.partname.membername, self.core_part.blob,
+                                                self.level)
+        return member
+
+    def content_types(self, pictures):
+        """The ``[Content_Types].xml`` member of a package holding ``pictures``"""
+        key = tuple((f"/word/media/{picture.filename}", picture.content_type) for picture in pictures)
+        member = self._content_types.get(key)
+        if member is None:
+            parts = self.parts + [_ImagePart(*image) for image in key]
+            member = self._content_types[key] = Member(CONTENT_TYPES_URI.membername,
+                                                       _ContentTypesItem.from_parts(parts).blob, self.level)
+        return member
+
+    def write(self, path, title, body, pictures):
+        """Write a document with ``body`` XML and ``pictures`` to ``path``"""
+        partname = self.doc.part.partname
+        rels = "".join(f'<Relationship Id="{picture.rId}" Type="{RT.IMAGE}" Target="media/{picture.filename}"/>'
+                       for picture in pictures).encode("utf-8")
+        dynamic = {
+            CONTENT_TYPES_URI: self.content_types(pictures),
+            _CORE_PARTNAME: self.core(title),
+            partname: Member(partname.membername, self.prefix + body.encode("utf-8") + self.suffix, self.level),
+            partname.rels_uri: Member(partname.rels_uri.membername,
+                                      self.rels.replace(b"</Relationships>", rels + b"</Relationships>"),
+                                      self.level),
+        }
+        members = [dynamic.get(member, member) for member in self.members]
+        members[self.image_index:self.image_index] = [picture.member for picture in pictures]
+        write_zip(path, members)
+
+
+@lru_cache(maxsize=8)
+def skeleton(theme=DEFAULT_THEME, lean=False):
+    """Return the compiled skeleton for ``theme``; ``lean`` is the size-optimised package"""
+    return Skeleton(theme, lean)
+
+
+def warm(theme=DEFAULT_THEME):
+    """Compile the skeleton for ``theme`` before the first document needs it"""
+    skeleton(theme)
+
+
+def _text(text):
+    """Run content for ``text``, with tabs and line breaks as python-docx writes them"""
+    parts = []
+    for chunk in _BREAKS.split(text):
+        if chunk == "\t":
+            parts.append("<w:tab/>")
+        elif chunk in ("\r", "\n"):
+            parts.append("<w:br/>")
+        elif chunk:
+            space = ' xml:space="preserve"' if len(chunk.strip()) < len(chunk) else ""
+            parts.append(f"<w:t{space}>{escape(chunk)}</w:t>")
+    return "".join(parts)
+
+
+def _run(text, bold=False, italic=False):
+    properties = ("<w:b/>" if bold else "") + ("<w:i/>" if italic else "")
+    xml = (f"<w:rPr>{properties}</w:rPr>" if properties else "") + _text(text)
+    return f"<w:r>{xml}</w:r>" if xml else "<w:r/>"
+
+
+def _paragraph(content="", style_id=None, align=None):
+    properties = (f'<w:pStyle w:val="{style_id}"/>' if style_id else "") + \
+                 (f'<w:jc w:val="{align}"/>' if align else "")
+    xml = (f"<w:pPr>{properties}</w:pPr>" if properties else "") + content
+    return f"<w:p>{xml}</w:p>" if xml else "<w:p/>"
+
+
+class _Body:
+    """Collects the body XML and image parts of one document"""
+
+    def __init__(self, skeleton, assets, values):
+        self.skeleton = skeleton
+        self.assets = assets
+        self.values = values
+        self.xml = []
+        self.pictures = []
+        self.shapes = 0
+
+    def runs(self, runs):
+        return "".join(_run(expand(run.text, self.values), run.bold, run.italic) for run in runs)
+
+    def add_list(self, block, level=1):
+        suffix = "" if level == 1 else f" {level}"
+        style_id = self.skeleton.style_id(("List Number" if block.ordered else "List Bullet") + suffix)
+        for item in block.items:
+            self.xml.append(_paragraph(self.runs(item.runs), style_id))
+            if item.children is not None:
+                self.add_list(item.children, level + 1)
+
+    def add_table(self, block):
+        columns = len(block.rows[0])
+        width = Emu(self.skeleton.block_width // columns).twips
+        cell = f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>{{}}</w:tc>'
+        self.xml += ["<w:tbl>", _TABLE_PROPERTIES.format(style=self.skeleton.style_id("Table Grid")),
+                     "<w:tblGrid>", f'<w:gridCol w:w="{width}"/>' * columns, "</w:tblGrid>"]
+        for index, row in enumerate(block.rows):
+            self.xml.append("<w:tr>")
+            self.xml += [cell.format(_paragraph(_run(expand(text, self.values), bold=index == 0))) for text in row]
+            self.xml.append("</w:tr>")
+        self.xml += ["</w:tbl>", _paragraph()]
+
+    def add_picture(self, block):
+        key, data = self.assets.image(block, self.values)
+        image = self.assets.shared(("docx-image", key), lambda: Image.from_blob(data))
+        # Pictures with identical bytes share one image part, as in python-docx
+        picture = next((picture for picture in self.pictures if picture.sha1 == image.sha1), None)
+        if picture is None:
+            filename = f"image{len(self.pictures) + 1}.{image.ext}"
+            member = self.assets.shared(("docx-member", key, filename, self.skeleton.level),
+                                        lambda: Member(f"word/media/{filename}", data, self.skeleton.level))
+            picture = Picture(image.sha1, self.skeleton.next_rId(self.pictures), filename, image.content_type,
+                              member)
+            self.pictures.append(picture)
+        self.shapes += 1
+        cx, cy = image.scaled_dimensions(Inches(block.width), None)
+        inline = _INLINE.format(cx=cx, cy=cy, id=self.shapes, filename=image.filename, rId=picture.rId)
+        self.xml += [_paragraph(f"<w:r><w:drawing>{inline}</w:drawing></w:r>", align="center"), _paragraph()]
+
+
+def write_blocks(skeleton, document, assets, values):
+    """Return the body XML and the ``Picture``s for the blocks of ``document``
+
+    Mirrors ``word.write_blocks``: each branch writes what the python-docx
+    calls there would have added to the document.
+    """
+    body = _Body(skeleton, assets, values)
+    for block in document.blocks:
+        if block.kind == "page_break":
+            body.xml.append(_PAGE_BREAK)
+        elif block.kind == "rule":
+            continue
+        elif block.kind == "list":
+            body.add_list(block)
+            body.xml.append(_paragraph())
+        elif block.kind == "table":
+            body.add_table(block)
+        elif block.kind in ("image", "qr"):
+            body.add_picture(block)
+            count("images", format="docx")
+        elif block.kind == "code":
+            text = expand(block.text, values)
+            body.xml.append(_paragraph(_run(text) if text else "", skeleton.style_id(word._ROLE_STYLES["code"])))
+        elif block.kind == "title":
+            body.xml.append(_paragraph(body.runs(block.runs), skeleton.style_id("Heading 1"), block.align))
+        elif block.kind == "heading":
+            body.xml.append(_paragraph(body.runs(block.runs), skeleton.style_id(f"Heading {block.level}")))
+        else:
+            style = word._ROLE_STYLES.get(style_for(block))
+            body.xml.append(_paragraph(body.runs(block.runs), style and skeleton.style_id(style), block.align))
+    return "".join(body.xml), body.pictures
+
+
+def render(document, path, assets, values, theme=DEFAULT_THEME):
+    """Write ``document`` to ``path`` as a DOCX file"""
+    with span("style_setup", format="docx"):
+        compiled = skeleton(theme, assets.size is not None)
+    with span("flowables", format="docx"):
+        xml, pictures = write_blocks(compiled, document, assets, values)
+    with span("save", format="docx"):
+        compiled.write(path, document.title, xml, pictures)
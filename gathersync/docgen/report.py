@@ -0,0 +1,131 @@
+"""Availability report: best dates and RSVP tallies from a backup
+
+    python -m docgen.report ../Backups/gathersync-backup-2025-12-21.json -f pdf -f docx -o reports
+
+For every flexible event the report lists the best dates and a per-day table
+of available, unavailable and no-response counts; for every fixed event it
+gives the RSVP tally. The report is built as a content tree, so it renders in
+every output format with the same theme as the instructions.
+"""
+
+import argparse
+import hashlib
+import json
+from dataclasses import asdict
+from datetime import date
+
+from .availability import summarise
+from .backup import MONTHS, add_filter_arguments, open_backups
+from .build import LABELS, build
+from .content import Block, Document, ListItem, Run
+from .manifest import Manifest
+from .renderers import RENDERERS, add_renderer_arguments, use_fast_docx
+from .trace import add_trace_arguments, span, tracing
+
+REPORT_STEM = "availability-report"
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def day_label(iso):
+    day = date.fromisoformat(iso)
+    return f"{WEEKDAYS[day.weekday()]} {day.day} {MONTHS[day.month - 1][:3]}"
+
+
+def _paragraph(text):
+    return Block("paragraph", runs=(Run(text),))
+
+
+def _plural(count, word):
+    return f"{count} {word}" + ("" if count == 1 else "s")
+
+
+def flexible_blocks(summary):
+    """Blocks describing one flexible event"""
+    yield Block("heading", runs=(Run(summary.name),), level=2)
+    yield _paragraph(f"Flexible event for {MONTHS[summary.month - 1]} {summary.year} · "
+                     f"{_plural(summary.participants, 'participant')}")
+    if not summary.ranked:
+        yield _paragraph("No one has marked any available days yet.")
+        return
+    yield Block("heading", runs=(Run("Best dates"),), level=4)
+    items = []
+    for iso in summary.ranked:
+        index = summary.days.index(iso)
+        text = (f" - {summary.available[index]} of {summary.participants} available "
+                f"({summary.percentage(index):.0f}%)")
+        items.append(ListItem((Run(day_label(iso), bold=True), Run(text))))
+    yield Block("list", ordered=True, items=tuple(items))
+    rows = [("Date", "Available", "Unavailable", "No response", "")]
+    for index, iso in enumerate(summary.days):
+        rows.append((day_label(iso), str(summary.available[index]), str(summary.unavailable[index]),
+                     str(summary.no_response[index]), "best" if iso in summary.best else ""))
+    yield Block("table", rows=tuple(rows))
+
+
+def fixed_blocks(summary):
+    """Blocks describing one fixed event"""
+    yield Block("heading", runs=(Run(summary.name),), level=2)
+    when = f"Fixed event on {day_label(summary.date)}" if summary.date else "Fixed event"
+    if summary.time:
+        when += f" at {summary.time}"
+    yield _paragraph(f"{when} · {_plural(summary.participants, 'participant')}")
+    yield Block("table", rows=(("Response", "Count"), ("Attending", str(summary.attending)),
+                               ("Not attending", str(summary.not_attending)),
+                               ("No response yet", str(summary.no_response))))
+
+
+def report_document(flexible, fixed, exported_at=""):
+    """Build the report as a content tree"""
+    blocks = [Block("title", runs=(Run("GatherSync Availability Report"),), align="center")]
+    subtitle = f"Backup exported {exported_at[:10]}" if exported_at else "From a GatherSync backup"
+    blocks.append(Block("subtitle", runs=(Run(subtitle),), align="center"))
+    blocks.append(_paragraph(f"{_plural(len(flexible), 'flexible event')} and "
+                             f"{_plural(len(fixed), 'fixed event')}."))
+    for summary in flexible:
+        blocks.extend(flexible_blocks(summary))
+    for summary in fixed:
+        blocks.extend(fixed_blocks(summary))
+    data = {"flexible": [asdict(summary) for summary in flexible], "fixed": [asdict(summary) for summary in fixed]}
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+    return Document("GatherSync Availability Report", {}, tuple(blocks), digest), data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m docgen.report",
+                                     description="Summarise event availability and RSVPs from backups.")
+    parser.add_argument("backups", nargs="+", help="backup JSON files exported from the app")
+    parser.add_argument("-o", "--out-dir", default=".", help="directory for the report")
+    parser.add_argument("-f", "--format", dest="formats", action="append", choices=list(RENDERERS),
+                        help="output format (repeatable; default: pdf)")
+    parser.add_argument("--top", type=int, default=5, help="ranked dates listed per flexible event")
+    parser.add_argument("--json", default=None, help="also write the computed summaries to this JSON file")
+    parser.add_argument("--force", action="store_true", help="rebuild the report even if its data is unchanged")
+    add_filter_arguments(parser)
+    add_renderer_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+    use_fast_docx(args.fast_docx)
+
+    manifest = Manifest.for_dir(args.out_dir)
+    if args.force:
+        manifest.entries.clear()
+    with tracing(args.trace, args.trace_format):
+        backups = list(open_backups(args.backups, args))
+        with span("summarise"):
+            flexible, fixed = summarise(backups, args.top)
+        document, data = report_document(flexible, fixed, max(backup["exportedAt"] for backup in backups))
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+        written = build(args.formats or ["pdf"], args.out_dir, document, stem=REPORT_STEM, manifest=manifest)
+    manifest.save()
+    for fmt, path in written.items():
+        if str(path) in manifest.hits:
+            print(f"✔ {LABELS[fmt]} report up to date: {path}")
+        else:
+            print(f"✅ {LABELS[fmt]} report generated: {path}")
+
+
+if __name__ == "__main__":
+    main()
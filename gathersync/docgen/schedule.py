@@ -0,0 +1,364 @@
+"""Printable schedules from recurring event templates
+
+    python -m docgen.schedule ../Backups/gathersync-backup-2025-12-21.json --start 2026-01 --months 12 -o schedules
+
+Expands every template in the backups' ``templates`` section into its dates
+over ``--months`` months and writes one schedule per group (``--per
+template``) or one for the whole organisation (``--per organisation``).
+Templates are read in either shape:
+
+- the app's (``lib/recurring-generator.ts``): ``pattern`` is ``weekly``,
+  ``biweekly`` or ``monthly``, with ``dayOfWeek`` (0 is Sunday) and, for
+  monthly templates, ``weekOfMonth`` (5 is the last such weekday) or
+  ``dayOfMonth``; inactive templates are left out
+- the ``recurring_templates`` table's: ``recurrence_type`` is ``weekly`` or
+  ``monthly`` with ``day_of_week`` / ``day_of_month``. ``custom`` templates
+  have no rule to expand and are counted as skipped.
+
+A day of month past the end of a short month falls on its last day. Biweekly
+templates repeat every 14 days from their first occurrence on or after
+``createdAt``, or on or after the start of the period for templates without
+one, so their dates do not depend on the day the schedule is made.
+
+Dates are never found by walking days: each month's calendar (length and
+weekday of the 1st) is computed once, and a template's days in a month are an
+arithmetic progression read off it. The days of each (template, month) are
+memoised in a ``ScheduleCache``, so templates are expanded once per run
+however many documents list them.
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import date
+from functools import lru_cache
+
+from .backup import MONTHS, BackupStream
+from .build import LABELS, build
+from .content import Block, Document, Run
+from .manifest import Manifest
+from .renderers import RENDERERS, add_renderer_arguments, use_fast_docx
+from .report import day_label
+from .trace import add_trace_arguments, count, span, tracing
+
+SCHEDULE_STEM = "schedule"
+
+WEEKDAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+WEEK_NAMES = ["First", "Second", "Third", "Fourth", "Last"]
+
+
+@dataclass(frozen=True)
+class Rule:
+    pattern: str  # "weekly", "biweekly" or "monthly"
+    day_of_week: "int | None" = None  # 0 is Sunday, as in JavaScript
+    week_of_month: "int | None" = None  # 1-5, 5 being the last
+    day_of_month: "int | None" = None
+    anchor: int = 0  # date ordinal a biweekly rule counts fortnights from; 0 until anchored
+
+    def describe(self):
+        """Human-readable recurrence, as ``getRecurrenceDescription`` words it"""
+        if self.pattern == "weekly":
+            return f"Every {WEEKDAY_NAMES[self.day_of_week]}"
+        if self.pattern == "biweekly":
+            return f"Every other {WEEKDAY_NAMES[self.day_of_week]}"
+        if self.week_of_month:
+            return f"{WEEK_NAMES[self.week_of_month - 1]} {WEEKDAY_NAMES[self.day_of_week]} of each month"
+        return f"Day {self.day_of_month} of each month"
+
+
+@dataclass(frozen=True)
+class Template:
+    id: str
+    name: str
+    rule: "Rule | None"  # None when the template cannot be expanded
+    time: str = ""  # fixed_time of a fixed template
+    details: tuple = ()  # (label, value) pairs shown on the schedule
+    participants: tuple = ()
+
+    @property
+    def key(self):
+        """Cache identity: the template and the rule it is expanded with"""
+        return f"{self.id}\0{self.rule}"
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _first_on_or_after(day, day_of_week):
+    """Ordinal of the first ``day_of_week`` on or after ``day``"""
+    return day.toordinal() + (day_of_week - (day.isoweekday() % 7)) % 7
+
+
+def _rule(pattern, day_of_week, week_of_month, day_of_month, created):
+    if pattern in ("weekly", "biweekly"):
+        if day_of_week is None or not 0 <= day_of_week <= 6:
+            return None
+        anchor = _first_on_or_after(created, day_of_week) if pattern == "biweekly" and created else 0
+        return Rule(pattern, day_of_week, anchor=anchor)
+    if pattern == "monthly":
+        if week_of_month and day_of_week is not None and 1 <= week_of_month <= 5 and 0 <= day_of_week <= 6:
+            return Rule(pattern, day_of_week, week_of_month)
+        if day_of_month and 1 <= day_of_month <= 31:
+            return Rule(pattern, day_of_month=day_of_month)
+    return None
+
+
+def template_from(record):
+    """Return the ``Template`` of a backup record in the app or the database shape, or None if inactive"""
+    if record.get("active") is False or record.get("deletedAt"):
+        return None
+    created = record.get("createdAt") or record.get("created_at") or ""
+    try:
+        created = date.fromisoformat(created[:10]) if created else None
+    except ValueError:
+        created = None
+    if "recurrence_type" in record:
+        rule = _rule(record["recurrence_type"], _int(record.get("day_of_week")), None,
+                     _int(record.get("day_of_month")), created)
+        participants = [participant.get("name") if isinstance(participant, dict) else participant
+                        for participant in record.get("participants") or []]
+        details = (("Location", record.get("location")), ("Venue", record.get("venue_name")),
+                   ("Address", record.get("venue_address")), ("Venue phone", record.get("venue_phone")),
+                   ("Meeting link", record.get("meeting_link")), ("Notes", record.get("notes")))
+        fixed_time = (record.get("fixed_time") or "") if record.get("event_type") == "fixed" else ""
+    else:
+        rule = _rule(record.get("pattern"), _int(record.get("dayOfWeek")), _int(record.get("weekOfMonth")),
+                     _int(record.get("dayOfMonth")), created)
+        participants = record.get("participantNames") or []
+        details = (("Team leader", record.get("teamLeader")), ("Venue", record.get("venueName")),
+                   ("Address", record.get("venueAddress")), ("Venue contact", record.get("venueContact")),
+                   ("Venue phone", record.get("venuePhone")), ("Meeting link", record.get("meetingLink")),
+                   ("RSVP by", record.get("rsvpDeadline")), ("Notes", record.get("meetingNotes")))
+        # Templates generate flexible events in the app, so they have no time
+        fixed_time = ""
+    return Template(str(record.get("id") or ""), record.get("name") or "", rule, fixed_time,
+                    tuple((label, str(value)) for label, value in details if value),
+                    tuple(name for name in participants if name))
+
+
+def read_templates(paths):
+    """Yield the active templates in the backups at ``paths``, the first of each id winning"""
+    seen = set()
+    for path in paths:
+        for _, record in BackupStream(path, sections=("templates",)):
+            template = template_from(record) if isinstance(record, dict) else None
+            if template is not None and template.id not in seen:
+                seen.add(template.id)
+                yield template
+
+
+@dataclass(frozen=True)
+class MonthCalendar:
+    year: int
+    month: int
+    days: int
+    first_weekday: int  # of the 1st, 0 being Sunday
+    first_ordinal: int  # date ordinal of the 1st
+
+
+@lru_cache(maxsize=1024)
+def month_calendar(year, month):
+    """The calendar of one month, computed once per process"""
+    first = date(year, month, 1)
+    following = date(year + month // 12, month % 12 + 1, 1)
+    return MonthCalendar(year, month, (following - first).days, first.isoweekday() % 7, first.toordinal())
+
+
+def month_days(rule, calendar):
+    """The days of ``calendar``'s month that ``rule`` falls on, in order"""
+    if rule.day_of_month:
+        return (min(rule.day_of_month, calendar.days),)
+    first = 1 + (rule.day_of_week - calendar.first_weekday) % 7
+    if rule.pattern == "weekly":
+        return tuple(range(first, calendar.days + 1, 7))
+    if rule.pattern == "biweekly":
+        offset = calendar.first_ordinal + first - 1 - rule.anchor
+        if offset < 0:
+            # The first occurrence is later in this month, or in a later month
+            first -= offset
+            offset = 0
+        first += 7 * ((offset // 7) % 2)
+        return tuple(range(first, calendar.days + 1, 14))
+    # The nth weekday of the month; 5 is the last, which may be the 4th
+    last = first + 7 * ((calendar.days - first) // 7)
+    return (last if rule.week_of_month == 5 else first + 7 * (rule.week_of_month - 1),)
+
+
+def month_range(start, months):
+    """``(year, month)`` for ``months`` months from ``start`` (``(year, month)``)"""
+    year, month = start
+    for index in range(month - 1, month - 1 + months):
+        yield year + index // 12, index % 12 + 1
+
+
+class ScheduleCache:
+    """Memoised days of each (template, month)"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+
+    def days(self, template, year, month):
+        """Days of ``year``-``month`` on which ``template`` occurs"""
+        key = (template.key, year, month)
+        days = self._memory.get(key)
+        if days is None:
+            self.misses += 1
+            days = self._memory[key] = month_days(template.rule, month_calendar(year, month))
+        else:
+            self.hits += 1
+        return days
+
+
+def anchored(template, start):
+    """``template`` with a biweekly rule that has no ``createdAt`` counted from the 1st of ``start``"""
+    rule = template.rule
+    if rule is None or rule.pattern != "biweekly" or rule.anchor:
+        return template
+    return replace(template, rule=replace(rule, anchor=_first_on_or_after(date(*start, 1), rule.day_of_week)))
+
+
+def expand(template, start, months, cache=None):
+    """Return ``[(year, month, days)]`` for ``template`` over ``months`` months from ``start``"""
+    cache = cache or ScheduleCache()
+    template = anchored(template, start)
+    return [(year, month, cache.days(template, year, month)) for year, month in month_range(start, months)]
+
+
+def period_label(start, months):
+    """E.g. ``January 2026 – December 2026``"""
+    *_, (end_year, end_month) = month_range(start, months)
+    return f"{MONTHS[start[1] - 1]} {start[0]} – {MONTHS[end_month - 1]} {end_year}"
+
+
+def _digest(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def template_document(template, schedule, period):
+    """Schedule of one group: its details and a table of dates per month"""
+    blocks = [Block("title", runs=(Run(template.name or "Schedule"),), align="center"),
+              Block("subtitle", runs=(Run(f"{template.rule.describe()} · {period}"),), align="center")]
+    for label, value in template.details + ((("Time", template.time),) if template.time else ()):
+        blocks.append(Block("paragraph", runs=(Run(f"{label}:", bold=True), Run(f" {value}"))))
+    if template.participants:
+        members = ", ".join(template.participants)
+        blocks.append(Block("paragraph", runs=(Run("Members:", bold=True), Run(f" {members}"))))
+    rows = [("Month", "Dates")] + [(f"{MONTHS[month - 1]} {year}",
+                                    ", ".join(day_label(f"{year}-{month:02d}-{day:02d}") for day in days))
+                                   for year, month, days in schedule]
+    blocks.append(Block("table", rows=tuple(rows)))
+    data = {"template": asdict(template), "schedule": schedule, "period": period}
+    return Document(f"{template.name} schedule", {}, tuple(blocks), _digest(data))
+
+
+def organisation_document(schedules, start, months, period):
+    """One schedule for every group: a table of the groups meeting on each day, month by month
+
+    A table per day keeps each one short; reportlab takes much longer to split
+    one long table over many pages than to lay out many short ones.
+    """
+    blocks = [Block("title", runs=(Run("GatherSync Schedule"),), align="center"),
+              Block("subtitle", runs=(Run(period),), align="center"),
+              Block("paragraph", runs=(Run(f"{len(schedules)} recurring groups."),))]
+    by_day = {key: {} for key in month_range(start, months)}
+    for template, schedule in schedules:
+        for year, month, days in schedule:
+            for day in days:
+                by_day[year, month].setdefault(day, []).append(template)
+    timed = any(template.time for template, _ in schedules)
+    for (year, month), days in by_day.items():
+        blocks.append(Block("heading", runs=(Run(f"{MONTHS[month - 1]} {year}"),), level=2))
+        if not days:
+            blocks.append(Block("paragraph", runs=(Run("No meetings."),), small=True))
+        for day in sorted(days):
+            blocks.append(Block("heading", runs=(Run(day_label(f"{year}-{month:02d}-{day:02d}")),), level=3))
+            templates = sorted(days[day], key=lambda template: (template.name.lower(), template.id))
+            columns = ("Group", "Time") if timed else ("Group",)
+            rows = [columns] + [(template.name, template.time)[:len(columns)] for template in templates]
+            blocks.append(Block("table", rows=tuple(rows)))
+    data = {"schedules": [(template.key, schedule) for template, schedule in schedules], "period": period}
+    return Document("GatherSync Schedule", {}, tuple(blocks), _digest(data))
+
+
+def template_stem(template):
+    """File name stem that is unique per template"""
+    return f"{SCHEDULE_STEM}-{hashlib.sha1(template.id.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _month(value):
+    try:
+        year, month = (int(part) for part in value.split("-")[:2])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got '{value}'") from None
+    if not 1 <= month <= 12:
+        raise argparse.ArgumentTypeError(f"month out of range in '{value}'")
+    return year, month
+
+
+def main(argv=None):
+    today = date.today()
+    parser = argparse.ArgumentParser(prog="python -m docgen.schedule",
+                                     description="Write printable schedules from recurring event templates.")
+    parser.add_argument("backups", nargs="+", help="backup JSON files exported from the app")
+    parser.add_argument("-o", "--out-dir", default="schedules", help="directory for the schedules")
+    parser.add_argument("-f", "--format", dest="formats", action="append", choices=list(RENDERERS),
+                        help="output format (repeatable; default: pdf)")
+    parser.add_argument("--start", type=_month, default=(today.year, today.month),
+                        help="first month, as YYYY-MM (default: this month)")
+    parser.add_argument("--months", type=int, default=12, help="number of months (default: %(default)s)")
+    parser.add_argument("--per", choices=("template", "organisation"), default="template",
+                        help="one schedule per group or one for everyone (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="rebuild schedules even if their data is unchanged")
+    add_renderer_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args(argv)
+    use_fast_docx(args.fast_docx)
+
+    formats = args.formats or ["pdf"]
+    manifest = Manifest.for_dir(args.out_dir)
+    if args.force:
+        manifest.entries.clear()
+    cache = ScheduleCache()
+    period = period_label(args.start, args.months)
+    started = time.perf_counter()
+    with tracing(args.trace, args.trace_format):
+        with span("expand"):
+            templates = list(read_templates(args.backups))
+            expandable = [anchored(template, args.start) for template in templates if template.rule is not None]
+            schedules = [(template, expand(template, args.start, args.months, cache)) for template in expandable]
+        count("occurrences", sum(len(days) for _, schedule in schedules for _, _, days in schedule))
+        if args.per == "organisation":
+            documents = [(organisation_document(schedules, args.start, args.months, period), SCHEDULE_STEM)]
+        else:
+            documents = [(template_document(template, schedule, period), template_stem(template))
+                         for template, schedule in schedules]
+        written = {}
+        for document, stem in documents:
+            written.update({str(path): fmt for fmt, path in
+                            build(formats, args.out_dir, document, stem=stem, manifest=manifest).items()})
+    manifest.save()
+    elapsed = time.perf_counter() - started
+    skipped = len(templates) - len(expandable)
+    unanchored = sum(1 for template in templates
+                     if template.rule is not None and template.rule.pattern == "biweekly" and not template.rule.anchor)
+    print(f"Templates: {len(expandable)} expanded over {args.months} months ({period}); "
+          f"{skipped} without a recurrence rule skipped; {cache.misses} template-months computed")
+    if unanchored:
+        print(f"⚠ {unanchored} biweekly templates without createdAt counted from {MONTHS[args.start[1] - 1]} "
+              f"{args.start[0]}")
+    for fmt in formats:
+        print(f"✅ {LABELS[fmt]} schedules: {sum(1 for kind in written.values() if kind == fmt)} in {args.out_dir}")
+    print(f"Manifest: {manifest.summary()} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
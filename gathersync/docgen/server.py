@@ -0,0 +1,246 @@
+"""Long-running render worker that keeps the renderers warm
+
+    python -m docgen.server --socket /tmp/docgen.sock -f pdf -f docx
+    python -m docgen.server --stdio
+
+The worker imports the renderers, compiles the theme and parses the content
+once at startup, then serves render requests from a Unix socket or from stdin.
+A request costs only the rendering itself, not interpreter startup and library
+imports.
+
+Requests and responses are JSON objects, one per line::
+
+    {"id": 1, "formats": ["pdf"], "out_dir": "packets", "stem": "ann-1a2b3c4d",
+     "variables": {"recipient": "Ann", "qr_payload": "https://..."}}
+    {"id": 1, "ok": true, "paths": {"pdf": "/srv/docgen/packets/ann-1a2b3c4d.pdf"}, "up_to_date": [],
+     "seconds": 0.05}
+
+``op`` is ``render`` (the default), ``ping``, ``stats`` or ``shutdown``.
+``out_dir`` is relative to the worker's ``--root`` and must stay inside it;
+``stem`` must be a plain file name. The reply's ``paths`` are absolute.
+Outputs are incremental per ``out_dir`` unless ``"force": true``. Each
+``out_dir``'s manifest is loaded once and kept in memory; changed manifests
+are written at most every ``--flush-seconds`` and when the worker stops. A
+failed request gets ``{"ok": false, "error": "..."}`` and the worker keeps
+running. Requests are handled one at a time.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+from pathlib import Path
+
+from .assets import AssetCache
+from .build import build
+from .content import load_document
+from .manifest import Manifest
+from .qr import QRCache
+from .renderers import RENDERERS, add_renderer_arguments, use_fast_docx, warm
+from .theme import DEFAULT_THEME
+
+
+class RequestError(ValueError):
+    """Raised for a malformed request"""
+
+
+class Worker:
+    """Warm renderers, content and image caches shared by every request"""
+
+    def __init__(self, formats=tuple(RENDERERS), qr_cache_dir=None, theme=DEFAULT_THEME, root=".",
+                 flush_seconds=5.0):
+        started = time.perf_counter()
+        warm(formats, theme)
+        self.theme = theme
+        self.document = load_document()
+        self.assets = AssetCache(qr_cache=QRCache(qr_cache_dir))
+        self.startup_seconds = time.perf_counter() - started
+        self.served = 0
+        self.failed = 0
+        self.running = True
+        self.root = Path(root).resolve()
+        self.flush_seconds = flush_seconds
+        self.manifests = {}
+        self._dirty = set()
+        self._flushed = time.monotonic()
+
+    def handle(self, request):
+        """Return the response for one decoded request"""
+        if not isinstance(request, dict):
+            raise RequestError("request must be a JSON object")
+        op = request.get("op", "render")
+        if op == "render":
+            return self.render(request)
+        if op == "ping":
+            return {"ok": True}
+        if op == "stats":
+            return {"ok": True, "served": self.served, "failed": self.failed,
+                    "startup_seconds": round(self.startup_seconds, 3),
+                    "qr_hits": self.assets.qr_cache.hits, "qr_misses": self.assets.qr_cache.misses}
+        if op == "shutdown":
+            self.running = False
+            self.flush()
+            return {"ok": True}
+        raise RequestError(f"unknown op '{op}'")
+
+    def render(self, request):
+        started = time.perf_counter()
+        formats = request.get("formats") or ["pdf"]
+        for fmt in formats:
+            if fmt not in RENDERERS:
+                raise RequestError(f"unknown format '{fmt}'")
+        variables = request.get("variables") or {}
+        if not isinstance(variables, dict):
+            raise RequestError("'variables' must be an object")
+        out_dir = self.out_dir(request.get("out_dir", "."))
+        stem = request.get("stem")
+        if stem is not None and (not isinstance(stem, str) or stem in ("", ".", "..")
+                                 or "/" in stem or "\\" in stem):
+            raise RequestError(f"'stem' must be a file name without a directory, not {stem!r}")
+        manifest = None if request.get("force") else self.manifest(out_dir)
+        if manifest is not None:
+            manifest.hits.clear()
+            manifest.misses.clear()
+        written = build(formats, out_dir, self.document, self.assets, variables, stem, manifest, self.theme)
+        if manifest is not None:
+            self._dirty.add(out_dir)
+            if time.monotonic() - self._flushed >= self.flush_seconds:
+                self.flush()
+        return {
+            "ok": True,
+            "paths": {fmt: str(path) for fmt, path in written.items()},
+            "up_to_date": [fmt for fmt, path in written.items() if manifest and str(path) in manifest.hits],
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+
+    def out_dir(self, value):
+        """``value`` resolved against the root, which it must not leave"""
+        if not isinstance(value, str):
+            raise RequestError("'out_dir' must be a string")
+        out_dir = (self.root / value).resolve()
+        if out_dir != self.root and self.root not in out_dir.parents:
+            raise RequestError(f"'out_dir' must be inside {self.root}, not {value!r}")
+        return out_dir
+
+    def manifest(self, out_dir):
+        """The in-memory manifest of ``out_dir``, read from disk on first use"""
+        manifest = self.manifests.get(out_dir)
+        if manifest is None:
+            manifest = self.manifests[out_dir] = Manifest.for_dir(out_dir)
+        return manifest
+
+    def flush(self):
+        """Write the manifests changed since the last flush"""
+        for out_dir in self._dirty:
+            self.manifests[out_dir].save()
+        self._dirty.clear()
+        self._flushed = time.monotonic()
+
+    def respond(self, line):
+        """Decode one request line and return the encoded response line"""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict):
+                request_id = request.get("id")
+            response = self.handle(request)
+            self.served += 1
+        except Exception as e:
+            self.failed += 1
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        if request_id is not None:
+            response = {"id": request_id, **response}
+        return json.dumps(response, ensure_ascii=False) + "\n"
+
+
+def serve_stdio(worker, stdin=sys.stdin, stdout=sys.stdout):
+    """Answer requests read from ``stdin`` until EOF or a ``shutdown``"""
+    for line in stdin:
+        if not line.strip():
+            continue
+        stdout.write(worker.respond(line))
+        stdout.flush()
+        if not worker.running:
+            break
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        worker = self.server.worker
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write(worker.respond(line).encode("utf-8"))
+            self.wfile.flush()
+            if not worker.running:
+                break
+
+
+def serve_socket(worker, path):
+    """Answer requests on the Unix socket ``path`` until a ``shutdown``
+
+    The socket is only accessible to the current user.
+    """
+    if os.path.exists(path):
+        os.unlink(path)
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(path, _Handler)
+    finally:
+        os.umask(umask)
+    server.worker = worker
+    try:
+        while worker.running:
+            server.handle_request()
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+def request(path, payload, timeout=None):
+    """Send one request to the worker listening on ``path`` and return its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        with client.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m docgen.server",
+                                     description="Serve render requests from a warm worker process.")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--socket", help="Unix socket path to listen on")
+    where.add_argument("--stdio", action="store_true", help="read requests from stdin, answer on stdout")
+    parser.add_argument("-f", "--format", dest="formats", action="append", choices=list(RENDERERS),
+                        help="renderer to load at startup (repeatable; default: all)")
+    parser.add_argument("--qr-cache", default=".cache/docgen/qr",
+                        help="directory for cached QR images (default: %(default)s)")
+    parser.add_argument("--root", default=".",
+                        help="directory that every request's out_dir must be inside (default: current directory)")
+    parser.add_argument("--flush-seconds", type=float, default=5.0,
+                        help="write changed manifests at most this often (default: %(default)s)")
+    add_renderer_arguments(parser)
+    args = parser.parse_args(argv)
+    use_fast_docx(args.fast_docx)
+
+    worker = Worker(args.formats or tuple(RENDERERS), args.qr_cache, root=args.root,
+                    flush_seconds=args.flush_seconds)
+    where = "stdin" if args.stdio else args.socket
+    print(f"✅ docgen worker ready in {worker.startup_seconds:.2f}s on {where}", file=sys.stderr)
+    try:
+        if args.stdio:
+            serve_stdio(worker)
+        else:
+            serve_socket(worker, args.socket)
+    finally:
+        worker.flush()
+    print(f"✔ docgen worker stopped after {worker.served} requests", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+"""Compact columnar storage for the events and participants of backups
+
+    store = Store.load(["../Backups/gathersync-backup-1.json", "../Backups/gathersync-backup-2.json"])
+    event = store.event("ev42")
+    for participant in event.participants:
+        print(participant.name, participant.status(15))
+
+A backup held as ``json.load`` returns it is one dict per event and per
+participant, plus an ``availability`` dict per participant with a string key
+for every answered date. A ``Store`` instead keeps one row per participant in
+``array`` columns:
+
+- every string (ids, names, emails, phones, notes, fixed dates and times) is
+  interned once in ``Strings`` and stored as a 4-byte code, so a person who
+  is in a hundred events has their name and email stored once;
+- ``eventType``, ``rsvpStatus`` and ``source`` are 1-byte codes into
+  ``EVENT_TYPES``, ``RSVP_STATUSES`` and ``SOURCES``;
+- availability is two 32-bit masks per participant, bit ``day - 1`` set for
+  the days of the event's month marked available or unavailable, so an event
+  is a participants × day-of-month bitmap.
+
+An event's participants are a contiguous block of rows. Soft-deleted events
+and participants are dropped as the backups are read (with ``BackupStream``,
+so the file is never held whole), as are answers for dates outside the
+event's month, which no report reads. An event found in several backups is
+kept once, as the copy with the latest ``updatedAt``. ``EventView`` and
+``ParticipantView`` are ``__slots__`` handles onto a row; ``projection``
+rebuilds the stored fields in the app's shape for code that takes dicts, one
+record at a time. It is a projection, not a round trip: fields the store does
+not keep (such as ``venueName`` or ``meetingType``) are left out.
+"""
+
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+
+from .availability import AVAILABLE, NO_RESPONSE, UNAVAILABLE, month_days
+from .backup import BackupStream
+
+EVENT_TYPES = ("flexible", "fixed")
+RSVP_STATUSES = ("", "attending", "not-attending", "no-response")  # "" when unset
+SOURCES = ("", "manual", "contacts", "ai")
+
+_ALL_MONTH = 1  # participant flag: unavailableAllMonth
+
+EVENT_COLUMNS = ("event_id", "event_name", "event_type", "year", "month", "fixed_date", "fixed_time",
+                 "created_at", "updated_at")
+PARTICIPANT_COLUMNS = ("participant_id", "name", "email", "phone", "notes", "source", "rsvp", "flags",
+                       "available", "unavailable")
+
+
+class Strings:
+    """Interned strings, each stored once and referred to by its code; code 0 is ``""``"""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values = [""]
+        self.codes = {"": 0}
+
+    def add(self, value):
+        """Code of ``value`` (``None`` is ``""``), adding it if it is new"""
+        value = "" if value is None else str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class Codes:
+    """Small-integer codes for an enumerated field; unexpected values get new codes after the known ones"""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def add(self, value):
+        value = "" if value is None else str(value)
+        code = self.codes.get(value)
+        if code is None:
+            if len(self.values) > 255:
+                raise ValueError(f"too many distinct values, including {value!r}")
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+
+@lru_cache(maxsize=None)
+def month_bits(year, month):
+    """``{ISO date: bit}`` for the days of ``month``"""
+    return {iso: 1 << day for day, iso in enumerate(month_days(year, month))}
+
+
+def day_masks(availability, year, month):
+    """``(available, unavailable)`` bit masks of an ``availability`` map's days in ``month``"""
+    bits = month_bits(year, month)
+    available = unavailable = 0
+    for iso, answer in (availability or {}).items():
+        bit = bits.get(iso)
+        if bit is None:
+            continue
+        if answer:
+            available |= bit
+        else:
+            unavailable |= bit
+    return available, unavailable
+
+
+class Store:
+    """Columns of every active event and participant of one or more backups"""
+
+    def __init__(self):
+        self.strings = Strings()
+        self.event_types = Codes(EVENT_TYPES)
+        self.rsvp_statuses = Codes(RSVP_STATUSES)
+        self.sources = Codes(SOURCES)
+        # Events: one entry per event; participants of event i are rows first[i]:first[i + 1]
+        self.event_id = array("I")
+        self.event_name = array("I")
+        self.event_type = array("B")
+        self.year = array("H")
+        self.month = array("B")
+        self.fixed_date = array("I")
+        self.fixed_time = array("I")
+        self.created_at = array("I")
+        self.updated_at = array("I")
+        self.first = array("I", [0])
+        # Participants: one entry per row
+        self.participant_id = array("I")
+        self.name = array("I")
+        self.email = array("I")
+        self.phone = array("I")
+        self.notes = array("I")
+        self.source = array("B")
+        self.rsvp = array("B")
+        self.flags = array("B")
+        self.available = array("I")
+        self.unavailable = array("I")
+        self._events = {}
+        self._superseded = []
+        self._by_participant = None
+
+    @classmethod
+    def load(cls, paths, **filters):
+        """Read the events in the backups at ``paths``, with the filters of ``BackupStream``"""
+        store = cls()
+        for path in paths:
+            for _, event in BackupStream(path, sections=("events",), **filters):
+                store.add(event)
+        store._compact()
+        return store
+
+    def add(self, event):
+        """Append an event in the app's shape; soft-deleted events and participants are skipped
+
+        If the store already has an event with the same id, the copy with the
+        later ``updatedAt`` is kept (the one already stored on a tie).
+        """
+        if event.get("deletedAt"):
+            return
+        add = self.strings.add
+        year, month = int(event.get("year") or 0), int(event.get("month") or 0)
+        event_id = str(event.get("id") or "")
+        index = self._events.get(event_id)
+        if index is not None:
+            if str(event.get("updatedAt") or "") <= self.strings[self.updated_at[index]]:
+                return
+            # Columns only grow, so the older copy's rows are dropped by the next ``_compact``
+            self._superseded.append(index)
+        self._events[event_id] = len(self.event_id)
+        self.event_id.append(add(event.get("id")))
+        self.event_name.append(add(event.get("name")))
+        self.event_type.append(self.event_types.add(event.get("eventType") or "flexible"))
+        self.year.append(year)
+        self.month.append(month)
+        self.fixed_date.append(add(event.get("fixedDate")))
+        self.fixed_time.append(add(event.get("fixedTime")))
+        self.created_at.append(add(event.get("createdAt")))
+        self.updated_at.append(add(event.get("updatedAt")))
+        for participant in event.get("participants") or []:
+            if participant.get("deletedAt"):
+                continue
+            self.participant_id.append(add(participant.get("id")))
+            self.name.append(add(participant.get("name")))
+            self.email.append(add(participant.get("email")))
+            self.phone.append(add(participant.get("phone")))
+            self.notes.append(add(participant.get("notes")))
+            self.source.append(self.sources.add(participant.get("source")))
+            self.rsvp.append(self.rsvp_statuses.add(participant.get("rsvpStatus")))
+            self.flags.append(_ALL_MONTH if participant.get("unavailableAllMonth") else 0)
+            available, unavailable = day_masks(participant.get("availability"), year, month)
+            self.available.append(available)
+            self.unavailable.append(unavailable)
+        self.first.append(len(self.participant_id))
+        self._by_participant = None
+
+    def _compact(self):
+        """Drop the events replaced by a later copy and their rows, renumbering the rest
+
+        Views taken before an event is replaced refer to the old numbering.
+        """
+        if not self._superseded:
+            return
+        dropped = set(self._superseded)
+        self._superseded = []
+        first = self.first
+        keep = [index for index in range(len(self.event_id)) if index not in dropped]
+        rows = [row for index in keep for row in range(first[index], first[index + 1])]
+        for name, kept in [(name, keep) for name in EVENT_COLUMNS] + [(name, rows) for name in PARTICIPANT_COLUMNS]:
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, (column[position] for position in kept)))
+        self.first = array("I", [0])
+        for index in keep:
+            self.first.append(self.first[-1] + first[index + 1] - first[index])
+        self._events = {self.strings[code]: index for index, code in enumerate(self.event_id)}
+        self._by_participant = None
+
+    def __len__(self):
+        self._compact()
+        return len(self.event_id)
+
+    @property
+    def rows(self):
+        """Number of participant rows across all events"""
+        self._compact()
+        return len(self.participant_id)
+
+    def events(self):
+        """``EventView`` of every event, in the order their kept copies were read"""
+        return [EventView(self, index) for index in range(len(self))]
+
+    def event(self, event_id):
+        """``EventView`` of the event with ``event_id``, or None"""
+        self._compact()
+        index = self._events.get(event_id)
+        return None if index is None else EventView(self, index)
+
+    def participants(self, participant_id):
+        """``ParticipantView`` of every row with ``participant_id``, in event order"""
+        self._compact()
+        code = self.strings.codes.get(participant_id)
+        if code is None or not code:
+            return []
+        if self._by_participant is None:
+            # Rows sorted by id code, with the codes alongside for bisecting
+            order = sorted(range(self.rows), key=self.participant_id.__getitem__)
+            self._by_participant = (array("I", (self.participant_id[row] for row in order)), array("I", order))
+        codes, order = self._by_participant
+        found = []
+        index = bisect_left(codes, code)
+        while index < len(codes) and codes[index] == code:
+            found.append(order[index])
+            index += 1
+        return [ParticipantView(self, row) for row in sorted(found)]
+
+    def participant(self, participant_id, event_id=None):
+        """``ParticipantView`` of ``participant_id`` (in ``event_id`` if given), or None"""
+        for view in self.participants(participant_id):
+            if event_id is None or view.event.id == event_id:
+                return view
+        return None
+
+    def event_of(self, row):
+        """Index of the event that participant ``row`` belongs to"""
+        return bisect_left(self.first, row + 1) - 1
+
+    def status_matrix(self, index):
+        """Participants × days ``int8`` status matrix of event ``index``, as ``availability.status_matrix``"""
+        import numpy as np
+
+        start, end = self.first[index], self.first[index + 1]
+        days = np.arange(len(month_bits(self.year[index], self.month[index])), dtype=np.uint32)
+        available = (np.array(self.available[start:end], dtype=np.uint32)[:, None] >> days) & 1
+        unavailable = (np.array(self.unavailable[start:end], dtype=np.uint32)[:, None] >> days) & 1
+        matrix = np.full(available.shape, NO_RESPONSE, dtype=np.int8)
+        matrix[unavailable == 1] = UNAVAILABLE
+        matrix[available == 1] = AVAILABLE
+        matrix[(np.array(self.flags[start:end], dtype=np.uint8) & _ALL_MONTH) == _ALL_MONTH] = UNAVAILABLE
+        return matrix
+
+    def backup(self):
+        """A backup dict whose ``events`` are the ``projection`` of each event, built as they are iterated"""
+        return {"version": "1.0", "events": (EventView(self, index).projection() for index in range(len(self)))}
+
+
+class EventView:
+    """One event of a ``Store``"""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def _string(self, column):
+        return self.store.strings[column[self.index]]
+
+    @property
+    def id(self):
+        return self._string(self.store.event_id)
+
+    @property
+    def name(self):
+        return self._string(self.store.event_name)
+
+    @property
+    def event_type(self):
+        return self.store.event_types[self.store.event_type[self.index]]
+
+    @property
+    def year(self):
+        return self.store.year[self.index]
+
+    @property
+    def month(self):
+        return self.store.month[self.index]
+
+    @property
+    def fixed_date(self):
+        return self._string(self.store.fixed_date)
+
+    @property
+    def fixed_time(self):
+        return self._string(self.store.fixed_time)
+
+    @property
+    def participants(self):
+        store = self.store
+        return [ParticipantView(store, row) for row in range(store.first[self.index], store.first[self.index + 1])]
+
+    def __len__(self):
+        return self.store.first[self.index + 1] - self.store.first[self.index]
+
+    def status_matrix(self):
+        return self.store.status_matrix(self.index)
+
+    def projection(self):
+        """The stored fields of the event in the app's backup shape
+
+        Fields the store does not keep are left out, so this is not the
+        original record; see the module docstring.
+        """
+        store, strings = self.store, self.store.strings
+        event = {"id": self.id, "name": self.name, "eventType": self.event_type,
+                 "month": self.month, "year": self.year}
+        if self.fixed_date:
+            event["fixedDate"] = self.fixed_date
+        if self.fixed_time:
+            event["fixedTime"] = self.fixed_time
+        event["participants"] = [participant.projection() for participant in self.participants]
+        for key, column in (("createdAt", store.created_at), ("updatedAt", store.updated_at)):
+            if column[self.index]:
+                event[key] = strings[column[self.index]]
+        return event
+
+    def __repr__(self):
+        return f"<EventView {self.id!r} {self.name!r}: {len(self)} participants>"
+
+
+class ParticipantView:
+    """One participant row of a ``Store``"""
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def _string(self, column):
+        return self.store.strings[column[self.row]]
+
+    @property
+    def id(self):
+        return self._string(self.store.participant_id)
+
+    @property
+    def name(self):
+        return self._string(self.store.name)
+
+    @property
+    def email(self):
+        return self._string(self.store.email)
+
+    @property
+    def phone(self):
+        return self._string(self.store.phone)
+
+    @property
+    def notes(self):
+        return self._string(self.store.notes)
+
+    @property
+    def source(self):
+        return self.store.sources[self.store.source[self.row]]
+
+    @property
+    def rsvp_status(self):
+        return self.store.rsvp_statuses[self.store.rsvp[self.row]]
+
+    @property
+    def unavailable_all_month(self):
+        return bool(self.store.flags[self.row] & _ALL_MONTH)
+
+    @property
+    def event(self):
+        return EventView(self.store, self.store.event_of(self.row))
+
+    def status(self, day):
+        """``AVAILABLE``, ``UNAVAILABLE`` or ``NO_RESPONSE`` on ``day`` of the event's month"""
+        if self.unavailable_all_month:
+            return UNAVAILABLE
+        bit = 1 << (day - 1)
+        if self.store.available[self.row] & bit:
+            return AVAILABLE
+        return UNAVAILABLE if self.store.unavailable[self.row] & bit else NO_RESPONSE
+
+    def availability(self):
+        """The ``availability`` map: ISO date to True (available) or False, for the answered days"""
+        store = self.store
+        index = store.event_of(self.row)
+        available, unavailable = store.available[self.row], store.unavailable[self.row]
+        return {iso: bool(available & bit) for iso, bit in month_bits(store.year[index], store.month[index]).items()
+                if (available | unavailable) & bit}
+
+    def projection(self):
+        """The stored fields of the participant in the app's backup shape, with only the month's answers"""
+        participant = {"id": self.id, "name": self.name, "availability": self.availability(),
+                       "unavailableAllMonth": self.unavailable_all_month}
+        for key, value in (("notes", self.notes), ("source", self.source), ("phone", self.phone),
+                           ("email", self.email), ("rsvpStatus", self.rsvp_status)):
+            if value:
+                participant[key] = value
+        return participant
+
+    def __repr__(self):
+        return f"<ParticipantView {self.id!r} {self.name!r}>"
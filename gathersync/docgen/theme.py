@@ -0,0 +1,81 @@
+"""Shared visual theme used by every renderer
+
+A ``Theme`` is immutable and built once. Renderers compile it into their own
+style objects (reportlab paragraph styles, a DOCX base template, CSS) and cache
+the result per theme, so style setup is paid once per process rather than once
+per document.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from functools import cached_property
+from types import MappingProxyType
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    size: float
+    color: str
+    bold: bool = False
+    mono: bool = False
+    leading: float = 0.0
+    space_before: float = 0.0
+    space_after: float = 0.0
+
+
+@dataclass(frozen=True, eq=False)
+class Theme:
+    font: str
+    mono_font: str
+    colors: MappingProxyType
+    styles: MappingProxyType
+
+    def __post_init__(self):
+        object.__setattr__(self, "colors", MappingProxyType(dict(self.colors)))
+        object.__setattr__(self, "styles", MappingProxyType(dict(self.styles)))
+
+    def rgb(self, color):
+        """Convert a colour name to an ``(r, g, b)`` tuple"""
+        value = self.colors[color].lstrip("#")
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+    @cached_property
+    def digest(self):
+        """Stable hash of every theme setting"""
+        spec = {"font": self.font, "mono_font": self.mono_font, "colors": dict(self.colors),
+                "styles": {role: asdict(style) for role, style in self.styles.items()}}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+DEFAULT_THEME = Theme(
+    font="Helvetica",
+    mono_font="Courier",
+    colors={
+        "text": "#1a1a1a",
+        "muted": "#4a4a4a",
+        "body": "#2a2a2a",
+        "accent": "#2563eb",
+        "code_background": "#f3f4f6",
+    },
+    # Text styles keyed by role. Sizes are in points.
+    styles={
+        "title": TextStyle(28, "text", bold=True, space_after=12),
+        "subtitle": TextStyle(16, "muted", space_after=20),
+        "heading2": TextStyle(18, "accent", bold=True, space_before=20, space_after=12),
+        "heading3": TextStyle(14, "text", bold=True, space_before=12, space_after=8),
+        "heading4": TextStyle(11, "body", bold=True, space_after=6),
+        "body": TextStyle(11, "body", leading=16, space_after=6),
+        "small": TextStyle(9, "body", space_after=6),
+        "code": TextStyle(9, "accent", mono=True),
+    },
+)
+
+
+def style_for(block):
+    """Return the style role name used for ``block``"""
+    if block.kind == "heading":
+        return f"heading{block.level}"
+    if block.kind in ("title", "subtitle", "code"):
+        return block.kind
+    return "small" if block.small else "body"
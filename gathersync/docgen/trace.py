@@ -0,0 +1,206 @@
+"""Per-stage timing spans and counters for the generators
+
+    python -m docgen --trace trace.jsonl
+    python -m docgen.batch backup.json --trace metrics.prom
+
+Instrumented code wraps each stage in ``with span("layout", format="pdf"):``
+and reports sizes with ``count("pages", 3, format="pdf")``. Tracing is off
+unless a tracer is enabled: ``span`` then returns a shared no-op context
+manager and ``count`` returns at once, so the hooks cost a function call.
+
+A tracer writes either JSON lines (one object per span or count, tagged with
+the document being rendered) as they happen, or a Prometheus text dump of the
+totals per stage and format when it is closed.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+FORMATS = ("jsonl", "prometheus")
+
+_tracer = None
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "wall", "started")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add_span(self.name, self.wall, time.perf_counter() - self.started, self.attrs)
+        return False
+
+
+class Tracer:
+    """Collects spans and counters, totalled per stage and format
+
+    With ``keep`` the raw events are also retained until ``drain`` is called,
+    which is how batch workers hand their events to the parent process.
+    """
+
+    def __init__(self, path=None, fmt="jsonl", keep=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"trace format must be one of {', '.join(FORMATS)}")
+        self.path = path
+        self.fmt = fmt
+        self.document = None
+        self.stages = {}  # (name, format) -> [calls, seconds]
+        self.counters = {}  # (name, format) -> value
+        self.events = [] if keep else None
+        self._file = open(path, "a", encoding="utf-8") if path and fmt == "jsonl" else None
+
+    def _emit(self, event):
+        if self.document is not None and "document" not in event:
+            event["document"] = self.document
+        if self._file is not None:
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        if self.events is not None:
+            self.events.append(event)
+
+    def add_span(self, name, wall, seconds, attrs):
+        key = (name, attrs.get("format", ""))
+        totals = self.stages.get(key)
+        if totals is None:
+            totals = self.stages[key] = [0, 0.0]
+        totals[0] += 1
+        totals[1] += seconds
+        self._emit({"type": "span", "name": name, "start": round(wall, 6), "seconds": round(seconds, 6),
+                    "pid": os.getpid(), **attrs})
+
+    def count(self, name, value, attrs):
+        key = (name, attrs.get("format", ""))
+        self.counters[key] = self.counters.get(key, 0) + value
+        self._emit({"type": "count", "name": name, "value": value, **attrs})
+
+    def drain(self):
+        """Return and forget the events kept since the last call"""
+        events, self.events = self.events or [], []
+        return events
+
+    def merge(self, events):
+        """Replay events drained from another tracer"""
+        for event in events:
+            event = dict(event)
+            kind, name = event.pop("type"), event.pop("name")
+            if kind == "span":
+                seconds, wall = event.pop("seconds"), event.pop("start")
+                self.add_span(name, wall, seconds, event)
+            else:
+                self.count(name, event.pop("value"), event)
+
+    def prometheus(self):
+        """Render the totals in the Prometheus text exposition format"""
+        lines = ["# HELP docgen_stage_seconds_total Wall time spent per generator stage.",
+                 "# TYPE docgen_stage_seconds_total counter"]
+        for (name, fmt), (_, seconds) in sorted(self.stages.items()):
+            lines.append(f'docgen_stage_seconds_total{{stage="{name}",format="{fmt}"}} {seconds:.6f}')
+        lines += ["# HELP docgen_stage_calls_total Times each generator stage ran.",
+                  "# TYPE docgen_stage_calls_total counter"]
+        for (name, fmt), (calls, _) in sorted(self.stages.items()):
+            lines.append(f'docgen_stage_calls_total{{stage="{name}",format="{fmt}"}} {calls}')
+        for metric in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE docgen_{metric}_total counter")
+            for (name, fmt), value in sorted(self.counters.items()):
+                if name == metric:
+                    lines.append(f'docgen_{name}_total{{format="{fmt}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        elif self.path and self.fmt == "prometheus":
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+
+
+def span(name, **attrs):
+    """Time the enclosed block as stage ``name`` when tracing is enabled"""
+    if _tracer is None:
+        return _NO_SPAN
+    return _Span(_tracer, name, attrs)
+
+
+def count(name, value=1, **attrs):
+    """Add ``value`` to the counter ``name`` when tracing is enabled"""
+    if _tracer is not None:
+        _tracer.count(name, value, attrs)
+
+
+@contextmanager
+def document(path):
+    """Attribute the spans and counts inside the block to the output ``path``"""
+    if _tracer is None:
+        yield
+        return
+    previous, _tracer.document = _tracer.document, str(path)
+    try:
+        yield
+    finally:
+        _tracer.document = previous
+
+
+def active():
+    """Return the enabled tracer, or None"""
+    return _tracer
+
+
+def enable(tracer):
+    global _tracer
+    _tracer = tracer
+    return tracer
+
+
+def disable():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def guess_format(path):
+    return "prometheus" if str(path).endswith((".prom", ".txt")) else "jsonl"
+
+
+@contextmanager
+def tracing(path=None, fmt=None):
+    """Trace the enclosed block into ``path`` (nothing is traced without a path)"""
+    if not path:
+        yield None
+        return
+    tracer = enable(Tracer(path, fmt or guess_format(path)))
+    try:
+        yield tracer
+    finally:
+        disable()
+        tracer.close()
+
+
+def add_trace_arguments(parser):
+    """Add the ``--trace`` options shared by the command line tools"""
+    parser.add_argument("--trace", metavar="FILE", default=None,
+                        help="record per-stage timings and counters in FILE")
+    parser.add_argument("--trace-format", choices=FORMATS, default=None,
+                        help="trace output format (default: prometheus for .prom/.txt files, else jsonl)")
@@ -0,0 +1,31 @@
+"""Make ``docgen`` and ``benchmarks`` importable however pytest is started"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+GATHERSYNC = Path(__file__).resolve().parents[2]
+if str(GATHERSYNC) not in sys.path:
+    sys.path.insert(0, str(GATHERSYNC))
+
+
+@pytest.fixture(scope="session")
+def document():
+    from docgen import load_document
+
+    return load_document()
+
+
+@pytest.fixture
+def write_backup(tmp_path):
+    """``write_backup(name, events=(), snapshots=())`` writes a backup file under ``tmp_path`` and returns its path"""
+
+    def write(name, events=(), snapshots=(), exported_at="2025-03-03T00:00:00Z"):
+        path = tmp_path / name
+        path.write_text(json.dumps({"version": "1.0", "exportedAt": exported_at, "events": list(events),
+                                    "snapshots": list(snapshots), "templates": []}), encoding="utf-8")
+        return path
+
+    return write
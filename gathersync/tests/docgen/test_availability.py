@@ -0,0 +1,53 @@
+from docgen.availability import summarise, summarise_flexible
+
+
+def flexible(event_id, participants, month=3, updated_at="2025-03-01T00:00:00Z", name=None):
+    return {"id": event_id, "name": name or event_id, "eventType": "flexible", "year": 2025, "month": month,
+            "updatedAt": updated_at, "participants": participants}
+
+
+BREAKFAST = flexible("breakfast", [
+    {"id": "p1", "availability": {"2025-03-05": True, "2025-03-06": True, "2025-03-07": False}},
+    {"id": "p2", "availability": {"2025-03-05": False, "2025-03-06": True, "2025-04-06": True}},
+    {"id": "p3", "unavailableAllMonth": True, "availability": {"2025-03-06": True}},
+    {"id": "p4", "deletedAt": "2025-03-02T00:00:00Z", "availability": {"2025-03-09": True}},
+    {"id": "p5", "availability": {"2025-03-08": True}},
+])
+
+
+def test_counts_per_day():
+    summary, = summarise_flexible([BREAKFAST])
+    assert summary.participants == 4 and len(summary.days) == 31
+    day = {iso: index for index, iso in enumerate(summary.days)}
+    assert [summary.available[day[f"2025-03-0{n}"]] for n in (5, 6, 7, 8, 9)] == [1, 2, 0, 1, 0]
+    assert [summary.unavailable[day[f"2025-03-0{n}"]] for n in (5, 6, 7, 8, 9)] == [2, 1, 2, 1, 1]
+    assert [summary.no_response[day[f"2025-03-0{n}"]] for n in (5, 6, 7, 8, 9)] == [1, 1, 2, 2, 3]
+
+
+def test_ranking_prefers_most_available_then_fewest_unavailable():
+    summary, = summarise_flexible([BREAKFAST])
+    assert summary.best == ("2025-03-06",)
+    assert summary.ranked == ("2025-03-06", "2025-03-08", "2025-03-05")
+    assert summarise_flexible([BREAKFAST], top=2)[0].ranked == ("2025-03-06", "2025-03-08")
+
+
+def test_events_are_counted_separately_within_a_month():
+    empty = flexible("empty", [])
+    tied = flexible("tied", [{"id": "q1", "availability": {"2025-03-02": True, "2025-03-01": True}}])
+    april = flexible("april", [{"id": "q2", "availability": {"2025-04-30": True}}], month=4)
+    summaries = {summary.event_id: summary for summary in summarise_flexible([tied, april, BREAKFAST, empty])}
+    assert summaries["breakfast"].ranked == summarise_flexible([BREAKFAST])[0].ranked
+    assert summaries["empty"].best == () and summaries["empty"].ranked == ()
+    assert summaries["tied"].best == ("2025-03-01", "2025-03-02")
+    assert summaries["april"].best == ("2025-04-30",) and len(summaries["april"].days) == 30
+
+
+def test_summarise_keeps_the_latest_copy_of_each_event():
+    renamed = dict(BREAKFAST, name="Breakfast renamed", updatedAt="2025-03-02T00:00:00Z")
+    fixed = {"id": "lunch", "name": "Lunch", "eventType": "fixed", "fixedDate": "2025-03-05",
+             "participants": [{"id": "r1", "rsvpStatus": "attending"}, {"id": "r2"}]}
+    backups = [{"events": [BREAKFAST, fixed]}, {"events": [renamed, fixed]}, {"events": [BREAKFAST]}]
+    flexible_summaries, fixed_summaries = summarise(backups)
+    assert [summary.name for summary in flexible_summaries] == ["Breakfast renamed"]
+    assert [(summary.name, summary.attending, summary.no_response) for summary in fixed_summaries] == [
+        ("Lunch", 1, 1)]
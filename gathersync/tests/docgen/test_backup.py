@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from benchmarks.data import synthetic_backup
+from docgen.backup import BackupError, BackupStream, open_backup
+
+
+@pytest.fixture
+def backup_file(tmp_path):
+    backup = synthetic_backup(30)
+    backup["events"][0]["name"] = "Café \"Guru\" \\ Breakfast 🎉"
+    backup["events"][1]["reminderDaysBefore"] = -1.5e-3
+    path = tmp_path / "backup.json"
+    path.write_text(json.dumps(backup, indent=1), encoding="utf-8")
+    return path, backup
+
+
+class RecordingStream(BackupStream):
+    """Remembers the largest buffer it held"""
+
+    largest = 0
+
+    def _read(self, size):
+        super()._read(size)
+        self.largest = max(self.largest, len(self._buffer))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_records_match_json_load_at_any_chunk_size(backup_file, chunk_size):
+    path, backup = backup_file
+    stream = BackupStream(path, chunk_size=chunk_size)
+    assert [event for _, event in stream] == backup["events"]
+    assert stream.header == {"version": "1.0", "exportedAt": backup["exportedAt"]}
+
+
+def test_filters_apply_as_events_are_read(backup_file):
+    path, backup = backup_file
+    fixed = [event["id"] for _, event in BackupStream(path, event_types=["fixed"], month=2)]
+    assert fixed == [event["id"] for event in backup["events"] if event["eventType"] == "fixed" and event["month"] == 2]
+    assert [event["id"] for event in open_backup(path, event_ids=["ev1"])["events"]] == ["ev1"]
+
+
+def test_a_malformed_record_fails_without_reading_the_rest(tmp_path):
+    good = json.dumps({"id": "ev", "participants": [{"name": "x" * 200}] * 50})
+    path = tmp_path / "backup.json"
+    path.write_text('{"version": "1.0", "exportedAt": "now", "events": [' + good + ', {"id": "bad" "name": 1}, '
+                    + ", ".join([good] * 500) + "]}", encoding="utf-8")
+    stream = RecordingStream(path, chunk_size=1024)
+    with pytest.raises(BackupError, match=r"invalid JSON at character \d+: Expecting ',' delimiter"):
+        list(stream)
+    assert stream.largest < 4 * len(good)
+
+
+def test_a_truncated_file_fails_at_the_end(tmp_path):
+    path = tmp_path / "backup.json"
+    path.write_text('{"version": "1.0", "exportedAt": "now", "events": [{"id": "ev1", "name": "Caf\\u00', encoding="utf-8")
+    with pytest.raises(BackupError, match="invalid JSON"):
+        list(BackupStream(path, chunk_size=8))
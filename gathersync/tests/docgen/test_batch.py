@@ -0,0 +1,50 @@
+from benchmarks.suite import packet_jobs
+from docgen import Manifest
+from docgen.batch import run_batch
+
+
+def test_run_batch_pulls_jobs_only_as_workers_free_up(tmp_path, document):
+    jobs = packet_jobs(6, document.variables["join_url"])
+    pulled, seen = [], []
+
+    def source():
+        for job in jobs:
+            pulled.append(job["key"])
+            yield job
+
+    def progress(done, job, rendered, error):
+        seen.append(len(pulled))
+
+    result = run_batch(source(), ["md"], tmp_path, workers=1, max_pending=2, progress=progress)
+    assert not result.failures and len(result.rendered) == len(jobs)
+    assert seen[0] <= 2  # nothing beyond the jobs in flight was built before the first packet finished
+    assert all((tmp_path / f"{job['stem']}.md").exists() for job in jobs)
+
+
+def test_run_batch_skips_unchanged_packets(tmp_path, document):
+    jobs = packet_jobs(3, document.variables["join_url"])
+    manifest = Manifest.for_dir(tmp_path)
+    run_batch(iter(jobs), ["md"], tmp_path, workers=1, manifest=manifest)
+    manifest.save()
+    again = run_batch(iter(jobs), ["md"], tmp_path, workers=1, manifest=Manifest.for_dir(tmp_path))
+    assert again.rendered == [] and sorted(again.skipped) == sorted(job["key"] for job in jobs)
+
+
+def test_overlapping_backups_list_each_event_once_with_its_latest_name(write_backup):
+    from docgen.backup import open_backup, recipients
+    from docgen.dedup import Directory, build_directory, cluster, read_records
+
+    def event(name, updated_at, event_id="e1"):
+        return {"id": event_id, "name": name, "eventType": "fixed", "fixedDate": "2025-03-05",
+                "updatedAt": updated_at,
+                "participants": [{"id": f"{event_id}-p1", "name": "Ada", "email": "ada@example.com"}]}
+
+    paths = [write_backup("monday.json", [event("Event 1", "2025-03-01T00:00:00Z"),
+                                          event("Event 0", "2025-03-01T00:00:00Z", "e0")]),
+             write_backup("tuesday.json", [event("Event 1 renamed", "2025-03-02T00:00:00Z"),
+                                           event("Event 0", "2025-03-01T00:00:00Z", "e0")]),
+             write_backup("monday (1).json", [event("Event 1", "2025-03-01T00:00:00Z")])]
+    directory = Directory(build_directory(cluster(list(read_records(paths)))))
+    for people in (recipients(map(open_backup, paths)), recipients(map(open_backup, paths), directory)):
+        ada, = people
+        assert sorted(event["name"] for event, _ in ada.events) == ["Event 0", "Event 1 renamed"]
@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks.suite import packet_jobs
+from docgen import AssetCache
+from docgen.combined import packet_flowables, write_combined
+
+pytest.importorskip("reportlab")
+
+
+@pytest.fixture(scope="module")
+def jobs(document):
+    return packet_jobs(5, document.variables["join_url"])
+
+
+def test_stream_build_matches_build(tmp_path, document, jobs):
+    from docgen.renderers.pdf import compiled_styles, new_doc_template, stream_build
+
+    styles, assets = compiled_styles(), AssetCache()
+    streamed = new_doc_template(tmp_path / "streamed.pdf", document.title, invariant=1)
+    stream_build(streamed, packet_flowables(document, jobs, styles, assets), lookahead=4)
+    built = new_doc_template(tmp_path / "built.pdf", document.title, invariant=1)
+    built.build(list(packet_flowables(document, jobs, styles, assets)))
+    assert streamed.page == built.page > len(jobs)
+    assert (tmp_path / "streamed.pdf").read_bytes() == (tmp_path / "built.pdf").read_bytes()
+
+
+def test_write_combined_splits_volumes(tmp_path, document, jobs):
+    volumes = write_combined(tmp_path / "packets.pdf", jobs, document, AssetCache(), volume_size=2)
+    assert [volume.path.name for volume in volumes] == ["packets-0001.pdf", "packets-0002.pdf", "packets-0003.pdf"]
+    assert [volume.packets for volume in volumes] == [2, 2, 1]
+    assert all(volume.pages >= volume.packets and volume.path.read_bytes().startswith(b"%PDF-")
+               for volume in volumes)
@@ -0,0 +1,87 @@
+import pytest
+
+from docgen.content import Block, ContentError, Run, bind, expand, parse_document, parse_inline, plain_text
+
+
+def source(*blocks, **variables):
+    return {"title": "Test", "variables": variables, "blocks": list(blocks)}
+
+
+def test_parse_inline_splits_bold_and_italic_runs():
+    assert parse_inline("Open the **App Store** *now*") == (
+        Run("Open the "), Run("App Store", bold=True), Run(" "), Run("now", italic=True))
+
+
+def test_expand_fills_known_placeholders_and_keeps_unknown_ones():
+    assert expand("Hi {name}, see {missing}", {"name": "Jane"}) == "Hi Jane, see {missing}"
+    assert plain_text(parse_inline("**{name}**!"), {"name": "Jane"}) == "Jane!"
+
+
+def test_parse_document_builds_blocks_with_defaults():
+    document = parse_document(source(
+        {"type": "title", "text": "Welcome"},
+        {"type": "heading", "level": 3, "text": "Step 1"},
+        {"type": "list", "ordered": True, "start": 4, "items": ["One", {"text": "Two", "items": ["Nested"]}]},
+        {"type": "table", "rows": [["Date", "Count"], ["2026-01-01", 3]]},
+        {"type": "rule"},
+        {"type": "page_break"},
+    ))
+    title, heading, listing, table, rule, page_break = document.blocks
+    assert title.align == "center" and heading.level == 3 and heading.align == "left"
+    assert listing.ordered and listing.start == 4
+    assert listing.items[1].children.items[0].runs == (Run("Nested"),)
+    assert table.rows == (("Date", "Count"), ("2026-01-01", "3"))
+    assert rule == Block("rule") and page_break == Block("page_break")
+
+
+def test_digest_follows_the_source():
+    one = parse_document(source({"type": "paragraph", "text": "One"}))
+    again = parse_document(source({"type": "paragraph", "text": "One"}))
+    two = parse_document(source({"type": "paragraph", "text": "Two"}))
+    assert one.digest == again.digest != two.digest
+
+
+@pytest.mark.parametrize("block, message", [
+    ({"type": "banner", "text": "x"}, "unknown block type 'banner'"),
+    ({"type": "paragraph"}, "missing 'text'"),
+    ({"type": "paragraph", "text": "Hi {nobody}"}, "unknown placeholder '{nobody}'"),
+    ({"type": "heading", "level": 1, "text": "x"}, "heading level must be 2, 3 or 4"),
+    ({"type": "paragraph", "align": "right", "text": "x"}, "align must be 'left' or 'center'"),
+    ({"type": "list", "items": []}, "'items' must be a non-empty list"),
+    ({"type": "table", "rows": [["a", "b"], ["c"]]}, "blocks[0].rows[1]: expected 2 cells, got 1"),
+    ({"type": "qr", "payload": "x", "error_correction": "Z"}, "error_correction must be one of"),
+    ({"type": "paragraph", "when": "nobody", "text": "x"}, "unknown condition variable 'nobody'"),
+    ({"type": "event_list", "source": "name"}, "event list source 'name' must be a list variable"),
+])
+def test_parse_document_names_the_offending_block(block, message):
+    with pytest.raises(ContentError, match=r"^blocks\[0\]") as error:
+        parse_document(source(block, name="Jane"))
+    assert message in str(error.value)
+
+
+def test_bind_drops_conditional_blocks_unless_their_variable_is_set():
+    document = parse_document(source({"type": "paragraph", "when": "recipient", "text": "For {recipient}"},
+                                     {"type": "paragraph", "text": "Always"}, recipient=""))
+    assert [block.runs for block in bind(document, document.values()).blocks] == [(Run("Always"),)]
+    assert len(bind(document, document.values({"recipient": "Jane"})).blocks) == 2
+
+
+def test_bind_expands_event_lists_and_reuses_static_blocks():
+    document = parse_document(source(
+        {"type": "paragraph", "text": "Static"},
+        {"type": "event_list"},
+        {"type": "list", "items": [{"text": "Your events:", "items": "events"}]},
+        events=[],
+    ))
+    events = [{"name": "AI Guys", "description": "Monthly flexible event"}]
+    static, flat, nested = bind(document, document.values({"events": events})).blocks
+    assert static is document.blocks[0]
+    expected = (Run("AI Guys", bold=True), Run(" - Monthly flexible event"))
+    assert flat.kind == "list" and flat.items[0].runs == expected
+    assert nested.items[0].children.items[0].runs == expected
+
+
+def test_the_shipped_instructions_parse(document):
+    kinds = {block.kind for block in document.blocks}
+    assert {"title", "heading", "list", "qr", "code", "rule", "page_break"} <= kinds
+    assert isinstance(document.variables["events"], list)
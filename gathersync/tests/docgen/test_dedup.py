@@ -0,0 +1,39 @@
+from docgen.backup import participant_key, recipients
+from docgen.dedup import Directory, build_directory, cluster, read_records
+from docgen.ics import write_feeds
+
+EVENTS = [
+    {"id": "e1", "name": "Breakfast", "eventType": "fixed", "fixedDate": "2025-03-05",
+     "participants": [{"id": "p1", "name": "Ada Lovelace", "email": "ada@example.com"},
+                      {"id": "p2", "name": "Bo", "phone": "0400 000 000"}]},
+    {"id": "e2", "name": "Lunch", "eventType": "fixed", "fixedDate": "2025-03-06",
+     "participants": [{"id": "p9", "name": "ada lovelace", "email": "ADA@example.com "}]},
+]
+
+
+def test_directory_merges_records_and_keys_newcomers_by_contact(write_backup):
+    path = write_backup("backup.json", EVENTS)
+    directory = Directory(build_directory(cluster(list(read_records([path])))))
+    ada = directory.key(EVENTS[0], EVENTS[0]["participants"][0])
+    assert ada.startswith("person-") and directory.key(EVENTS[1], EVENTS[1]["participants"][0]) == ada
+    assert directory.person(ada)["emails"] == ["ada@example.com"]
+    newcomer = {"id": "p10", "name": "Ada", "email": "ada@example.com"}
+    assert directory.key({"id": "e3"}, newcomer) == ada
+    stranger = {"id": "p11", "name": "Cy"}
+    assert directory.key({"id": "e3"}, stranger) == participant_key(stranger)
+    assert directory.person(participant_key(stranger)) is None
+
+
+def test_packets_and_feeds_group_people_the_same_way(tmp_path, write_backup):
+    path = write_backup("backup.json", EVENTS)
+    directory = Directory(build_directory(cluster(list(read_records([path])))))
+    stranger = {"id": "p12", "name": "Cy"}
+    events = [EVENTS[0], dict(EVENTS[1], participants=EVENTS[1]["participants"] + [stranger])]
+    path = write_backup("later.json", events)
+    people = recipients([{"events": events}], directory)
+    feeds = write_feeds([path], tmp_path / "feeds", per="user", directory=directory)
+    assert sorted(f"{recipient.stem}.ics" for recipient in people) == sorted(
+        name.rsplit("/", 1)[-1] for name in feeds)
+    ada = directory.key(EVENTS[0], EVENTS[0]["participants"][0])
+    assert len(people) == 3 and [len(recipient.events) for recipient in people if recipient.key == ada] == [2]
+    assert {recipient.name for recipient in people} == {directory.person(ada)["name"], "Bo", "Cy"}
@@ -0,0 +1,46 @@
+from docgen.deltas import LIVE, DeltaCache, event_deltas
+
+
+def snapshot(snapshot_id, saved_at, availability):
+    participants = [{"id": "p1", "name": "Ada", "availability": availability}]
+    return {"id": snapshot_id, "eventId": "e1", "savedAt": saved_at,
+            "event": {"id": "e1", "name": "Breakfast", "participants": participants}}
+
+
+def test_snapshots_repeated_across_backups_pair_once(write_backup):
+    first = snapshot("s1", "2025-03-01T00:00:00Z", {"2025-03-05": True})
+    second = snapshot("s2", "2025-03-02T00:00:00Z", {"2025-03-05": True, "2025-03-06": False})
+    paths = [write_backup("monday.json", snapshots=[first]),
+             write_backup("tuesday.json", snapshots=[first, second])]
+    deltas = event_deltas(paths, live=False)
+    assert [(delta.before, delta.after) for delta in deltas] == [(first["savedAt"], second["savedAt"])]
+    assert deltas[0].participants[0].unavailable == ("2025-03-06",)
+
+
+def test_live_event_is_compared_with_the_latest_snapshot(tmp_path, write_backup):
+    saved = snapshot("s1", "2025-03-01T00:00:00Z", {})
+    event = dict(saved["event"], updatedAt="2025-03-02T00:00:00Z",
+                 participants=[{"id": "p1", "name": "Ada", "availability": {"2025-03-05": True}}])
+    paths = [write_backup(f"backup-{n}.json", [event], [saved]) for n in range(3)]
+    cache = DeltaCache(tmp_path / "cache")
+    deltas = event_deltas(paths, cache=cache)
+    assert [(delta.before, delta.after) for delta in deltas] == [(saved["savedAt"], LIVE)]
+    assert event_deltas(paths, cache=DeltaCache(tmp_path / "cache")) == deltas
+
+
+def test_database_rows_follow_the_filters_of_their_event(write_backup):
+    events = [{"id": "e1", "name": "Breakfast", "eventType": "flexible", "year": 2025, "month": 3},
+              {"id": "e2", "name": "Lunch", "eventType": "fixed", "year": 2025, "month": 4}]
+    rows = [{"id": f"{event_id}-{day}", "event_id": event_id, "snapshot_date": f"2025-03-0{day}",
+             "participants": [{"id": "p1", "name": "Ada", "availability": {f"2025-03-0{day}": True}}]}
+            for event_id in ("e1", "e2", "gone") for day in (1, 2)]
+    path = write_backup("db.json", events, rows)
+
+    def event_ids(**filters):
+        return sorted(delta.event_id for delta in event_deltas([path], live=False, **filters))
+
+    assert event_ids() == ["e1", "e2", "gone"]
+    assert event_ids(month=3) == ["e1"]
+    assert event_ids(event_types=["fixed"]) == ["e2"]
+    assert event_ids(year=2024) == []
+    assert event_ids(event_ids=["gone"]) == ["gone"]
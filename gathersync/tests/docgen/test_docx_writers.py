@@ -0,0 +1,66 @@
+import pytest
+
+from benchmarks.docx_writers import differences
+from benchmarks.suite import STAGES, bench, packet_jobs
+from docgen import AssetCache, build
+from docgen.content import bind
+from docgen.manifest import fingerprint
+from docgen.renderers import get_renderer, use_fast_docx
+
+pytest.importorskip("docx")
+
+
+@pytest.fixture
+def fast_docx():
+    use_fast_docx()
+    yield
+    use_fast_docx(False)
+
+
+def test_python_docx_is_the_default():
+    assert get_renderer("docx").__name__ == "docgen.renderers.word"
+
+
+def test_fast_writer_is_opt_in(fast_docx):
+    assert get_renderer("docx").__name__ == "docgen.renderers.word_fast"
+
+
+def test_fast_writer_matches_the_object_model(tmp_path, document):
+    from docgen.renderers import word, word_fast
+
+    assets = AssetCache()
+    cases = [{}] + [job["values"] for job in packet_jobs(5, document.variables["join_url"])]
+    for index, variables in enumerate(cases):
+        values = document.values(variables)
+        bound = bind(document, values)
+        model, fast = tmp_path / f"{index}-model.docx", tmp_path / f"{index}-fast.docx"
+        word.render(bound, model, assets, values)
+        word_fast.render(bound, fast, assets, values)
+        assert differences(model, fast) == [], index
+
+
+def test_switching_writer_rebuilds(tmp_path, document):
+    assets = AssetCache()
+    values = document.values()
+    bound = bind(document, values)
+    before = fingerprint("docx", bound, assets, values)
+    use_fast_docx()
+    try:
+        assert fingerprint("docx", bound, assets, values) != before
+        assert build(["docx"], tmp_path, document, assets)["docx"].exists()
+    finally:
+        use_fast_docx(False)
+
+
+def test_suite_times_each_writer_through_render(tmp_path, document):
+    pytest.importorskip("reportlab")
+    jobs = packet_jobs(2, document.variables["join_url"])
+    for name, layout in (("pdf", True), ("docx", False), ("docx_fast", False)):
+        out_dir = tmp_path / name
+        out_dir.mkdir()
+        totals, pages = bench(name, document, jobs, AssetCache(), out_dir)
+        assert list(totals) == list(STAGES)
+        assert (totals["layout"] is not None) == layout
+        assert totals["flowables"] > 0 and totals["save"] > 0
+        assert (pages is not None) == layout
+        assert len(list(out_dir.iterdir())) == 2
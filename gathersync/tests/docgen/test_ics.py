@@ -0,0 +1,75 @@
+import json
+import re
+from datetime import date
+
+import pytest
+
+from benchmarks.data import synthetic_backup
+from docgen.availability import summarise_flexible
+from docgen.ics import _stamp, best_day, vevent, write_feeds
+
+EVENT = {"id": "e1", "name": "Breakfast", "eventType": "flexible", "year": 2025, "month": 3,
+         "participants": [{"id": "p1", "name": "Ada", "availability": {"2025-03-04": True, "2025-03-05": True}},
+                          {"id": "p2", "name": "Bo", "availability": {"2025-03-05": True}},
+                          {"id": "p3", "name": "Cy", "unavailableAllMonth": True}]}
+
+
+@pytest.mark.parametrize("iso, stamp", [
+    ("2025-03-01T10:00:00.123Z", "20250301T100000Z"),
+    ("2025-03-01T10:00:00+10:00", "20250301T000000Z"),
+    ("2025-02-28T20:30:00-05:00", "20250301T013000Z"),
+    ("2025-03-01T10:00:00", "20250301T100000Z"),
+    ("not a date", ""),
+])
+def test_stamp_converts_to_utc(iso, stamp):
+    assert _stamp(iso) == stamp
+
+
+def test_every_vevent_has_a_dtstamp():
+    assert "DTSTAMP:20250303T000000Z\r\n" in vevent(EVENT, "2025-03-03T00:00:00Z")
+    assert re.search(r"DTSTAMP:\d{8}T\d{6}Z\r\n", vevent(EVENT))
+    assert "DTSTAMP:20250302T000000Z\r\n" in vevent(dict(EVENT, updatedAt="2025-03-02T10:00:00+10:00"),
+                                                     "2025-03-03T00:00:00Z")
+
+
+def test_best_day_matches_the_report():
+    assert best_day(EVENT) == (date(2025, 3, 5), 2, 3)
+    for event in synthetic_backup(60)["events"]:
+        if event["eventType"] != "flexible":
+            continue
+        summary, = summarise_flexible([event])
+        best = best_day(event)
+        assert (best[0].isoformat() if best else None) == (summary.best[0] if summary.best else None)
+
+
+def test_feeds_stamp_undated_events_with_the_export_time(tmp_path):
+    backup = {"version": "1.0", "exportedAt": "2025-03-03T12:00:00+01:00", "events": [EVENT],
+              "snapshots": [], "templates": []}
+    path = tmp_path / "backup.json"
+    path.write_text(json.dumps(backup), encoding="utf-8")
+    written = write_feeds([path], tmp_path / "feeds")
+    feed, = written
+    assert "DTSTAMP:20250303T110000Z\r\n" in open(feed, encoding="utf-8", newline="").read()
+
+
+def test_feeds_keep_the_newest_copy_under_the_event_id(tmp_path, write_backup):
+    older = dict(EVENT, name="Breakfast", updatedAt="2025-03-01T00:00:00Z")
+    newer = dict(EVENT, name="Brunch", updatedAt="2025-03-02T00:00:00Z",
+                 participants=EVENT["participants"][:1])
+    for order in ([older, newer], [newer, older]):
+        paths = [write_backup(f"backup-{index}.json", [event]) for index, event in enumerate(order)]
+        out = tmp_path / f"feeds-{order[0]['name']}"
+        feeds = write_feeds(paths, out)
+        assert [path.name for path in out.iterdir()] == ["event-e1.ics"] and len(feeds) == 1
+        text = (out / "event-e1.ics").read_text(encoding="utf-8")
+        assert "SUMMARY:Brunch" in text and "Breakfast" not in text
+        users = write_feeds(paths, tmp_path / f"users-{order[0]['name']}", per="user")
+        assert len(users) == 1 and "SUMMARY:Brunch" in open(next(iter(users)), encoding="utf-8").read()
+
+
+def test_event_stem_uses_the_id_only():
+    from docgen.ics import event_stem
+
+    assert event_stem({"id": "ev42", "name": "Any name"}) == "event-ev42"
+    assert event_stem({"id": "../x"}) != event_stem({"id": "../y"})
+    assert "/" not in event_stem({"id": "../x"})
@@ -0,0 +1,69 @@
+import json
+
+from docgen import AssetCache, Manifest, build, parse_document
+from docgen.content import bind
+from docgen.manifest import MANIFEST_NAME, fingerprint
+
+
+def simple_document(text="Hello {name}"):
+    return parse_document({"title": "Test", "variables": {"name": "Jane"},
+                           "blocks": [{"type": "paragraph", "text": text}]})
+
+
+def test_fingerprint_changes_with_every_input():
+    document, assets = simple_document(), AssetCache()
+    values = document.values()
+    base = fingerprint("md", bind(document, values), assets, values)
+    assert base == fingerprint("md", bind(document, values), assets, dict(values))
+    assert base != fingerprint("html", bind(document, values), assets, values)
+    assert base != fingerprint("md", bind(document, values), assets, document.values({"name": "Tom"}))
+    changed = simple_document("Goodbye {name}")
+    assert base != fingerprint("md", bind(changed, values), assets, values)
+
+
+def test_manifest_is_fresh_only_for_an_existing_output_with_the_recorded_digest(tmp_path):
+    output = tmp_path / "out.md"
+    manifest = Manifest.for_dir(tmp_path)
+    manifest.record(output, "abc")
+    assert not manifest.is_fresh(output, "abc")  # not written yet
+    output.write_text("x")
+    assert manifest.is_fresh(output, "abc")
+    assert not manifest.is_fresh(output, "def")
+    assert manifest.summary() == "1 up to date, 2 rebuilt"
+
+
+def test_manifest_round_trips_and_tolerates_a_corrupt_file(tmp_path):
+    manifest = Manifest.for_dir(tmp_path)
+    manifest.record(tmp_path / "out.md", "abc")
+    manifest.save()
+    assert json.loads((tmp_path / MANIFEST_NAME).read_text()) == {"out.md": "abc"}
+    assert Manifest.for_dir(tmp_path).entries == {"out.md": "abc"}
+    (tmp_path / MANIFEST_NAME).write_text("{not json")
+    assert Manifest.for_dir(tmp_path).entries == {}
+
+
+def test_build_skips_unchanged_outputs_and_rebuilds_changed_ones(tmp_path):
+    document, assets = simple_document(), AssetCache()
+    first = Manifest.for_dir(tmp_path)
+    path = build(["md"], tmp_path, document, assets, manifest=first)["md"]
+    first.save()
+    assert first.misses == [str(path)] and path.read_text() == "Hello Jane\n"
+
+    again = Manifest.for_dir(tmp_path)
+    build(["md"], tmp_path, document, assets, manifest=again)
+    assert again.hits == [str(path)] and again.misses == []
+
+    changed = Manifest.for_dir(tmp_path)
+    build(["md"], tmp_path, document, assets, variables={"name": "Tom"}, manifest=changed)
+    assert changed.misses == [str(path)] and path.read_text() == "Hello Tom\n"
+
+
+def test_build_rebuilds_a_deleted_output(tmp_path):
+    document, assets = simple_document(), AssetCache()
+    manifest = Manifest.for_dir(tmp_path)
+    path = build(["md"], tmp_path, document, assets, manifest=manifest)["md"]
+    manifest.save()
+    path.unlink()
+    manifest = Manifest.for_dir(tmp_path)
+    build(["md"], tmp_path, document, assets, manifest=manifest)
+    assert manifest.misses == [str(path)] and path.exists()
@@ -0,0 +1,67 @@
+from io import BytesIO
+
+import pytest
+
+from docgen import AssetCache, build
+from docgen.optimize import SizeProfile, is_bilevel, optimize_image
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def png(image):
+    buffer = BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_black_and_white_images_stay_one_bit_and_shrink_by_whole_factors():
+    qr = Image.new("L", (400, 400), 255)
+    qr.paste(0, (40, 40, 200, 200))
+    small = Image.open(BytesIO(optimize_image(png(qr), 1.0, SizeProfile(dpi=150))))
+    assert small.mode == "1" and small.size == (200, 200)
+    photo = Image.new("RGB", (400, 300), (200, 120, 40))
+    assert is_bilevel(qr) and not is_bilevel(photo) and not is_bilevel(qr.convert("LA"))
+    resized = Image.open(BytesIO(optimize_image(png(photo), 1.0, SizeProfile(dpi=100))))
+    assert resized.format == "JPEG" and resized.size == (100, 75)
+
+
+@pytest.fixture
+def pdfs(tmp_path, document):
+    pytest.importorskip("reportlab")
+
+    def build_pdf(name, size=None):
+        return build(["pdf"], tmp_path / name, document, AssetCache(size=size))["pdf"].read_bytes()
+
+    return build_pdf
+
+
+def test_size_optimised_pdf_embeds_one_bit_images_without_ascii85(pdfs):
+    normal, small = pdfs("normal"), pdfs("small", SizeProfile())
+    assert b"/BitsPerComponent 1" in small and b"/BitsPerComponent 8" not in small
+    assert b"/ASCII85Decode" in normal and b"/ASCII85Decode" not in small
+    assert len(small) < len(normal)
+
+
+def test_one_bit_images_fall_back_to_draw_image(pdfs, monkeypatch):
+    from docgen.renderers import pdf
+
+    monkeypatch.setattr(pdf, "_one_bit_xobjects", lambda canv: False)
+    fallback = pdfs("fallback", SizeProfile())
+    assert fallback.startswith(b"%PDF-") and b"/BitsPerComponent 1" not in fallback
+    assert b"/Subtype /Image" in fallback
+
+
+def test_emoji_without_a_font_fall_back_to_zapf_dingbats(monkeypatch):
+    pytest.importorskip("reportlab")
+    from reportlab import rl_config
+
+    from docgen.renderers import pdf
+
+    monkeypatch.setattr(pdf, "symbol_fonts", lambda: ["ZapfDingbats"])
+    assert pdf.with_symbols("Done ✅ Party 🎉", "Helvetica") == (
+        'Done <font name="ZapfDingbats">✔</font> Party <font name="ZapfDingbats">★</font>')
+    assert pdf.with_symbols("Plain text", "Helvetica") == "Plain text"
+    before = rl_config.useA85
+    with pdf.plain_streams():
+        assert rl_config.useA85 == 0
+    assert rl_config.useA85 == before
@@ -0,0 +1,62 @@
+import zipfile
+
+import pytest
+
+from docgen import AssetCache, build
+
+
+@pytest.fixture(scope="module")
+def assets():
+    return AssetCache()
+
+
+def test_pdf(tmp_path, document, assets):
+    pytest.importorskip("reportlab")
+    path = build(["pdf"], tmp_path, document, assets)["pdf"]
+    assert path.read_bytes().startswith(b"%PDF-")
+
+
+def test_docx(tmp_path, document, assets):
+    pytest.importorskip("docx")
+    path = build(["docx"], tmp_path, document, assets)["docx"]
+    with zipfile.ZipFile(path) as package:
+        body = package.read("word/document.xml").decode("utf-8")
+        assert any(name.startswith("word/media/") for name in package.namelist())
+    assert "Welcome to GatherSync!" in body and "Step 1: Install Expo Go" in body
+
+
+def test_markdown(tmp_path, document, assets):
+    text = build(["md"], tmp_path, document, assets)["md"].read_text(encoding="utf-8")
+    assert text.startswith("# Welcome to GatherSync! 🎉\n")
+    assert "**Option A: Scan the QR Code** (Easiest!)" in text
+    assert text.count("\n---\n") == sum(block.kind == "rule" for block in document.blocks)
+    assert "Prepared for" not in text
+    assert "![GatherSync QR Code](GatherSync-Instructions-qr.png)" in text
+    assert (tmp_path / "GatherSync-Instructions-qr.png").read_bytes().startswith(b"\x89PNG")
+
+
+def test_markdown_overwrites_its_qr_image_when_the_payload_changes(tmp_path, document, assets):
+    image = tmp_path / "GatherSync-Instructions-qr.png"
+    build(["md"], tmp_path, document, assets)
+    before = image.read_bytes()
+    build(["md"], tmp_path, document, assets, variables={"qr_payload": "https://example.com/other"})
+    assert image.read_bytes() != before
+    assert sorted(path.name for path in tmp_path.glob("*.png")) == [image.name]
+
+
+def test_html(tmp_path, document, assets):
+    text = build(["html"], tmp_path, document, assets, variables={"recipient": "Jane"})["html"].read_text(
+        encoding="utf-8")
+    assert text.startswith("<!DOCTYPE html>")
+    assert "Prepared for <strong>Jane</strong>" in text
+    assert 'src="data:image/png;base64,' in text and '<hr class="page-break">' in text
+
+
+def test_markdown_writes_only_into_the_output_directory(tmp_path, monkeypatch, document, assets):
+    cwd, out = tmp_path / "cwd", tmp_path / "out"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    build(["md"], out, document, assets)
+    assert list(cwd.iterdir()) == []
+    assert sorted(path.name for path in out.iterdir()) == ["GatherSync-Instructions-qr.png",
+                                                          "GatherSync-Instructions.md"]
@@ -0,0 +1,29 @@
+import json
+
+from docgen.report import REPORT_STEM, main
+
+
+def event(event_id, name, updated_at):
+    return {"id": event_id, "name": name, "eventType": "flexible", "year": 2025, "month": 3,
+            "updatedAt": updated_at,
+            "participants": [{"id": "p1", "name": "Ada", "availability": {"2025-03-05": True}},
+                             {"id": "p2", "name": "Bo", "availability": {"2025-03-05": True, "2025-03-06": True}}]}
+
+
+def test_report_lists_each_event_once_with_its_latest_name(tmp_path, write_backup, capsys):
+    lunch = {"id": "e2", "name": "Lunch", "eventType": "fixed", "fixedDate": "2025-03-07", "fixedTime": "12:30",
+             "participants": [{"id": "p1", "name": "Ada", "rsvpStatus": "attending"}]}
+    paths = [write_backup("monday.json", [event("e0", "Event 0", "1"), event("e1", "Event 1", "1"), lunch]),
+             write_backup("tuesday.json", [event("e0", "Event 0", "1"), event("e1", "Event 1 renamed", "2")]),
+             write_backup("monday (1).json", [event("e1", "Event 1", "1")])]
+    out = tmp_path / "reports"
+    main([*map(str, paths), "-f", "md", "-o", str(out), "--json", str(tmp_path / "data.json")])
+    text = (out / f"{REPORT_STEM}.md").read_text(encoding="utf-8")
+    assert text.count("## Event 0") == 1 and "## Event 1 renamed" in text and "## Event 1\n" not in text
+    assert "2 flexible events and 1 fixed event." in text
+    assert "1. **Wed 5 Mar** - 2 of 2 available (100%)\n2. **Thu 6 Mar** - 1 of 2 available (50%)" in text
+    assert "Fixed event on Fri 7 Mar at 12:30 · 1 participant" in text
+    data = json.loads((tmp_path / "data.json").read_text(encoding="utf-8"))
+    assert [summary["name"] for summary in data["flexible"]] == ["Event 0", "Event 1 renamed"]
+    main([*map(str, paths), "-f", "md", "-o", str(out)])
+    assert "report up to date" in capsys.readouterr().out.splitlines()[-1]
@@ -0,0 +1,54 @@
+from datetime import date
+
+from docgen.renderers import markdown
+from docgen.schedule import (Rule, anchored, expand, month_calendar, month_days, period_label, template_document,
+                             template_from)
+
+
+def _biweekly(**fields):
+    return template_from({"id": "t1", "name": "Walkers", "pattern": "biweekly", "dayOfWeek": 1, **fields})
+
+
+def test_day_of_month_past_the_end_falls_on_the_last_day():
+    rule = Rule("monthly", day_of_month=31)
+    assert month_days(rule, month_calendar(2026, 2)) == (28,)
+    assert month_days(rule, month_calendar(2024, 2)) == (29,)
+    assert month_days(rule, month_calendar(2026, 3)) == (31,)
+
+
+def test_nth_weekday_of_the_month():
+    march = month_calendar(2026, 3)  # the 1st is a Sunday
+    assert month_days(Rule("monthly", 2, week_of_month=2), march) == (10,)
+    assert month_days(Rule("monthly", 0, week_of_month=5), march) == (29,)
+    assert month_days(Rule("monthly", 5, week_of_month=5), march) == (27,)
+    assert month_days(Rule("weekly", 0), march) == (1, 8, 15, 22, 29)
+
+
+def test_biweekly_counts_fortnights_from_created_at():
+    template = _biweekly(createdAt="2026-01-12T09:00:00Z")
+    assert template.rule.anchor == date(2026, 1, 12).toordinal()
+    assert expand(template, (2026, 1), 2) == [(2026, 1, (12, 26)), (2026, 2, (9, 23))]
+    assert expand(template, (2026, 2), 1) == [(2026, 2, (9, 23))]
+
+
+def test_biweekly_without_created_at_counts_from_the_period_start():
+    template = _biweekly()
+    assert template.rule.anchor == 0
+    assert anchored(template, (2026, 1)).rule.anchor == date(2026, 1, 5).toordinal()
+    assert expand(template, (2026, 1), 2) == [(2026, 1, (5, 19)), (2026, 2, (2, 16))]
+    schedule = expand(template, (2026, 1), 2)
+    first = template_document(anchored(template, (2026, 1)), schedule, period_label((2026, 1), 2))
+    again = template_document(anchored(_biweekly(), (2026, 1)), schedule, period_label((2026, 1), 2))
+    assert first.digest == again.digest
+
+
+def test_template_document():
+    template = template_from({"id": "t2", "name": "Book club", "pattern": "monthly", "dayOfWeek": 5,
+                              "weekOfMonth": 5, "venueName": "Library", "participantNames": ["Ann", "Bob"]})
+    period = period_label((2026, 3), 1)
+    document = template_document(template, expand(template, (2026, 3), 1), period)
+    text = "\n".join(markdown.lines(document, {}))
+    assert "Last Friday of each month · March 2026 – March 2026" in text
+    assert "**Venue:** Library" in text
+    assert "**Members:** Ann, Bob" in text
+    assert "| March 2026 | Fri 27 Mar |" in text
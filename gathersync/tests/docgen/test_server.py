@@ -0,0 +1,58 @@
+import io
+import json
+
+import pytest
+
+from docgen.manifest import MANIFEST_NAME
+from docgen.server import Worker, serve_stdio
+
+
+@pytest.fixture
+def worker(tmp_path):
+    return Worker(("md",), root=tmp_path, flush_seconds=3600)
+
+
+def ask(worker, payload):
+    return json.loads(worker.respond(payload if isinstance(payload, str) else json.dumps(payload)))
+
+
+def test_render_then_up_to_date(tmp_path, worker):
+    request = {"id": 7, "formats": ["md"], "out_dir": "packets", "stem": "ann",
+               "variables": {"recipient": "Ann"}}
+    first = ask(worker, request)
+    assert first["id"] == 7 and first["ok"] and first["up_to_date"] == []
+    assert first["paths"] == {"md": str(tmp_path / "packets" / "ann.md")}
+    assert "Ann" in (tmp_path / "packets" / "ann.md").read_text(encoding="utf-8")
+    assert ask(worker, request)["up_to_date"] == ["md"]
+    assert ask(worker, dict(request, variables={"recipient": "Bo"}))["up_to_date"] == []
+    # Manifests are only written on a flush, not per request
+    assert not (tmp_path / "packets" / MANIFEST_NAME).exists()
+    assert ask(worker, {"op": "shutdown"}) == {"ok": True}
+    assert (tmp_path / "packets" / MANIFEST_NAME).exists()
+
+
+@pytest.mark.parametrize("request_, error", [
+    ({"formats": ["tiff"]}, "unknown format 'tiff'"),
+    ({"formats": ["md"], "stem": "../escape"}, "'stem' must be a file name"),
+    ({"formats": ["md"], "out_dir": "../elsewhere"}, "'out_dir' must be inside"),
+    ({"formats": ["md"], "variables": ["Ann"]}, "'variables' must be an object"),
+    ({"op": "reboot"}, "unknown op 'reboot'"),
+    ("not json", "JSONDecodeError"),
+])
+def test_errors_are_answered_and_the_worker_keeps_going(tmp_path, worker, request_, error):
+    response = ask(worker, request_)
+    assert response["ok"] is False and error in response["error"]
+    assert not (tmp_path.parent / "elsewhere").exists() and not (tmp_path.parent / "escape.md").exists()
+    assert ask(worker, {"op": "ping"}) == {"ok": True}
+
+
+def test_stats_and_stdio(worker):
+    lines = [json.dumps({"op": "ping"}), "", "{", json.dumps({"op": "stats"}), json.dumps({"op": "shutdown"}),
+             json.dumps({"op": "ping"})]
+    out = io.StringIO()
+    serve_stdio(worker, io.StringIO("\n".join(lines) + "\n"), out)
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(responses) == 4  # nothing is read after the shutdown
+    stats = responses[2]
+    assert stats["ok"] and stats["served"] == 1 and stats["failed"] == 1
+    assert {"startup_seconds", "qr_hits", "qr_misses"} <= stats.keys()
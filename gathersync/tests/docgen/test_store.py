@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.data import synthetic_backup
+from benchmarks.memory import in_month
+from docgen.backup import active_participants
+from docgen.store import Store
+
+
+def event(updated_at, names, event_id="e1"):
+    return {"id": event_id, "name": f"Breakfast {updated_at}", "eventType": "flexible", "year": 2025, "month": 3,
+            "updatedAt": updated_at, "venueName": "Café",
+            "participants": [{"id": f"{event_id}-{name}", "name": name, "availability": {"2025-03-05": True}}
+                             for name in names]}
+
+
+@pytest.mark.parametrize("order", [(0, 1, 2), (2, 1, 0), (1, 2, 0)])
+def test_an_event_in_several_backups_keeps_its_latest_copy(write_backup, order):
+    copies = [event("2025-03-01T00:00:00Z", ["Ada"]),
+              event("2025-03-02T00:00:00Z", ["Ada", "Bo"]),
+              event("2025-03-01T12:00:00Z", ["Cy"])]
+    other = event("2025-03-01T00:00:00Z", ["Di"], event_id="e2")
+    paths = [write_backup(f"backup-{index}.json", [copies[index], other]) for index in order]
+    store = Store.load(paths)
+    assert len(store) == 2 and store.rows == 3
+    assert store.event("e1").name == "Breakfast 2025-03-02T00:00:00Z"
+    assert [participant.name for participant in store.event("e1").participants] == ["Ada", "Bo"]
+    assert sorted(view.id for view in store.events()) == ["e1", "e2"]
+    assert store.participants("e1-Cy") == [] and store.participant("e2-Di").event.id == "e2"
+
+
+def test_projection_keeps_the_stored_fields_only(write_backup):
+    backup = synthetic_backup(40)
+    store = Store.load([write_backup("backup.json", backup["events"])])
+    for original, view in zip(backup["events"], store.events()):
+        projected = view.projection()
+        assert projected["id"] == original["id"] and projected["updatedAt"] == original["updatedAt"]
+        assert projected["participants"] == [in_month(participant, original)
+                                             for participant in active_participants(original)]
+    venue = Store.load([write_backup("venue.json", [event("now", ["Ada"])])])
+    assert "venueName" not in venue.event("e1").projection()
@@ -0,0 +1,69 @@
+import json
+import re
+
+import pytest
+
+from docgen import trace
+
+
+def traced_work():
+    with trace.span("parse"):
+        pass
+    with trace.document("out/a.pdf"):
+        for _ in range(2):
+            with trace.span("layout", format="pdf"):
+                trace.count("pages", 3, format="pdf")
+    trace.count("documents", format="pdf")
+
+
+def test_hooks_do_nothing_without_a_tracer():
+    assert trace.active() is None
+    assert trace.span("layout", format="pdf") is trace.span("other")
+    traced_work()
+
+
+def test_jsonl_round_trips_through_merge(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    with trace.tracing(path) as tracer:
+        traced_work()
+    assert trace.active() is None
+    events = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(event["type"], event["name"]) for event in events] == [
+        ("span", "parse"), ("count", "pages"), ("span", "layout"), ("count", "pages"), ("span", "layout"),
+        ("count", "documents")]
+    assert [event.get("document") for event in events] == [None, "out/a.pdf", "out/a.pdf", "out/a.pdf",
+                                                           "out/a.pdf", None]
+    replayed = trace.Tracer()
+    replayed.merge(events)
+    assert replayed.counters == tracer.counters == {("pages", "pdf"): 6, ("documents", "pdf"): 1}
+    assert {key: calls for key, (calls, _) in replayed.stages.items()} == {("parse", ""): 1, ("layout", "pdf"): 2}
+    assert replayed.stages[("layout", "pdf")][1] == pytest.approx(tracer.stages[("layout", "pdf")][1], abs=1e-5)
+
+
+def test_prometheus_text_round_trips(tmp_path):
+    path = tmp_path / "metrics.prom"
+    with trace.tracing(path) as tracer:
+        traced_work()
+    samples = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.startswith("#"):
+            name, labels, value = re.fullmatch(r"(\w+)\{(.*)\} (\S+)", line).groups()
+            samples[name, tuple(re.findall(r'(\w+)="([^"]*)"', labels))] = float(value)
+    assert samples[("docgen_pages_total", (("format", "pdf"),))] == 6
+    assert samples[("docgen_documents_total", (("format", "pdf"),))] == 1
+    for (name, fmt), (calls, seconds) in tracer.stages.items():
+        labels = (("stage", name), ("format", fmt))
+        assert samples[("docgen_stage_calls_total", labels)] == calls
+        assert samples[("docgen_stage_seconds_total", labels)] == pytest.approx(seconds, abs=1e-6)
+    assert len(samples) == 2 + 2 * len(tracer.stages)
+
+
+def test_kept_events_drain_once():
+    tracer = trace.enable(trace.Tracer(keep=True))
+    try:
+        traced_work()
+    finally:
+        trace.disable()
+    assert len(tracer.drain()) == 6 and tracer.drain() == []
+    with pytest.raises(ValueError, match="trace format"):
+        trace.Tracer(fmt="xml")